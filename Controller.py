@@ -1,12 +1,24 @@
 from web_scraper import WebScraper
 from items_extractor import ItemsExtractor
-from abstract_summariser import AbstractSummariser
+from abstract_summariser import AbstractSummariser, SUMMARY_UNAVAILABLE
 from Output_Structurer import OutputStructurer
+from paper_index import normalise_arxiv_id
+from paper_batch import PaperBatch
 import logging
+import queue
+import threading
+from datetime import datetime, timezone
+
+# Extract items mapped to the fields of a paper record
+ITEM_FIELDS = {"title": "title", "authors": "authors", "links": "link", "abstract": "abstract", "abstracts": "abstract"}
+
+# Markers passed between the pipeline stages
+_STAGE_DONE = object()
 
 class Controller: 
 
-    def __init__(self, scraper=None, extractor=None, summariser=None, structurer=None): 
+    def __init__(self, scraper=None, extractor=None, summariser=None, structurer=None, paginator=None,
+                 pipeline=False, queue_size=32, summary_workers=2, summary_batch_size=8, index=None, index_mode="skip"): 
         """
         Initialising all the system components
 
@@ -15,14 +27,47 @@ class Controller:
             extractor: (func)
             summeriser: (func)
             structurer: (func)
+            paginator: (func) optional, follows the result pages of every goto up to its result cap
+            pipeline: (bool) stream paper records through bounded queues from extraction to summarisation to output
+            queue_size: (int) maximum number of records waiting between two pipeline stages
+            summary_workers: (int) pipeline threads sending records to the summariser
+            summary_batch_size: (int) maximum number of waiting records a pipeline worker summarises together
+            index: (PaperIndex) optional cross-run index of the papers already processed, updated after every run
+            index_mode: (str) "skip" reuses the stored summaries of known papers, "new" only outputs papers not seen before
         """
         # This implementation supports the use of independent/external components rather than the ones in this project
         
         self.state = {} # state between executing actions
+        self.papers = PaperBatch() # extracted papers and their summaries, one column per field
+        self.prefetched = {} # pages fetched ahead of their goto action
         self.scraper = scraper if scraper is not None else WebScraper()
         self.extractor = extractor if extractor is not None else ItemsExtractor()
         self.summariser = summariser if summariser is not None else AbstractSummariser() # include model path if want to use local Llama model
         self.structurer = structurer if structurer is not None else OutputStructurer()
+        self.paginator = paginator
+        self.pipeline = pipeline
+        self.queue_size = max(1, queue_size)
+        self.summary_workers = max(1, summary_workers)
+        self.summary_batch_size = max(1, summary_batch_size)
+        self.index = index
+        self.index_mode = index_mode
+        self.watermark = None # arXiv ids output by earlier runs in incremental mode, set per run
+
+
+    def clone(self):
+        """
+        New controller sharing the components of this one (HTTP session, loaded summariser, ...) with an empty state,
+        so several instruction files can run at the same time
+
+        Returns:
+            (Controller)
+        """
+        return Controller(
+            scraper=self.scraper, extractor=self.extractor, summariser=self.summariser, structurer=self.structurer,
+            paginator=self.paginator, pipeline=self.pipeline, queue_size=self.queue_size,
+            summary_workers=self.summary_workers, summary_batch_size=self.summary_batch_size,
+            index=self.index, index_mode=self.index_mode
+        )
 
 
     def execute_actions(self, actions):
@@ -41,14 +86,44 @@ class Controller:
         # Store actions for reference between steps
         self.actions = actions
 
+        if self.pipeline:
+            return self._execute_pipeline(actions)
+
+        # Fetch every goto target concurrently up front so the pages are ready when their action runs
+        self._prefetch_pages(actions)
+
         # Executing one action at a time (Sequentially)
         for i, action in enumerate(actions):
             # Pass the remaining actions so we can look ahead
             next_actions = actions[i+1:] if i+1 < len(actions) else []
             self._execute_one_action(action, next_actions)
 
+        if self.index is not None:
+            self._record_papers(self._state_papers())
+
         # structure the output
-        return self.structurer.structure_output(self.state)
+        return self.structurer.structure_output(self.papers)
+
+    def _prefetch_pages(self, actions):
+        """
+        Fetch the pages of all goto actions concurrently when there is more than one
+
+        Args:
+            actions: (list)
+        """
+        urls = []
+        for action in actions:
+            url = action.get("url")
+            if action.get("type") == "goto" and url and url not in urls:
+                urls.append(url)
+
+        # A single page gains nothing from the concurrent engine
+        if len(urls) < 2 or not hasattr(self.scraper, "fetch_many"):
+            return
+
+        logging.info(f"Prefetching {len(urls)} pages concurrently")
+        for url, _, soup in self.scraper.fetch_many(urls):
+            self.prefetched[url] = soup
 
     def _execute_one_action(self, action, next_actions): 
         """
@@ -65,10 +140,19 @@ class Controller:
         if type_of_action == "goto":
             # save url
             url = action.get("url")
-            _, soup = self.scraper.fetch_n_parse(url)
+            if url in self.prefetched:
+                soup = self.prefetched.pop(url)
+            else:
+                _, soup = self.scraper.fetch_n_parse(url)
             self.state['current_soup'] = soup
             self.state['current_url'] = url
 
+            # Follow the remaining result pages when paginating
+            if self.paginator is not None:
+                self.state['current_soups'] = self._fetch_remaining_pages(url, soup)
+            else:
+                self.state.pop('current_soups', None)
+
         elif type_of_action == "extract":
             # In case goto action is missing
             if "current_soup" not in self.state: 
@@ -80,11 +164,519 @@ class Controller:
             if any(a.get("type") == "summarise" for a in next_actions) and "abstract" not in items and "abstracts" not in items:
                 items.append("abstracts")
 
-            items_data = self.extractor.extract(self.state["current_soup"], items)
-            self.state.update(items_data)
+            # Papers are identified in the index and the watermark by the arXiv id of their link
+            if (self.index is not None or self.watermark is not None) and "link" not in items and "links" not in items:
+                items.append("links")
+
+            if "current_soups" in self.state:
+                items_data = self._extract_pages(self.state["current_soups"], items)
+            else:
+                items_data = self.extractor.extract(self.state["current_soup"], items)
+            self.papers.update(items_data)
+
+            if self.index is not None and self.index_mode == "new":
+                self._drop_known_papers()
+
+            # Incremental mode: only the papers published since the last run go on to be summarised
+            if self.watermark:
+                self._drop_papers(self.watermark, "already output by the last run")
         
         elif type_of_action == "summarise":
-            if "abstract" in self.state:
-                self.state["summary"] = self.summariser.Summarise_abstracts(self.state["abstract"])
+            if "abstract" in self.papers:
+                self.papers.set_column("summary", self._summarise(self.papers["abstract"], self.papers.get("link")))
+            else:
+                logging.error("No abstracts found to summarise")
+
+
+    def _summarise(self, abstracts, links=None):
+        """
+        Summarise abstracts, reusing the summaries stored in the paper index for papers already processed
+
+        Args:
+            abstracts: (list)
+            links: (list) links of the same papers, used to look them up in the index
+
+        Returns:
+            summaries: (list)
+        """
+        if self.index is None or not links:
+            return self.summariser.Summarise_abstracts(abstracts)
+
+        ids = [normalise_arxiv_id(links[i]) if i < len(links) else None for i in range(len(abstracts))]
+        known = self.index.lookup(ids)
+        summaries = [known[arxiv_id]["summary"] if arxiv_id in known else None for arxiv_id in ids]
+
+        # Only papers without a stored summary go to the summariser
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            for i, summary in zip(missing, self.summariser.Summarise_abstracts([abstracts[i] for i in missing])):
+                summaries[i] = summary
+
+        logging.info(f"Reused {len(abstracts) - len(missing)} summaries from the paper index, summarised {len(missing)} abstracts")
+        return summaries
+
+
+    def _drop_known_papers(self):
+        """Keep only the extracted papers that are not in the paper index yet"""
+        known = self.index.lookup([normalise_arxiv_id(link) for link in self.papers.get("link", [])])
+        self._drop_papers(known, "already in the paper index")
+
+
+    def _drop_papers(self, arxiv_ids, reason):
+        """
+        Drop the extracted papers whose arXiv id is in the given collection
+
+        Args:
+            arxiv_ids: (set or dict)
+            reason: (str) for the log
+        """
+        links = self.papers.get("link", [])
+        keep = [i for i, link in enumerate(links) if normalise_arxiv_id(link) not in arxiv_ids]
+        self.papers.keep_rows(keep)
+
+        logging.info(f"Skipping {len(links) - len(keep)} papers {reason}, {len(keep)} new papers")
+
+
+    def _state_papers(self):
+        """
+        Papers of the run as records, for the paper index
+
+        Returns:
+            papers: (list)
+        """
+        return [record.to_dict(["title", "link", "summary"]) for record in self.papers.records(self.papers.column_length("link"))]
+
+
+    def _record_papers(self, papers):
+        """
+        Add processed papers and their summaries to the paper index
+
+        Args:
+            papers: (list) paper records
+        """
+        papers = [
+            {**paper, "summary": None} if paper.get("summary") == SUMMARY_UNAVAILABLE else paper
+            for paper in papers
+        ]
+        recorded = self.index.record(papers)
+        logging.info(f"Recorded {recorded} papers in the paper index")
+
+
+    def _fetch_remaining_pages(self, url, first_soup):
+        """
+        Fetch every result page after the first one, concurrently once the total number of results is known
+
+        Args:
+            url: (str) url of the first page
+            first_soup: (BeautifulSoup Object)
+
+        Returns:
+            soups: (list) all the pages in page order
+        """
+        page_urls = self.paginator.page_urls(url, first_soup)
+
+        if self.watermark:
+            # Older results only come last when the search is sorted by date, otherwise every page may list new papers
+            if self.paginator.sorted_newest_first(url):
+                return self._fetch_pages_until_seen(url, first_soup, page_urls)
+            logging.warning(f"Incremental mode: {url} is not sorted newest first (order=-announced_date_first), "
+                            f"following the result pages up to {self.paginator.max_results} results and dropping the papers of earlier runs")
+
+        if page_urls is not None:
+            pages = {}
+            if page_urls:
+                for page_url, _, soup in self.scraper.fetch_many(page_urls):
+                    pages[page_url] = soup
+            # Pages complete in any order, keep them in offset order
+            return [first_soup] + [pages[page_url] for page_url in page_urls]
+
+        # Without a total, follow the "next" links one page at a time up to the cap
+        soups = [first_soup]
+        collected = self.paginator.count_results(first_soup)
+        next_url = self.paginator.next_url(url, first_soup)
+
+        while next_url and collected < self.paginator.max_results:
+            _, soup = self.scraper.fetch_n_parse(next_url)
+            soups.append(soup)
+            collected += self.paginator.count_results(soup)
+            next_url = self.paginator.next_url(next_url, soup)
+
+        logging.info(f"Followed {len(soups)} result pages")
+        return soups
+
+
+    def _fetch_pages_until_seen(self, url, first_soup, page_urls):
+        """
+        Incremental mode: follow the result pages one at a time and stop at the first page listing a paper
+        output by the last run, since (with results sorted newest first) every later page is older
+
+        Args:
+            url: (str) url of the first page
+            first_soup: (BeautifulSoup Object)
+            page_urls: (list) urls of the remaining pages, None to follow the "next" links
+
+        Returns:
+            soups: (list) pages up to and including the first one with a seen paper
+        """
+        soups = [first_soup]
+        collected = self.paginator.count_results(first_soup)
+        remaining = iter(page_urls) if page_urls is not None else None
+        current_url = url
+
+        while not self._page_has_seen_paper(soups[-1]) and collected < self.paginator.max_results:
+            next_url = next(remaining, None) if remaining is not None else self.paginator.next_url(current_url, soups[-1])
+            if not next_url:
+                break
+
+            _, soup = self.scraper.fetch_n_parse(next_url)
+            soups.append(soup)
+            collected += self.paginator.count_results(soup)
+            current_url = next_url
+
+        logging.info(f"Incremental mode: followed {len(soups)} result pages up to the last run")
+        return soups
+
+
+    def _page_has_seen_paper(self, soup):
+        """
+        Whether a results page lists a paper of the watermark
+
+        Args:
+            soup: (BeautifulSoup Object)
+
+        Returns:
+            (bool)
+        """
+        links = self.extractor.extract(soup, ["links"]).get("link", [])
+        return any(normalise_arxiv_id(link) in self.watermark for link in links)
+
+
+    def _extract_pages(self, soups, items):
+        """
+        Extract the items from every page and merge them, dropping papers already seen on an earlier page
+
+        Args:
+            soups: (list)
+            items: (list)
+
+        Returns:
+            extracted data: (dict)
+        """
+        merged = {}
+        seen = set()
+        kept = 0
+
+        for soup in soups:
+            page_data = self.extractor.extract(soup, items)
+            for field in page_data:
+                merged.setdefault(field, [])
+
+            # Papers are identified by their link, or by their title when links are not extracted
+            keys = page_data.get("link") or page_data.get("title") or []
+            count = max((len(values) for values in page_data.values()), default=0)
+
+            for i in range(count):
+                if kept >= self.paginator.max_results:
+                    break
+
+                key = keys[i] if i < len(keys) else None
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                for field, values in page_data.items():
+                    if i < len(values):
+                        merged.setdefault(field, []).append(values[i])
+                kept += 1
+
+        logging.info(f"Merged {kept} papers from {len(soups)} pages")
+        return merged
+
+
+    def _execute_pipeline(self, actions):
+        """
+        Execute the actions as a streaming pipeline and collect the papers into the state
+
+        Args:
+            actions: (list)
+
+        Returns:
+            (json)
+        """
+        fields, summarise = self._pipeline_plan(actions)
+        if summarise:
+            fields = fields + ["summary"]
+
+        self.papers = PaperBatch(fields)
+        for paper in self.stream_actions(actions):
+            self.papers.append(paper)
+
+        return self.structurer.structure_output(self.papers)
+
+
+    def stream_actions(self, actions, ordered=True, fields=None):
+        """
+        Run the actions as producer/consumer stages connected by bounded queues,
+        yielding every paper as soon as it has been extracted and summarised
+
+        A slow summariser fills the queues and the fetching stage then waits, so memory stays bounded.
+
+        Args:
+            actions: (list)
+            ordered: (bool) yield the papers in page order instead of completion order
+            fields: (list) record fields kept in addition to the extracted ones, e.g. the abstract and fetched_at for an export
+
+        Returns:
+            generator: paper records (dict)
+        """
+        plan_fields, summarise = self._pipeline_plan(actions)
+        fields = plan_fields + [field for field in fields or [] if field not in plan_fields]
+        urls = [action.get("url") for action in actions if action.get("type") == "goto" and action.get("url")]
+
+        logging.info(f"Running pipeline over {len(urls)} pages (summarise: {summarise}, queue size: {self.queue_size})")
+
+        records = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        workers = self.summary_workers if summarise else 1
+
+        def produce():
+            try:
+                for position, record in enumerate(self._produce_records(urls)):
+                    if not self._put(records, (position, record), stop):
+                        return
+            except Exception as e:
+                self._put(results, e, stop)
+            finally:
+                # One end marker per worker
+                for _ in range(workers):
+                    self._put(records, _STAGE_DONE, stop)
+
+        def consume():
+            try:
+                while not stop.is_set():
+                    batch = self._take_batch(records, summarise, stop)
+                    finished = batch and batch[-1] is _STAGE_DONE
+                    if finished:
+                        batch.pop()
+
+                    if batch and summarise:
+                        summaries = self._summarise(
+                            [record.get("abstract", "") for _, record in batch],
+                            [record.get("link") for _, record in batch]
+                        )
+                        for (_, record), summary in zip(batch, summaries):
+                            record["summary"] = summary
+
+                    if batch and self.index is not None:
+                        self._record_papers([record for _, record in batch])
+
+                    for position, record in batch:
+                        paper = {field: record.get(field) for field in fields}
+                        if summarise:
+                            paper["summary"] = record.get("summary")
+                        if not self._put(results, (position, paper), stop):
+                            return
+
+                    if finished:
+                        return
+            except Exception as e:
+                self._put(results, e, stop)
+            finally:
+                self._put(results, _STAGE_DONE, stop)
+
+        threads = [threading.Thread(target=produce, daemon=True)]
+        threads += [threading.Thread(target=consume, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            pending = {}
+            next_position = 0
+            running = workers
+
+            while running:
+                item = results.get()
+
+                if item is _STAGE_DONE:
+                    running -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+
+                position, paper = item
+                if not ordered:
+                    yield paper
+                    continue
+
+                # Hold papers that finished early until the ones before them are out
+                pending[position] = paper
+                while next_position in pending:
+                    yield pending.pop(next_position)
+                    next_position += 1
+
+            # Papers missing from the sequence (e.g. after a failed stage) do not hold back the rest
+            for position in sorted(pending):
+                yield pending[position]
+
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=1)
+
+
+    def _pipeline_plan(self, actions):
+        """
+        Fields to extract and whether to summarise, read from the actions
+
+        Args:
+            actions: (list)
+
+        Returns:
+            tuple: (fields, summarise)
+        """
+        summarise = any(action.get("type") == "summarise" for action in actions)
+
+        fields = []
+        for action in actions:
+            if action.get("type") == "extract":
+                for item in action.get("items", []):
+                    field = ITEM_FIELDS.get(item.lower())
+                    if field and field not in fields:
+                        fields.append(field)
+
+        # Papers are identified in the index and the watermark by the arXiv id of their link
+        if (self.index is not None or self.watermark is not None) and "link" not in fields:
+            fields.append("link")
+
+        return fields, summarise
+
+
+    def _produce_records(self, urls):
+        """
+        Paper records of every page, streamed when the scraper supports it
+
+        Args:
+            urls: (list)
+
+        Returns:
+            generator: paper records (dict)
+        """
+        seen = set()
+        cap = self.paginator.max_results if self.paginator is not None else None
+        count = 0
+
+        for url in urls:
+            if self.paginator is None and hasattr(self.scraper, "stream_records"):
+                page_records = self.scraper.stream_records(url, self.extractor)
             else:
-                logging.error("No abstracts found to summarise")
\ No newline at end of file
+                page_records = self._page_records(url)
+
+            for record in page_records:
+                # Papers repeated across pages are only sent down the pipeline once
+                key = record.get("link") or record.get("title")
+                if key:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                if self.index is not None and self.index_mode == "new" and normalise_arxiv_id(record.get("link")) in self.index:
+                    continue
+                if self.watermark and normalise_arxiv_id(record.get("link")) in self.watermark:
+                    continue
+
+                # Records streamed while the page downloads are stamped as they arrive
+                record.setdefault("fetched_at", datetime.now(timezone.utc))
+
+                yield record
+                count += 1
+                if cap is not None and count >= cap:
+                    return
+
+
+    def _page_records(self, url):
+        """
+        Paper records of a page (and its following pages when paginating)
+
+        Args:
+            url: (str)
+
+        Returns:
+            generator: paper records (dict)
+        """
+        _, soup = self.scraper.fetch_n_parse(url)
+        first_fetched = datetime.now(timezone.utc)
+        soups = self._fetch_remaining_pages(url, soup) if self.paginator is not None else [soup]
+
+        # The following pages are all fetched by the time _fetch_remaining_pages returns
+        fetched_at = [first_fetched] + [datetime.now(timezone.utc)] * (len(soups) - 1)
+
+        for soup, page_fetched in zip(soups, fetched_at):
+            records = self.extractor.extract_records(soup) if hasattr(self.extractor, "extract_records") else []
+
+            if not records:
+                # Pages without result containers: zip the extracted lists back into records
+                data = self.extractor.extract(soup, ["title", "authors", "links", "abstracts"])
+                count = max((len(values) for values in data.values()), default=0)
+                records = [
+                    {field: values[i] for field, values in data.items() if i < len(values)}
+                    for i in range(count)
+                ]
+
+            for record in records:
+                record["fetched_at"] = page_fetched
+                yield record
+
+
+    def _take_batch(self, records, summarise, stop):
+        """
+        Wait for one record, then take the records already waiting up to the summary batch size
+
+        Args:
+            records: (queue.Queue)
+            summarise: (bool)
+            stop: (threading.Event) set when the pipeline stops, the producer then sends no end markers
+
+        Returns:
+            batch: (list) ending with the end marker when the producer is done, empty when the pipeline stopped
+        """
+        while True:
+            if stop.is_set():
+                return []
+            try:
+                batch = [records.get(timeout=0.1)]
+                break
+            except queue.Empty:
+                continue
+
+        limit = self.summary_batch_size if summarise else 1
+
+        while batch[-1] is not _STAGE_DONE and len(batch) < limit:
+            try:
+                batch.append(records.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+
+    def _put(self, target, item, stop):
+        """
+        Put an item on a bounded queue, waiting for space unless the pipeline is stopping
+
+        Args:
+            target: (queue.Queue)
+            item: (any)
+            stop: (threading.Event)
+
+        Returns:
+            (bool) False when the pipeline stopped before the item was queued
+        """
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
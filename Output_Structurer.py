@@ -1,13 +1,31 @@
 import logging 
 import json
+from paper_batch import PaperBatch
+
+# Fields of every paper in the output, with the value used when a field is missing
+PAPER_FIELDS = {"title": "", "authors": [], "link": "", "summary": ""}
+
+# Streaming output formats: one paper per line, or a {"papers": [...]} document written paper by paper
+STREAM_FORMATS = ["ndjson", "json"]
 
 class OutputStructurer:
+
+    def __init__(self, compact=False):
+        """
+        Initialise the output options
+
+        Args:
+            compact: (bool) write the JSON without indentation
+        """
+        self.compact = compact
+
+
     def structure_output(self, info):
         """
         Structured Output Generator
 
         Args: 
-            info: (str)
+            info: (PaperBatch) or a dict of parallel lists ('title', 'authors', 'link', 'summary')
 
         Returns: 
             (json)
@@ -18,37 +36,85 @@ class OutputStructurer:
 
         # Initialise info sructs
         output = {"papers": []}
-        lengths = []
+        papers = info if isinstance(info, PaperBatch) else PaperBatch.from_columns(info)
 
-        # Lengths of lists: 'title', 'authors', 'link', and 'summary'
-        for key in ['title', 'authors', 'link', 'summary']:
-            # default an empty list for missing key
-            length = len(info.get(key, []))
-            lengths.append(length)
+        # Lengths of the columns 'title', 'authors', 'link', and 'summary' (0 for a missing column)
+        lengths = [papers.column_length(key) for key in PAPER_FIELDS]
 
-        # When no lengths appended this returns the default JSON
-        if not lengths:
-            return json.dumps(output, indent=2)
-
-        # Iterate through the lengths to find the minimum nonzero value
-        num_papers = None
-
-        for length in lengths:
-            if length > 0:
-                if num_papers is None or length < num_papers:
-                    num_papers = length
+        # The papers are the rows present in every non empty column
+        num_papers = min((length for length in lengths if length > 0), default=None)
 
         if num_papers is None:
-            return json.dumps(output, indent=2)  # Return empty papers array
-
-        # collect paper objects
-        for i in range(num_papers):
-            paper = {
-                "title": info.get('title', [])[i] if i < len(info.get('title', [])) else "",
-                "authors": info.get('authors', [])[i] if i < len(info.get('authors', [])) else [],
-                "link": info.get('link', [])[i] if i < len(info.get('link', [])) else "",
-                "summary": info.get('summary', [])[i] if i < len(info.get('summary', [])) else ""
-            }
-            output['papers'].append(paper)
+            return self._dumps(output)  # Return empty papers array
+
+        # collect paper objects, one record at a time
+        for record in papers.records(num_papers):
+            output['papers'].append(self.paper_record(record))
         
+        return self._dumps(output)
+
+
+    def stream_output(self, papers, stream, output_format="ndjson"):
+        """
+        Write papers to a stream as they become available, keeping only one paper in memory
+
+        Args:
+            papers: (iterable) paper dicts, e.g. from Controller.stream_actions
+            stream: (file object) stdout or an open text file
+            output_format: (str) "ndjson" for one compact paper per line, "json" for a streamed {"papers": [...]} document
+
+        Returns:
+            count: (int) number of papers written
+        """
+        if output_format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        logging.info(f"Streaming output as {output_format}...")
+        count = 0
+
+        if output_format == "json":
+            stream.write('{"papers": [')
+
+        for paper in papers:
+            line = json.dumps(self.paper_record(paper), separators=(",", ":"))
+
+            if output_format == "json":
+                line = ("," if count else "") + "\n" + line
+            else:
+                line += "\n"
+
+            stream.write(line)
+            # Flush every paper so downstream consumers can start straight away
+            stream.flush()
+            count += 1
+
+        if output_format == "json":
+            stream.write("\n]}\n")
+            stream.flush()
+
+        logging.info(f"Streamed {count} papers")
+        return count
+
+
+    def paper_record(self, paper):
+        """
+        Output record of a single paper, with the missing fields left empty
+
+        Args:
+            paper: (dict or PaperRecord)
+
+        Returns:
+            record: (dict)
+        """
+        record = {}
+        for field, default in PAPER_FIELDS.items():
+            value = paper.get(field)
+            record[field] = value if value is not None else default
+        return record
+
+
+    def _dumps(self, output):
+        """JSON text of the output, indented unless compact"""
+        if self.compact:
+            return json.dumps(output, separators=(",", ":"))
         return json.dumps(output, indent=2)
@@ -1,78 +1,368 @@
 import logging
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import TokenBucket
+from summary_router import SummaryRouter
+
+GEMINI_MODEL_NAME = 'gemini-2.0-flash-lite'
+LLAMA_MODEL_NAME = 'llama-2-7b-chat.Q4_K_M.gguf'
+
+# Prompts used to summarise a single abstract
+GEMINI_PROMPT = """The following is an academic abstract, please summarise it effectively and concisely into 3-4 sentences {text}"""
+LLAMA_PROMPT = "<s>[INST] The following is an academic abstract, please summarise it effectively and concisely into 3-4 sentences \n\n{text} [/INST]"
+
+# Prompt used to summarise several abstracts in a single request
+BATCH_PROMPT = """The following are {count} academic abstracts, each one starts with its id in square brackets. Please summarise each abstract effectively and concisely into 3-4 sentences.
+Respond only with a JSON array containing one object per abstract with the keys "id" (int) and "summary" (str).
+
+{abstracts}"""
+
+# Batched prompt for the local Llama model, the instructions come first and never change
+# so the evaluated prefix is reused from the KV cache by every batch
+LLAMA_BATCH_PROMPT = """<s>[INST] The following are academic abstracts, each one starts with its id in square brackets. Please summarise each abstract effectively and concisely into 3-4 sentences.
+Respond only with a JSON array containing one object per abstract with the keys "id" (int) and "summary" (str).
+
+{abstracts} [/INST]"""
+
+# Rough token estimates used to size the batches (about 4 characters per token)
+CHARS_PER_TOKEN = 4
+SUMMARY_TOKENS = 120
+
+# Context sizes the local model is loaded with (Llama 2 is trained on 4096 tokens)
+LLAMA_DEFAULT_CTX = 2048
+LLAMA_MIN_CTX = 512
+LLAMA_MAX_CTX = 4096
+# Memory given to the KV state cache of evaluated prompt prefixes
+LLAMA_PREFIX_CACHE_BYTES = 512 * 1024 * 1024
+
+# A llama.cpp context runs one evaluation at a time, shared by every summariser using the model
+_LLAMA_LOCK = threading.Lock()
+
+# Summarisation modes: "auto" uses Gemini, then the local Llama model, then extraction;
+# "extractive" only uses the CPU extractive summariser and never loads a model
+SUMMARISER_MODES = ["auto", "extractive"]
+
+# Placeholder kept in the output when an abstract could not be summarised
+SUMMARY_UNAVAILABLE = "Summary unavailable (Error in summarising)"
+
+# Seconds a single summary may take on each tier before the next tier is tried
+DEFAULT_TIER_DEADLINES = {"gemini": 30.0, "llama": 120.0}
+# Seconds per summary assumed for the run budget routing until a tier has been measured
+EXPECTED_TIER_LATENCY = {"gemini": 2.0, "llama": 20.0, "extraction": 0.01}
+
+# Run budget of the Summarise_abstracts call an abstract belongs to, set by the thread summarising it
+_ITEM_RUN = threading.local()
+
+# Process-wide registry of loaded models, shared by every summariser (and so every Controller),
+# keyed by backend and load settings: ("gemini", api_key) and ("llama", model_path, n_ctx, n_threads)
+_MODEL_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def shared_model(key, loader):
+    """
+    Load a model once per process and hand the same instance to every caller
+
+    Args:
+        key: (tuple) backend and every setting the model is loaded with, e.g. ("llama", model_path, n_ctx, n_threads)
+        loader: (func) loads the model, None is kept when it fails so it is not retried
+
+    Returns:
+        model: (any) None when it could not be loaded
+    """
+    with _REGISTRY_LOCK:
+        # Loading under the lock so concurrent callers wait for a single load
+        if key not in _MODEL_REGISTRY:
+            _MODEL_REGISTRY[key] = loader()
+        return _MODEL_REGISTRY[key]
+
+
+def loaded_model(match):
+    """
+    A model already in the registry whose key matches
+
+    Args:
+        match: (func) registry key -> bool
+
+    Returns:
+        model: (any) None when no loaded model matches
+    """
+    with _REGISTRY_LOCK:
+        for key, model in _MODEL_REGISTRY.items():
+            if model is not None and match(key):
+                return model
+    return None
+
+
+def default_thread_count():
+    """
+    Number of CPU cores this process may run on, used as the local model thread count
+
+    Returns:
+        threads: (int)
+    """
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        # sched_getaffinity is not available on every platform
+        return max(1, os.cpu_count() or 4)
+
+
+def choose_context_size(texts, batch_size=1):
+    """
+    Smallest power of two context fitting a prompt of the longest abstracts and their summaries
+
+    Args:
+        texts: (list) abstracts to summarise
+        batch_size: (int) abstracts per prompt
+
+    Returns:
+        n_ctx: (int) between LLAMA_MIN_CTX and LLAMA_MAX_CTX
+    """
+    if not texts:
+        return LLAMA_DEFAULT_CTX
+
+    longest = sorted((len(text) // CHARS_PER_TOKEN for text in texts), reverse=True)[:max(1, batch_size)]
+    needed = len(LLAMA_BATCH_PROMPT) // CHARS_PER_TOKEN + sum(longest) + SUMMARY_TOKENS * len(longest)
+
+    n_ctx = LLAMA_MIN_CTX
+    while n_ctx < needed and n_ctx < LLAMA_MAX_CTX:
+        n_ctx *= 2
+    return n_ctx
+
+
+def clear_model_registry():
+    """Forget the loaded models (they are loaded again on next use)"""
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
 
 class AbstractSummariser: 
 
-    def __init__(self, api_key=None, model_path=None):
+    def __init__(self, api_key=None, model_path=None, max_in_flight=1, requests_per_minute=None,
+                 batch_mode=False, batch_token_budget=8000, max_batch_size=25, cache=None,
+                 llama_threads=None, llama_ctx=None, llama_batch_size=4, mode="auto",
+                 tier_deadlines=None, breaker_threshold=3, breaker_cooldown=60.0, run_budget=None):
         """
         Initialise the class with an API key from Gemini
 
         Args: 
             api_key: (str)
             model_path: (str)
+            max_in_flight: (int) number of summarisation requests sent concurrently
+            requests_per_minute: (float) request budget shared by all concurrent requests
+            batch_mode: (bool) summarise several abstracts per request
+            batch_token_budget: (int) estimated prompt and response tokens allowed per batched request
+            max_batch_size: (int) maximum number of abstracts per batched request
+            cache: (SummaryCache) on-disk cache of previously generated summaries
+            llama_threads: (int) local model threads, None uses every available core
+            llama_ctx: (int) local model context size, None chooses it from the lengths of the first abstracts
+            llama_batch_size: (int) abstracts per local prompt in batch mode
+            mode: (str) "auto" or "extractive" (no model, CPU extractive summaries only)
+            tier_deadlines: (dict) seconds allowed per summary by tier ("gemini", "llama"), merged over the defaults
+            breaker_threshold: (int) consecutive failures after which a tier is skipped
+            breaker_cooldown: (float) seconds a failing tier is skipped before it is tried again
+            run_budget: (float) seconds for each Summarise_abstracts call, slower tiers are skipped when it runs short
         
         """
-        import os 
+        if mode not in SUMMARISER_MODES:
+            raise ValueError(f"Unknown summariser mode: {mode}")
+
+        self.mode = mode
+        self.tier_deadlines = {**DEFAULT_TIER_DEADLINES, **(tier_deadlines or {})}
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.run_budget = run_budget
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limiter = TokenBucket.per_minute(requests_per_minute, self.max_in_flight) if requests_per_minute else None
+        self.batch_mode = batch_mode
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_size = max(1, max_batch_size)
+        self.cache = cache
+        self.model_path = model_path
+        self.llama_threads = llama_threads
+        self.llama_ctx = llama_ctx
+        self.llama_batch_size = max(1, llama_batch_size)
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY") # COMMENT OUT TO USE Llama 
         #self.api_key = api_key # UNCOMMENT TO USE Llama
-        self.genai = None
-        self.llm = None
-        
-        
+
+        # Nothing is imported or loaded until the first summary is needed (see warm_up)
+        self._genai = None
+        self._llm = None
+        self._loaded = False
+        self.gemini_model = None # shared by every request
+        self.extractive = None # ExtractiveSummariser, created on first use
+        self.llama_stats = None # token counts and generation time of the local model
+        self.router = None # created on first use by _get_router
+        self._router_lock = threading.Lock()
+
+
+    @property
+    def genai(self):
+        """Configured Gemini client, loaded on first use"""
+        if not self._loaded:
+            self.warm_up()
+        return self._genai
+
+
+    @genai.setter
+    def genai(self, value):
+        self._genai = value
+        self._loaded = True
+
+
+    @property
+    def llm(self):
+        """Local Llama model, loaded on first use"""
+        if not self._loaded:
+            self.warm_up()
+        return self._llm
+
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+        self._loaded = True
+
+
+    def warm_up(self, texts=None):
+        """
+        Load the models now instead of on the first summary, e.g. before a service takes jobs
+
+        Models come from the process-wide registry, so they are only loaded once per process.
+
+        Args:
+            texts: (list) abstracts about to be summarised, used to size the local model context
+
+        Returns:
+            (AbstractSummariser)
+        """
+        if self._loaded:
+            return self
+
+        # The extractive mode never needs a model
+        if self.mode == "extractive":
+            self._loaded = True
+            return self
+
         # Initialising the Gemini Client
+        genai = None
         if self.api_key: 
-            try:
-                import google.generativeai as genai
-                # Configure the API key
-                genai.configure(api_key=self.api_key)
-                self.genai = genai
-                logging.info("Initialised Gemini API with key")
-
-            except ImportError:
-                logging.warning("Failed to import the Google Generative AI library, using the fallback local model instead (llama-2-7b-chat.Q4_K_M.gguf)")
+            genai = shared_model(("gemini", self.api_key), lambda: self._load_gemini(self.api_key))
         else:
             logging.warning("No API key was found, will use the fallback local model instead (llama-2-7b-chat.Q4_K_M.gguf)")
-        
-         # Initialising the llama-cpp-python model
-        if not self.genai or model_path:
-            try: 
-                from llama_cpp import Llama
+
+        # Initialising the llama-cpp-python model
+        llm = None
+        if not genai or self.model_path:
+            download = not self.model_path
+            if download:
+                # Default model downloaded from HuggingFace
+                self.model_path = f"models/{LLAMA_MODEL_NAME}"
+
+            n_ctx = self.llama_ctx or choose_context_size(texts, self.llama_batch_size if self.batch_mode else 1)
+            n_threads = self.llama_threads or default_thread_count()
+            model_path = self.model_path
+
+            if not self.llama_ctx:
+                # A context sized from the abstracts is served by a copy of the model already loaded with a context at least as large
+                llm = loaded_model(lambda key: key[:2] == ("llama", model_path) and key[2] >= n_ctx and key[3] == n_threads)
+            if llm is None:
+                llm = shared_model(("llama", model_path, n_ctx, n_threads), lambda: self._load_llama(model_path, download, n_ctx, n_threads))
+
+        self._genai = genai
+        self._llm = llm
+        self._loaded = True
+        return self
+
+
+    @staticmethod
+    def _load_gemini(api_key):
+        """
+        Import and configure the Gemini client
+
+        Args:
+            api_key: (str)
+
+        Returns:
+            genai: (module) None when the library is not installed
+        """
+        try:
+            import google.generativeai as genai
+            # Configure the API key
+            genai.configure(api_key=api_key)
+            logging.info("Initialised Gemini API with key")
+            return genai
+
+        except ImportError:
+            logging.warning("Failed to import the Google Generative AI library, using the fallback local model instead (llama-2-7b-chat.Q4_K_M.gguf)")
+            return None
+
+
+    @staticmethod
+    def _load_llama(model_path, download=False, n_ctx=LLAMA_DEFAULT_CTX, n_threads=4):
+        """
+        Load the local Llama model, downloading the default one when missing
+
+        Args:
+            model_path: (str)
+            download: (bool) the path is the default model, fetched from HuggingFace when not on disk
+            n_ctx: (int) context size
+            n_threads: (int) CPU threads used for inference
+
+        Returns:
+            llm: (Llama) None when it could not be loaded
+        """
+        try: 
+            from llama_cpp import Llama
+            
+            if not download:
+                # Use the provided model path
+                logging.info(f"Loading Llama model from {model_path} (n_ctx={n_ctx}, n_threads={n_threads})")
+                llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads)
+            else:
+                # Download a model if it doesn't exist
+                import huggingface_hub
                 
-                if model_path:
-                    # Use the provided model path
-                    logging.info(f"Loading Llama model from {model_path}")
-                    self.llm = Llama(model_path=model_path)
-                else:
-                    # Download a model if it doesn't exist
-                    import huggingface_hub
-                    
+                # Check if model already exists
+                if not os.path.exists(model_path):
                     logging.info("Downloading Llama model from HuggingFace (this may take a few minutes)")
-                    model_name = "llama-2-7b-chat.Q4_K_M.gguf"
-                    model_path = f"models/{model_name}"
-                    
-                    # Check if model already exists
-                    if not os.path.exists(model_path):
-                        huggingface_hub.hf_hub_download(
-                            repo_id="TheBloke/Llama-2-7B-Chat-GGUF",
-                            filename=model_name,
-                            local_dir=os.getcwd()
-                        )
-                    
-                    logging.info(f"Initialising Llama model from {model_path}")
-                    self.llm = Llama(model_path=model_path, n_ctx=2048, n_threads=4, n_gpu_layers=0)
+                    huggingface_hub.hf_hub_download(
+                        repo_id="TheBloke/Llama-2-7B-Chat-GGUF",
+                        filename=LLAMA_MODEL_NAME,
+                        local_dir=os.getcwd()
+                    )
                 
-                logging.info("Llama model initialised successfully")
+                logging.info(f"Initialising Llama model from {model_path} (n_ctx={n_ctx}, n_threads={n_threads})")
+                llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, n_gpu_layers=0)
+
+            # Keep the KV state of evaluated prompts so the shared instruction prefix is not evaluated again
+            try:
+                from llama_cpp import LlamaRAMCache
+                llm.set_cache(LlamaRAMCache(capacity_bytes=LLAMA_PREFIX_CACHE_BYTES))
+            except (ImportError, AttributeError):
+                logging.info("Prompt prefix cache is not available in this llama-cpp-python version")
+            
+            logging.info("Llama model initialised successfully")
+            return llm
+
+        except ImportError: 
+            logging.warning("llama-cpp-python is not installed please install it using pip")
 
-            except ImportError: 
-                logging.warning("llama-cpp-python is not installed please install it using pip")
+        except Exception as e: 
+            logging.warning(f"Llama model failed to be initialised, Error: {str(e)}")
 
-            except Exception as e: 
-                logging.warning(f"Llama model failed to be initialised, Error: {str(e)}")
+        return None
 
 
     def summarise(self, text): 
         """
         Summarises the abstract content using either Google's Gemini model via API, 
-            a small local Llama model or a simple extraction by taking the first two sentences.
+            a small local Llama model or an extractive summary of the most central sentences.
 
         Args: 
             text: (str)
@@ -81,54 +371,138 @@ class AbstractSummariser:
             Summarised Text: (str)
         
         """
-        # Try to use the Gemini model first
-        if self.genai: 
-            try:
-                logging.info("Attempting to use Gemini model for summarization")
-                prompt = f"""The following is an academic abstract, please summarise it effectively and concisely into 3-4 sentences {text}"""
-                
-                # Use the generative model to create a response
-                logging.info("Creating Gemini model instance")
-                model = self.genai.GenerativeModel('gemini-2.0-flash-lite')
-                
-                logging.info("Sending prompt to Gemini API")
-                response = model.generate_content(prompt)
-                
-                abstract_summary = response.text.strip()
-                logging.info("Summary generated successfully using Gemini")
-                return abstract_summary
-            
-            except Exception as e: 
-                logging.error(f"The summary failed to generate using Gemini, Error: {str(e)}")
-                import traceback
-                logging.error(f"Traceback: {traceback.format_exc()}")
+        # Serve abstracts that the preferred model already summarised from the cache
+        preferred = self._preferred_tier()
+        key = self._cache_key(text, preferred)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-        # Use the local Llama model in the case where Llama had been initialised
-        elif self.llm: 
-            try:
-                # Prompt formatted for the llama 2 chat
-                prompt = f"<s>[INST] The following is an academic abstract, please summarise it effectively and concisely into 3-4 sentences \n\n{text} [/INST]"
-
-                # Generate summary using Llama (output of max 100 tokens (around 75 words))
-                output = self.llm(
-                    prompt,
-                    max_tokens=100,
-                    stop=["</s>", "\n\n"],
-                    echo=False
+        # Only the cache misses wait for the request budget before going to the model
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        summary, backend = self._generate_summary(text)
+
+        # Stored under the model that actually answered, the extraction fallback is instant and never cached
+        if backend != preferred:
+            key = self._cache_key(text, backend)
+        if key is not None:
+            self.cache.put(key, summary)
+
+        return summary
+
+
+    def _generate_summary(self, text):
+        """
+        Generates a summary with the first tier that answers: Gemini, the local Llama model, then extraction
+
+        Args:
+            text: (str)
+
+        Returns:
+            tuple: (Summarised Text, name of the backend that produced it)
+        """
+        # Extraction only: no model to route to
+        if self.mode == "extractive":
+            return self._get_extractive().summarise(text), "extraction"
+
+        return self._get_router().route(text, getattr(_ITEM_RUN, "budget", None))
+
+
+    def _summarise_gemini(self, text):
+        """
+        Summary from the Gemini model
+
+        Args:
+            text: (str)
+
+        Returns:
+            Summarised Text: (str)
+        """
+        logging.info("Attempting to use Gemini model for summarization")
+        prompt = GEMINI_PROMPT.format(text=text)
+
+        # Use the generative model to create a response
+        model = self._get_gemini_model()
+
+        logging.info("Sending prompt to Gemini API")
+        response = model.generate_content(prompt)
+
+        abstract_summary = response.text.strip()
+        logging.info("Summary generated successfully using Gemini")
+        return abstract_summary
+
+
+    def _summarise_llama(self, text):
+        """
+        Summary from the local Llama model
+
+        Args:
+            text: (str)
+
+        Returns:
+            Summarised Text: (str)
+        """
+        # Prompt formatted for the llama 2 chat
+        prompt = LLAMA_PROMPT.format(text=text)
+
+        # Generate summary using Llama (output of max 100 tokens (around 75 words))
+        output = self._run_llama(
+            prompt,
+            max_tokens=100,
+            stop=["</s>", "\n\n"],
+            echo=False
+        )
+        summary = output["choices"][0]["text"].strip()
+        logging.info("Summary Generated Successfully using local Llama model")
+        return summary
+
+
+    def _get_router(self):
+        """
+        Create the tier router once: Gemini, then the local Llama model, then extraction (always available)
+
+        Returns:
+            (SummaryRouter)
+        """
+        with self._router_lock:
+            if self.router is None:
+                deadlines = self.tier_deadlines or {}
+                router = SummaryRouter(failure_threshold=self.breaker_threshold, cooldown=self.breaker_cooldown,
+                                       max_workers=max(2, self.max_in_flight))
+                router.add_tier("gemini", self._summarise_gemini, deadlines.get("gemini"),
+                                EXPECTED_TIER_LATENCY["gemini"], available=lambda: bool(self.genai))
+                router.add_tier("llama", self._summarise_llama, deadlines.get("llama"),
+                                EXPECTED_TIER_LATENCY["llama"], available=lambda: bool(self.llm))
+                router.add_tier("extraction", lambda text: self._get_extractive().summarise(text),
+                                expected_latency=EXPECTED_TIER_LATENCY["extraction"])
+                self.router = router
+            return self.router
+
+
+    def tier_metrics(self):
+        """
+        Latency and failure metrics of every summariser tier
+
+        Returns:
+            metrics: (dict) tier name -> calls, successes, failures, timeouts, skipped, latencies (per abstract) and circuit state
+        """
+        return self._get_router().metrics()
+
+
+    def _log_tier_stats(self):
+        """Report the calls, failures and latency of the tiers that were used"""
+        if self.router is None:
+            return
+        for name, metrics in self.router.metrics().items():
+            if metrics["calls"] or metrics["skipped"]:
+                latency = f"{metrics['mean_latency']:.2f}s" if metrics["mean_latency"] is not None else "n/a"
+                logging.info(
+                    f"Tier {name}: {metrics['calls']} calls, {metrics['failures']} failures ({metrics['timeouts']} timeouts), "
+                    f"{metrics['skipped']} skipped, mean latency {latency}, circuit {metrics['circuit']}"
                 )
-                summary = output["choices"][0]["text"].strip()
-                logging.info("Summary Generated Successfully using local Llama model")
-                return summary
-            
-            except Exception as e: 
-                logging.error(f"The summary failed to generate using Llama, Error: {str(e)}")
-
-        # Simple Extraction (Last Fallback): just using the first 4 sentences from the Abstract if neither models work
-        logging.info("Falling back to simple extraction method - neither Gemini nor Llama models were able to generate a summary")
-        sentences = text.split(". ")
-        if len(sentences) <= 4:
-            return text
-        return ". ".join(sentences[:4]) + "."
     
 
     def Summarise_abstracts(self, texts):
@@ -144,23 +518,432 @@ class AbstractSummariser:
         """
         logging.info(f"Summarising {len(texts)} abstracts")
 
-        summaries = []
+        # The whole batch is scored at once by the extractive summariser
+        if self.mode == "extractive":
+            summaries = self._get_extractive().summarise_batch(texts)
+            logging.info(f"successfully summarised {len(summaries)} abstracts")
+            return summaries
 
-        # Summarising the abstracts one by one
-        for i, text in enumerate(texts): 
-            logging.info(f"summarising abstract {i+1}/{len(texts)}")
-            
-            # Using the main summarise function
-            try: 
-                summary = self.summarise(text)
-                summaries.append(summary)
+        # Loading the models now lets the local model context be sized for these abstracts
+        if texts and not self._loaded:
+            self.warm_up(texts)
 
-            except Exception as e: 
-                logging.error(f"Error summarising abstract {i+1}: {str(e)}")
-                
-                # Keep a placeholder if processing the summary function fails
-                summaries.append("Summary unavailable (Error in summarising)")
+        # Every call has its own budget, concurrent calls (pipeline workers, batch jobs) never share it
+        run = self._get_router().start_run(self.run_budget, len(texts)) if self.run_budget is not None else None
+
+        if self.batch_mode and (self.genai or self.llm) and len(texts) > 1:
+            return self._summarise_in_batches(texts, run)
+
+        summaries = self._run_requests(lambda i: self._summarise_item(i, texts[i], len(texts), run), range(len(texts)))
 
         logging.info(f"successfully summarised {len(summaries)} abstracts")
+        self._log_cache_stats()
+        self._log_llama_stats()
+        self._log_tier_stats()
         
-        return summaries
\ No newline at end of file
+        return summaries
+
+
+    def _run_requests(self, request, jobs):
+        """
+        Run a summarisation request for every job, with up to max_in_flight requests at once
+
+        Args:
+            request: (func)
+            jobs: (list)
+
+        Returns:
+            results: (list) in the same order as the jobs
+        """
+        jobs = list(jobs)
+
+        if self.max_in_flight > 1 and len(jobs) > 1:
+            # Several requests in flight at once, map keeps the results in the same order as the jobs
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(jobs))) as executor:
+                return list(executor.map(request, jobs))
+
+        # Summarising one by one
+        return [request(job) for job in jobs]
+
+
+    def _summarise_item(self, i, text, total, run=None):
+        """
+        Summarise one abstract of a batch, keeping a placeholder when it fails
+
+        Args:
+            i: (int) position of the abstract
+            text: (str)
+            total: (int) size of the batch
+            run: (RunBudget) budget of the Summarise_abstracts call, None for no budget
+
+        Returns:
+            Summarised Text: (str)
+        """
+        logging.info(f"summarising abstract {i+1}/{total}")
+
+        # Using the main summarise function, the router reads the budget of this call from the thread
+        _ITEM_RUN.budget = run
+        try: 
+            return self.summarise(text)
+
+        except Exception as e: 
+            logging.error(f"Error summarising abstract {i+1}: {str(e)}")
+            
+            # Keep a placeholder if processing the summary function fails
+            return SUMMARY_UNAVAILABLE
+
+        finally:
+            _ITEM_RUN.budget = None
+
+
+    def _preferred_tier(self):
+        """
+        Model tier tried first for an abstract
+
+        Returns:
+            tier: (str) "gemini" or "llama", None when no model is loaded (e.g. extractive mode)
+        """
+        if self.genai:
+            return "gemini"
+        if self.llm:
+            return "llama"
+        return None
+
+
+    def _cache_key(self, text, tier, prompt_template=None):
+        """
+        Key of an abstract in the summary cache for the summaries of a model tier
+
+        Args:
+            text: (str)
+            tier: (str) "gemini" or "llama"
+            prompt_template: (str) None uses the single abstract prompt of the tier
+
+        Returns:
+            key: (str) None when there is no cache or the tier is not a model
+        """
+        if self.cache is None:
+            return None
+
+        if tier == "gemini":
+            model, prompt = GEMINI_MODEL_NAME, GEMINI_PROMPT
+        elif tier == "llama":
+            model, prompt = f"llama:{os.path.basename(self.model_path or LLAMA_MODEL_NAME)}", LLAMA_PROMPT
+        else:
+            return None
+
+        return self.cache.make_key(text, model, prompt_template or prompt)
+
+
+    def _log_cache_stats(self):
+        """Report the summary cache savings"""
+        if self.cache is not None:
+            stats = self.cache.stats()
+            logging.info(f"Summary cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
+
+
+    def _get_extractive(self):
+        """
+        Create the extractive summariser once (NumPy is only imported when it is needed)
+
+        Returns:
+            (ExtractiveSummariser)
+        """
+        if self.extractive is None:
+            from extractive_summariser import ExtractiveSummariser
+            self.extractive = ExtractiveSummariser()
+        return self.extractive
+
+
+    def _get_gemini_model(self):
+        """
+        Create the Gemini model once and reuse it for every request
+
+        Returns:
+            (GenerativeModel)
+        """
+        if self.gemini_model is None:
+            logging.info("Creating Gemini model instance")
+            self.gemini_model = self.genai.GenerativeModel(GEMINI_MODEL_NAME)
+        return self.gemini_model
+
+
+    def _plan_batches(self, texts, token_budget=None, max_size=None):
+        """
+        Group the abstracts into batches that fit the token budget
+
+        Args:
+            texts: (list)
+            token_budget: (int) defaults to batch_token_budget
+            max_size: (int) defaults to max_batch_size
+
+        Returns:
+            batches: (list) lists of abstract positions
+        """
+        token_budget = token_budget or self.batch_token_budget
+        max_size = max_size or self.max_batch_size
+        batches = []
+        current = []
+        current_tokens = 0
+
+        for i, text in enumerate(texts):
+            # Every abstract costs its own prompt tokens plus the tokens of its summary
+            tokens = len(text) // CHARS_PER_TOKEN + SUMMARY_TOKENS
+
+            if current and (current_tokens + tokens > token_budget or len(current) >= max_size):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+
+    def summarise_batch(self, texts):
+        """
+        Summarises several abstracts with a single Gemini request that answers in JSON
+
+        Args:
+            texts: (list)
+
+        Returns:
+            Summarised Texts: (list) None for every abstract the response could not be matched to
+        """
+        abstracts = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(texts))
+        prompt = BATCH_PROMPT.format(count=len(texts), abstracts=abstracts)
+
+        summaries = [None] * len(texts)
+
+        try:
+            logging.info(f"Sending a batch of {len(texts)} abstracts to Gemini API")
+            response = self._get_router().call("gemini", lambda: self._get_gemini_model().generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            ), items=len(texts))
+            entries = self._parse_batch_response(response.text)
+
+        except Exception as e:
+            logging.error(f"The batched summary failed to generate using Gemini, Error: {str(e)}")
+            return summaries
+
+        return self._match_batch_entries(entries, summaries)
+
+
+    def summarise_local_batch(self, texts):
+        """
+        Summarises several abstracts with a single prompt to the local Llama model
+
+        The prompt starts with the same instructions for every batch, so their KV state is
+        reused from the prefix cache and only the abstracts are evaluated.
+
+        Args:
+            texts: (list)
+
+        Returns:
+            Summarised Texts: (list) None for every abstract the response could not be matched to
+        """
+        abstracts = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(texts))
+        prompt = LLAMA_BATCH_PROMPT.format(abstracts=abstracts)
+
+        summaries = [None] * len(texts)
+
+        try:
+            logging.info(f"Sending a batch of {len(texts)} abstracts to the local Llama model")
+            output = self._get_router().call("llama", lambda: self._run_llama(
+                prompt,
+                max_tokens=SUMMARY_TOKENS * len(texts),
+                stop=["</s>"],
+                echo=False
+            ), items=len(texts))
+            entries = self._parse_batch_response(output["choices"][0]["text"])
+
+        except Exception as e:
+            logging.error(f"The batched summary failed to generate using Llama, Error: {str(e)}")
+            return summaries
+
+        return self._match_batch_entries(entries, summaries)
+
+
+    def _match_batch_entries(self, entries, summaries):
+        """
+        Place the summaries of a batched response at the positions given by their ids
+
+        Args:
+            entries: (list) {"id", "summary"} objects
+            summaries: (list) one None per abstract of the batch
+
+        Returns:
+            Summarised Texts: (list)
+        """
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                position = int(entry.get("id"))
+            except (TypeError, ValueError):
+                continue
+            summary = entry.get("summary")
+
+            if 0 <= position < len(summaries) and isinstance(summary, str) and summary.strip():
+                summaries[position] = summary.strip()
+
+        return summaries
+
+
+    def _parse_batch_response(self, text):
+        """
+        Read the list of {"id", "summary"} objects out of a batched response
+
+        Args:
+            text: (str)
+
+        Returns:
+            entries: (list)
+        """
+        # Drop a markdown code fence around the JSON if the model added one
+        cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            data = data.get("summaries", [])
+        if not isinstance(data, list):
+            raise ValueError("Batched response is not a JSON array")
+
+        return data
+
+
+    def _summarise_in_batches(self, texts, run=None):
+        """
+        Summarise the abstracts in token-budgeted batches, falling back to single requests for unparsed entries
+
+        Args:
+            texts: (list)
+            run: (RunBudget) budget of the Summarise_abstracts call, used by the single requests
+
+        Returns:
+            Summarised Abstracts: (List)
+        """
+        summaries = [None] * len(texts)
+
+        # Gemini answers batches through the API, otherwise the local model reads them from a single prompt
+        if self.genai:
+            tier, prompt_template, summarise_batch = "gemini", BATCH_PROMPT, self.summarise_batch
+            token_budget, max_size = None, None
+        else:
+            tier, prompt_template, summarise_batch = "llama", LLAMA_BATCH_PROMPT, self.summarise_local_batch
+            token_budget, max_size = self._llama_context_size() - len(LLAMA_BATCH_PROMPT) // CHARS_PER_TOKEN, self.llama_batch_size
+
+        keys = [self._cache_key(text, tier, prompt_template) for text in texts]
+
+        # Only the cache misses are sent to the model
+        pending = []
+        for i, key in enumerate(keys):
+            if key is not None:
+                summaries[i] = self.cache.get(key)
+            if summaries[i] is None:
+                pending.append(i)
+
+        batches = [[pending[j] for j in batch] for batch in self._plan_batches([texts[i] for i in pending], token_budget, max_size)]
+        logging.info(f"Summarising {len(pending)} abstracts in {len(batches)} batched requests")
+
+        def run_batch(batch):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return batch, summarise_batch([texts[i] for i in batch])
+
+        results = self._run_requests(run_batch, batches)
+
+        for batch, batch_summaries in results:
+            for i, summary in zip(batch, batch_summaries):
+                summaries[i] = summary
+                if summary is not None and keys[i] is not None:
+                    self.cache.put(keys[i], summary)
+
+        # Single requests for every abstract the batched responses did not cover
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            logging.warning(f"{len(missing)} abstracts missing from the batched responses, summarising them one by one")
+            fallback = self._run_requests(lambda i: self._summarise_item(i, texts[i], len(texts), run), missing)
+            for i, summary in zip(missing, fallback):
+                summaries[i] = summary
+
+        logging.info(f"successfully summarised {len(summaries)} abstracts")
+        self._log_cache_stats()
+        self._log_llama_stats()
+        self._log_tier_stats()
+
+        return summaries
+
+
+    def _run_llama(self, prompt, **kwargs):
+        """
+        Run a prompt on the local model, one evaluation at a time, recording its token throughput
+
+        Args:
+            prompt: (str)
+            kwargs: (dict) generation options
+
+        Returns:
+            output: (dict) llama-cpp completion
+        """
+        with _LLAMA_LOCK:
+            started = time.perf_counter()
+            output = self.llm(prompt, **kwargs)
+            seconds = time.perf_counter() - started
+
+        usage = (output.get("usage") or {}) if isinstance(output, dict) else {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+
+        if self.llama_stats is None:
+            self.llama_stats = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+        self.llama_stats["calls"] += 1
+        self.llama_stats["prompt_tokens"] += prompt_tokens
+        self.llama_stats["completion_tokens"] += completion_tokens
+        self.llama_stats["seconds"] += seconds
+
+        if seconds > 0 and completion_tokens:
+            logging.info(f"Llama generated {completion_tokens} tokens in {seconds:.2f}s ({completion_tokens / seconds:.1f} tokens/sec)")
+
+        return output
+
+
+    def llama_throughput(self):
+        """
+        Token throughput of the local model so far
+
+        Returns:
+            stats: (dict) calls, prompt and completion tokens, seconds and tokens/sec
+        """
+        stats = dict(self.llama_stats or {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0})
+        seconds = stats["seconds"]
+        stats["tokens_per_sec"] = (stats["prompt_tokens"] + stats["completion_tokens"]) / seconds if seconds else 0.0
+        stats["completion_tokens_per_sec"] = stats["completion_tokens"] / seconds if seconds else 0.0
+        return stats
+
+
+    def _log_llama_stats(self):
+        """Report the local model throughput"""
+        if self.llama_stats:
+            stats = self.llama_throughput()
+            logging.info(
+                f"Llama: {stats['calls']} calls, {stats['prompt_tokens']} prompt and {stats['completion_tokens']} completion tokens "
+                f"in {stats['seconds']:.1f}s ({stats['tokens_per_sec']:.1f} tokens/sec, {stats['completion_tokens_per_sec']:.1f} generated tokens/sec)"
+            )
+
+
+    def _llama_context_size(self):
+        """Context size of the loaded local model"""
+        n_ctx = getattr(self.llm, "n_ctx", None)
+        if callable(n_ctx):
+            try:
+                return int(n_ctx())
+            except (TypeError, ValueError):
+                pass
+        return self.llama_ctx or LLAMA_DEFAULT_CTX
+
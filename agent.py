@@ -1,9 +1,22 @@
 from instruction_parser import InstructionParser
 from Controller import Controller
+from web_scraper import WebScraper
+from http_cache import HttpCache
+from paginator import Paginator
+from abstract_summariser import AbstractSummariser, SUMMARISER_MODES
+from Output_Structurer import OutputStructurer, STREAM_FORMATS
+from paper_index import PaperIndex, INDEX_MODES, normalise_arxiv_id
+from watermarks import WatermarkStore
+from arrow_sink import ArrowSink, EXPORT_FORMATS
+from sqlite_sink import SqliteSink
 import sys
+import os
+import glob
 import json 
+import time
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Logging Configuration
 logging.basicConfig(
@@ -24,16 +37,19 @@ class Agent:
     Main class to run the Agent
     """
 
-    def __init__(self, parser=None):
+    def __init__(self, parser=None, controller=None, watermarks=None):
         """
         Initialise the parser method and the agent controller
 
         Args:
             parser: (func)
+            controller: (Controller)
+            watermarks: (WatermarkStore) optional, runs are incremental: only papers new since the last run are output
         """
 
         self.parser = parser if parser is not None else InstructionParser()
-        self.controller = Controller() # supports call for custom components/modules as an arg
+        self.controller = controller if controller is not None else Controller() # supports call for custom components/modules as an arg
+        self.watermarks = watermarks
 
 
     def run(self, instructions_file_path):
@@ -55,6 +71,9 @@ class Agent:
             actions = self.parser.parse_file(instructions_file_path)
             logging.info(f"Agent: Parsed the instructions file successfully")
 
+            if self.watermarks is not None:
+                return self._run_incremental(instructions_file_path, actions)
+
             # Execute actions
             workflow_output = self.controller.execute_actions(actions)
             logging.info("Agent: Executed actions successfully")
@@ -66,19 +85,446 @@ class Agent:
             return json.dumps({"error": str(e)})
 
 
-def main():
+    def _run_incremental(self, instructions_file_path, actions):
+        """
+        Run the actions against the watermark of the instruction file: pagination stops at the papers output by
+        the last run and only the new papers are summarised and output, then the watermark moves forward
+
+        Args:
+            instructions_file_path: (str)
+            actions: (list)
+
+        Returns:
+            workflow output: (json)
+        """
+        key, controller = self._incremental_controller(instructions_file_path)
+
+        workflow_output = controller.execute_actions(actions)
+
+        papers = json.loads(workflow_output).get("papers", [])
+        new = self.watermarks.update(key, [normalise_arxiv_id(paper.get("link")) for paper in papers])
+        logging.info(f"Agent: Executed actions incrementally, {new} new papers since the last run")
+
+        return workflow_output
+
+
+    def _incremental_controller(self, instructions_file_path):
+        """
+        Controller for an incremental run of an instruction file, carrying the watermark of its earlier runs
+
+        Args:
+            instructions_file_path: (str)
+
+        Returns:
+            tuple: (watermark key, Controller)
+        """
+        key = WatermarkStore.key(instructions_file_path)
+        seen = self.watermarks.seen(key)
+
+        # The watermark belongs to this run only, the shared controller is left untouched
+        controller = self.controller.clone()
+        controller.watermark = seen if seen is not None else set()
+
+        return key, controller
+
+
+    def stream(self, instructions_file_path, stream, output_format="ndjson"):
+        """
+        Run the AI Agent and write every paper to the stream as soon as it is ready
+
+        Args:
+            instructions_file_path: (str)
+            stream: (file object)
+            output_format: (str) "ndjson" or "json"
+
+        Returns:
+            count: (int) number of papers written, None when the workflow failed
+        """
+        try:
+
+            logging.info(f"Streaming Agent output for {instructions_file_path}")
+
+            actions = self.parser.parse_file(instructions_file_path)
+            logging.info(f"Agent: Parsed the instructions file successfully")
+
+            papers = self.controller.stream_actions(actions)
+            count = self.controller.structurer.stream_output(papers, stream, output_format)
+            logging.info(f"Agent: Streamed {count} papers successfully")
+
+            return count
+
+        except Exception as e:
+            logging.error(f"Agent workflow failed: {str(e)}")
+            return None
+
+
+    def export(self, instructions_file_path, sink):
+        """
+        Run the AI Agent and write every paper to a sink (e.g. ArrowSink) as soon as it is ready, without building the JSON output
+
+        In incremental mode only the papers new since the last run are written, and the watermark moves forward once they are.
+
+        Args:
+            instructions_file_path: (str)
+            sink: (ArrowSink or SqliteSink) closed once the papers are written
+
+        Returns:
+            count: (int) number of papers written, None when the workflow failed
+        """
+        try:
+
+            logging.info(f"Exporting Agent output for {instructions_file_path}")
+
+            actions = self.parser.parse_file(instructions_file_path)
+            logging.info(f"Agent: Parsed the instructions file successfully")
+
+            key, controller = (None, self.controller) if self.watermarks is None else self._incremental_controller(instructions_file_path)
+            arxiv_ids = []
+
+            def papers():
+                # Sinks store more than the extracted fields (e.g. the abstract and the fetch time)
+                for paper in controller.stream_actions(actions, fields=sink.fields):
+                    arxiv_ids.append(normalise_arxiv_id(paper.get("link")))
+                    yield paper
+
+            count = sink.write_papers(papers())
+            logging.info(f"Agent: Exported {count} papers successfully")
+
+            if key is not None:
+                # The watermark only moves once the papers are written
+                sink.flush()
+                new = self.watermarks.update(key, arxiv_ids)
+                logging.info(f"Agent: Exported incrementally, {new} new papers since the last run")
+
+            return count
+
+        except Exception as e:
+            logging.error(f"Agent workflow failed: {str(e)}")
+            return None
+
+        finally:
+            sink.close()
+
+
+    def run_batch(self, instruction_files, output_dir, max_workers=4, report_name="batch_report.json", sink=None):
+        """
+        Run many instruction files in this process on a shared worker pool
+
+        Every job gets its own controller state but shares the parser, the scraper (and its HTTP session)
+        and the loaded summariser, so start-up and model loading are only paid once.
+
+        Args:
+            instruction_files: (list) paths of the instruction files
+            output_dir: (str) directory receiving one output file per job and the summary report
+            max_workers: (int) jobs running at the same time
+            report_name: (str) file name of the summary report
+            sink: (SqliteSink) optional, receives the papers of every job (left open)
+
+        Returns:
+            report: (dict) totals and the status of every job
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        output_paths = batch_output_paths(instruction_files, output_dir)
+
+        logging.info(f"Running a batch of {len(instruction_files)} instruction files with {max_workers} workers")
+        started = time.perf_counter()
+
+        def run_job(job):
+            instructions_file, output_path = job
+            job_started = time.perf_counter()
+
+            # Fresh controller state per job, components shared with the other jobs
+            result = Agent(parser=self.parser, controller=self.controller.clone(), watermarks=self.watermarks).run(instructions_file)
+
+            with open(output_path, "w", encoding="utf-8") as file:
+                file.write(result)
+
+            if sink is not None:
+                # Every job commits its papers, the sink is shared by the workers
+                sink.write_papers(json.loads(result).get("papers", []))
+                sink.flush()
+
+            return job_report(instructions_file, output_path, result, time.perf_counter() - job_started)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            jobs = list(executor.map(run_job, zip(instruction_files, output_paths)))
+
+        succeeded = sum(1 for job in jobs if job["status"] == "ok")
+        report = {
+            "jobs": jobs,
+            "total": len(jobs),
+            "succeeded": succeeded,
+            "failed": len(jobs) - succeeded,
+            "papers": sum(job["papers"] for job in jobs),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+        with open(os.path.join(output_dir, report_name), "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+        logging.info(f"Batch finished: {succeeded}/{len(jobs)} jobs succeeded in {report['seconds']}s")
+        return report
+
+
+def collect_instruction_files(source):
+    """
+    Instruction files of a directory (every .txt file) or a glob pattern
+
+    Args:
+        source: (str)
+
+    Returns:
+        paths: (list) sorted
+    """
+    pattern = os.path.join(source, "*.txt") if os.path.isdir(source) else source
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def batch_output_paths(instruction_files, output_dir):
+    """
+    Output file of every job, named after its instruction file (numbered when two files share a name)
+
+    Args:
+        instruction_files: (list)
+        output_dir: (str)
+
+    Returns:
+        paths: (list)
+    """
+    paths = []
+    used = set()
+
+    for instructions_file in instruction_files:
+        stem = os.path.splitext(os.path.basename(instructions_file))[0]
+        name = f"{stem}.json"
+        count = 1
+        while name in used:
+            count += 1
+            name = f"{stem}_{count}.json"
+        used.add(name)
+        paths.append(os.path.join(output_dir, name))
+
+    return paths
+
+
+def job_report(instructions_file, output_path, result, seconds):
+    """
+    Summary of a finished job for the batch report
+
+    Args:
+        instructions_file: (str)
+        output_path: (str)
+        result: (json) output of Agent.run
+        seconds: (float)
+
+    Returns:
+        report: (dict)
+    """
+    try:
+        output = json.loads(result)
+    except ValueError:
+        output = {"error": "Output is not valid JSON"}
+
+    error = output.get("error") if isinstance(output, dict) else None
+    papers = output.get("papers", []) if isinstance(output, dict) and not error else []
+
+    return {
+        "instructions_file": instructions_file,
+        "output_file": output_path,
+        "status": "error" if error else "ok",
+        "error": error,
+        "papers": len(papers) if isinstance(papers, list) else 0,
+        "seconds": round(seconds, 3),
+    }
+
+
+def build_controller(args):
+    """
+    Build the controller for the command-line options
+
+    Args:
+        args: (argparse.Namespace)
+
+    Returns:
+        (Controller) None to use the default components
+    """
+    scraper_options = args.http_cache or args.offline or args.parser != "auto" or args.rate_limit
+    summariser_options = args.summariser != "auto"
+    if not scraper_options and not summariser_options and not args.max_results and not args.pipeline and not args.compact and not args.index:
+        return None
+
+    scraper = None
+    if scraper_options:
+        cache = HttpCache(args.http_cache or "http_cache.sqlite") if args.http_cache or args.offline else None
+        scraper = WebScraper(cache=cache, offline=args.offline, parser=args.parser, rate_limit=args.rate_limit)
+
+    paginator = Paginator(max_results=args.max_results) if args.max_results else None
+
+    structurer = OutputStructurer(compact=True) if args.compact else None
+    summariser = AbstractSummariser(mode=args.summariser) if summariser_options else None
+    index = PaperIndex(args.index) if args.index else None
+
+    return Controller(
+        scraper=scraper, summariser=summariser, structurer=structurer, paginator=paginator, pipeline=args.pipeline,
+        index=index, index_mode=args.index_mode
+    )
+
+
+def add_component_options(parser):
+    """
+    Command-line options configuring the controller components
+
+    Args:
+        parser: (argparse.ArgumentParser)
+    """
+    parser.add_argument("--http-cache", help="Path to a persistent HTTP response cache (SQLite file)")
+    parser.add_argument("--offline", action="store_true", help="Replay pages from the HTTP cache only, never use the network")
+    parser.add_argument("--max-results", type=int, help="Follow the search result pages up to this many papers")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second allowed per host, shared by every concurrent fetch")
+    parser.add_argument("--parser", default="auto", choices=["auto", "html.parser", "lxml", "selectolax"], help="HTML parser backend")
+    parser.add_argument("--pipeline", action="store_true", help="Stream papers from extraction to summarisation through bounded queues")
+    parser.add_argument("--compact", action="store_true", help="Write the JSON without indentation")
+    parser.add_argument("--index", help="Path to a persistent index of the papers processed by earlier runs (SQLite file)")
+    parser.add_argument("--index-mode", default="skip", choices=INDEX_MODES, help="Reuse the stored summaries of known papers (skip) or only output new papers (new)")
+    parser.add_argument("--summariser", default="auto", choices=SUMMARISER_MODES, help="Summarisation mode: models with fallbacks, or CPU extractive summaries only")
+
+
+def add_incremental_options(parser):
+    """
+    Command-line options of the incremental mode
+
+    Args:
+        parser: (argparse.ArgumentParser)
+    """
+    parser.add_argument("--incremental", action="store_true", help="Only output the papers new since the last run of each instruction file")
+    parser.add_argument("--watermarks", default="watermarks.json", help="File keeping the papers output by the earlier incremental runs")
+
+
+def run_many(argv):
+    """
+    Command-line entry point of the batch runner: agent.py run-many <directory or glob>
+
+    Args:
+        argv: (list) arguments after run-many
+
+    Returns:
+        exit code: (int)
+    """
+    parser = argparse.ArgumentParser(prog="agent.py run-many", description="Run many instruction files in one process")
+    parser.add_argument("source", help="Directory of .txt instruction files or a glob pattern")
+    parser.add_argument("--output-dir", default="batch_output", help="Directory for the job outputs and the summary report")
+    parser.add_argument("--workers", type=int, default=4, help="Jobs running at the same time")
+    parser.add_argument("--sqlite", help="Also upsert the papers of every job into this SQLite database")
+    add_component_options(parser)
+    add_incremental_options(parser)
+
+    args = parser.parse_args(argv)
+
+    instruction_files = collect_instruction_files(args.source)
+    if not instruction_files:
+        logging.error(f"No instruction files found for {args.source}")
+        return 1
+
+    agent = Agent(controller=build_controller(args), watermarks=WatermarkStore(args.watermarks) if args.incremental else None)
+    sink = SqliteSink(args.sqlite) if args.sqlite else None
+    try:
+        report = agent.run_batch(instruction_files, args.output_dir, max_workers=args.workers, sink=sink)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    print(json.dumps({key: value for key, value in report.items() if key != "jobs"}, indent=2))
+    return 0 if report["failed"] == 0 else 1
+
+
+def serve(argv):
+    """
+    Command-line entry point of the resident service: agent.py serve
+
+    Args:
+        argv: (list) arguments after serve
+
+    Returns:
+        exit code: (int)
+    """
+    from agent_server import AgentServer
+
+    parser = argparse.ArgumentParser(prog="agent.py serve", description="Keep the agent loaded and run jobs sent to a local HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs running at the same time")
+    parser.add_argument("--max-queue", type=int, default=100, help="Jobs waiting to run before new ones are refused")
+    add_component_options(parser)
+
+    args = parser.parse_args(argv)
+
+    # Components (and the summariser model) are loaded once, before the first job arrives
+    agent = Agent(controller=build_controller(args))
+    if hasattr(agent.controller.summariser, "warm_up"):
+        agent.controller.summariser.warm_up()
+    AgentServer(agent, host=args.host, port=args.port, workers=args.workers, max_queue=args.max_queue).serve_forever()
+    return 0
+
+
+def main(argv=None):
     """Main entry point for command-line execution."""
 
-    parser = argparse.ArgumentParser(description="AI Agent that follows instructions")
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "run-many":
+        return run_many(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve(argv[1:])
+
+    parser = argparse.ArgumentParser(description="AI Agent that follows instructions (or: agent.py run-many <directory or glob>, agent.py serve)")
     parser.add_argument("instructions_file", help="Path to the instructions file")
+    add_component_options(parser)
+    add_incremental_options(parser)
+    parser.add_argument("--stream", choices=STREAM_FORMATS, help="Write papers as they become available: one per line (ndjson) or a streamed JSON document")
+    parser.add_argument("--output", help="Write the output to this file instead of stdout")
+    sinks = parser.add_mutually_exclusive_group()
+    sinks.add_argument("--export", help="Write the papers to this Parquet or Arrow file (a dataset directory with --append) instead of JSON")
+    sinks.add_argument("--sqlite", help="Upsert the papers into this SQLite database (keyed by arXiv id) instead of JSON")
+    parser.add_argument("--export-format", default="parquet", choices=EXPORT_FORMATS, help="Format of the --export file")
+    parser.add_argument("--append", action="store_true", help="Add the papers to the --export dataset directory as a new part file")
+    parser.add_argument("--row-group-size", type=int, default=10000, help="Papers per row group of the --export file")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    agent = Agent()
+    agent = Agent(controller=build_controller(args), watermarks=WatermarkStore(args.watermarks) if args.incremental else None)
+
+    if args.export:
+        try:
+            sink = ArrowSink(args.export, args.export_format, row_group_size=args.row_group_size, append=args.append,
+                             source=args.instructions_file)
+        except ImportError as e:
+            logging.error(str(e))
+            return 1
+        count = agent.export(args.instructions_file, sink)
+        return 0 if count is not None else 1
+
+    if args.sqlite:
+        count = agent.export(args.instructions_file, SqliteSink(args.sqlite, source=args.instructions_file))
+        return 0 if count is not None else 1
+
+    if args.stream:
+        if args.incremental:
+            logging.warning("The incremental mode does not apply to streamed output, running a full search")
+        stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            count = agent.stream(args.instructions_file, stream, args.stream)
+        finally:
+            if args.output:
+                stream.close()
+        return 0 if count is not None else 1
+
     result = agent.run(args.instructions_file)
     
     # Print result
-    print(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(result)
+    else:
+        print(result)
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,324 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Marker telling a worker thread to stop
+_STOP_WORKER = object()
+
+
+class AgentServer:
+
+    """Resident agent service: keeps the controller components (HTTP session, loaded summariser) warm
+    and runs instruction jobs submitted over a local HTTP/JSON API
+
+    Endpoints:
+        POST /jobs          instruction text (text/plain, or JSON {"instructions": ...}), ?wait=1 waits for the result
+        GET  /jobs/<id>     status of a job, with its result once finished
+        GET  /health        queue and worker status
+    """
+
+    def __init__(self, agent, host="127.0.0.1", port=8765, workers=2, max_queue=100, max_jobs_kept=1000):
+        """
+        Initialise the service around an agent
+
+        Args:
+            agent: (Agent) its parser and controller components are shared by every job
+            host: (str) interface to listen on, local only by default
+            port: (int) 0 picks a free port
+            workers: (int) jobs running at the same time
+            max_queue: (int) jobs waiting to run before new submissions are refused
+            max_jobs_kept: (int) finished jobs kept for their results, oldest dropped first
+        """
+        self.agent = agent
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.max_jobs_kept = max(1, max_jobs_kept)
+
+        self.queue = queue.Queue(maxsize=max(1, max_queue))
+        self.jobs = OrderedDict() # job id -> job
+        self.lock = threading.Lock()
+        self.accepting = False
+        self.httpd = None
+        self.threads = []
+
+
+    @property
+    def url(self):
+        """Base url of the running service"""
+        return f"http://{self.host}:{self.port}"
+
+
+    def start(self):
+        """
+        Start the worker threads and the HTTP endpoint in the background
+
+        Returns:
+            (AgentServer)
+        """
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.accepting = True
+
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+        self.threads.append(threading.Thread(target=self.httpd.serve_forever, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+        logging.info(f"Agent service listening on {self.url} with {self.workers} workers")
+        return self
+
+
+    def serve_forever(self):
+        """Run the service until interrupted (Ctrl+C or SIGTERM), then shut down gracefully"""
+        import signal
+
+        stopped = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+
+        self.start()
+        try:
+            while not stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+
+    def shutdown(self, timeout=None):
+        """
+        Stop accepting jobs, finish the queued and running ones, then stop the workers and the endpoint
+
+        Args:
+            timeout: (float) seconds to wait for the workers, None waits for every queued job
+        """
+        logging.info("Agent service shutting down, finishing queued jobs")
+        with self.lock:
+            self.accepting = False
+
+        # Workers take the stop markers only after the jobs queued before them
+        for _ in range(self.workers):
+            self.queue.put(_STOP_WORKER)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self.threads[:self.workers]:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+        logging.info("Agent service stopped")
+
+
+    def submit(self, instructions):
+        """
+        Queue an instruction job
+
+        Args:
+            instructions: (str) text of an instructions file
+
+        Returns:
+            job: (dict) None when the service is shutting down or the queue is full
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "instructions": instructions,
+            "result": None,
+            "error": None,
+            "submitted": time.time(),
+            "finished": None,
+            "done": threading.Event(),
+        }
+
+        # Checked and queued under the lock so no job lands behind the stop markers of a shutdown
+        with self.lock:
+            if not self.accepting:
+                return None
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                return None
+
+            self.jobs[job["id"]] = job
+            self._drop_old_jobs()
+
+        logging.info(f"Queued job {job['id']}")
+        return job
+
+
+    def get_job(self, job_id):
+        """
+        Look up a job
+
+        Args:
+            job_id: (str)
+
+        Returns:
+            job: (dict) None when unknown
+        """
+        with self.lock:
+            return self.jobs.get(job_id)
+
+
+    def job_status(self, job):
+        """
+        Public view of a job
+
+        Args:
+            job: (dict)
+
+        Returns:
+            status: (dict)
+        """
+        status = {"id": job["id"], "status": job["status"]}
+        if job["status"] == "finished":
+            status["result"] = job["result"]
+        elif job["status"] == "failed":
+            status["error"] = job["error"]
+        return status
+
+
+    def health(self):
+        """
+        Queue and worker status
+
+        Returns:
+            (dict)
+        """
+        with self.lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+
+        return {
+            "status": "ok" if self.accepting else "shutting down",
+            "workers": self.workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "finished": statuses.count("finished"),
+            "failed": statuses.count("failed"),
+        }
+
+
+    def _work(self):
+        """Worker loop: run queued jobs until the stop marker"""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is _STOP_WORKER:
+                    return
+                self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+
+    def _run_job(self, job):
+        """
+        Run a job with a fresh controller state sharing the warm components
+
+        Args:
+            job: (dict)
+        """
+        job["status"] = "running"
+        logging.info(f"Running job {job['id']}")
+
+        try:
+            actions = self.agent.parser.parse_text(job["instructions"])
+            if not actions:
+                raise ValueError("No actions found in the instructions")
+
+            output = self.agent.controller.clone().execute_actions(actions)
+            job["result"] = json.loads(output)
+            job["status"] = "finished"
+
+        except Exception as e:
+            logging.error(f"Job {job['id']} failed: {str(e)}")
+            job["error"] = str(e)
+            job["status"] = "failed"
+
+        finally:
+            job["finished"] = time.time()
+            job["done"].set()
+
+
+    def _drop_old_jobs(self):
+        """Forget the oldest finished jobs beyond the number kept (called with the lock held)"""
+        excess = len(self.jobs) - self.max_jobs_kept
+        if excess <= 0:
+            return
+
+        for job_id in [job_id for job_id, job in self.jobs.items() if job["done"].is_set()][:excess]:
+            del self.jobs[job_id]
+
+
+    def _handler(self):
+        """Request handler class bound to this service"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                path = urlparse(self.path).path.rstrip("/")
+
+                if path == "/health":
+                    return self._send(200, server.health())
+
+                if path.startswith("/jobs/"):
+                    job = server.get_job(path[len("/jobs/"):])
+                    if job is None:
+                        return self._send(404, {"error": "Unknown job"})
+                    return self._send(200, server.job_status(job))
+
+                self._send(404, {"error": "Not found"})
+
+
+            def do_POST(self):
+                parts = urlparse(self.path)
+                if parts.path.rstrip("/") != "/jobs":
+                    return self._send(404, {"error": "Not found"})
+
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+                instructions = body
+
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    try:
+                        instructions = json.loads(body).get("instructions")
+                    except (ValueError, AttributeError):
+                        instructions = None
+
+                if not instructions or not instructions.strip():
+                    return self._send(400, {"error": "No instructions given"})
+
+                job = server.submit(instructions)
+                if job is None:
+                    return self._send(503, {"error": "The service is busy or shutting down"})
+
+                # Synchronous call: wait for the result instead of returning the job id
+                if parse_qs(parts.query).get("wait", ["0"])[0] not in ("0", "false", ""):
+                    job["done"].wait()
+                    return self._send(200, server.job_status(job))
+
+                self._send(202, server.job_status(job))
+
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+
+            def log_message(self, format, *args):
+                logging.debug(f"Agent service: {format % args}")
+
+        return Handler
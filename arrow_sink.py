@@ -0,0 +1,189 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from paper_index import normalise_arxiv_id
+
+# Export formats: Parquet files, or Arrow IPC files (Feather v2)
+EXPORT_FORMATS = ["parquet", "arrow"]
+
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _import_pyarrow():
+    """pyarrow is optional, only the export needs it"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError("The Arrow/Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def paper_schema(pa):
+    """
+    Arrow schema of the exported papers
+
+    Args:
+        pa: (module) pyarrow
+
+    Returns:
+        (pyarrow.Schema)
+    """
+    return pa.schema([
+        ("arxiv_id", pa.string()),
+        ("title", pa.string()),
+        ("authors", pa.list_(pa.string())),
+        ("link", pa.string()),
+        ("abstract", pa.string()),
+        ("summary", pa.string()),
+        # Fetch metadata
+        ("source", pa.string()),
+        ("fetched_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+# Record fields the pipeline keeps for the export, in addition to the extracted ones
+SINK_FIELDS = ["link", "abstract", "fetched_at"]
+
+
+class ArrowSink:
+
+    """Writes papers to a Parquet or Arrow IPC file as they arrive, one row group (record batch) every
+    row_group_size papers, so a crawl never holds more than a row group in memory
+
+    With append=True the path is a dataset directory and every run adds a new part file to it,
+    readable as one table with pyarrow.dataset (or pandas.read_parquet on the directory).
+    """
+
+    def __init__(self, path, output_format="parquet", row_group_size=10000, append=False, source=None, metadata=None):
+        """
+        Open the output file
+
+        Args:
+            path: (str) output file, or dataset directory when appending
+            output_format: (str) "parquet" or "arrow"
+            row_group_size: (int) papers per row group
+            append: (bool) add a part file to the dataset directory instead of replacing the file
+            source: (str) where the papers come from (e.g. the instructions file), stored with every paper
+            metadata: (dict) key-value pairs stored in the file schema
+        """
+        self.fields = SINK_FIELDS
+
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {output_format}")
+
+        self.pa = _import_pyarrow()
+        self.output_format = output_format
+        self.row_group_size = max(1, row_group_size)
+        self.source = source
+        self.schema = paper_schema(self.pa).with_metadata({
+            "created": datetime.now(timezone.utc).isoformat(),
+            **{str(key): str(value) for key, value in (metadata or {}).items()},
+        })
+
+        self.path = self._part_path(path, output_format) if append else path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if output_format == "parquet":
+            self.writer = self.pa.parquet.ParquetWriter(self.path, self.schema, compression="zstd")
+        else:
+            self.writer = self.pa.ipc.new_file(self.path, self.schema)
+
+        self.columns = {name: [] for name in self.schema.names}
+        self.count = 0
+        self.row_groups = 0
+
+
+    def write(self, paper):
+        """
+        Add a paper, writing a row group once enough papers are buffered
+
+        Args:
+            paper: (dict or PaperRecord)
+        """
+        link = paper.get("link")
+        row = {
+            "arxiv_id": normalise_arxiv_id(link),
+            "title": paper.get("title"),
+            "authors": paper.get("authors"),
+            "link": link,
+            "abstract": paper.get("abstract"),
+            "summary": paper.get("summary"),
+            "source": self.source,
+            # Papers that were not fetched by the pipeline are stamped when written
+            "fetched_at": paper.get("fetched_at") or datetime.now(timezone.utc),
+        }
+        for name, value in row.items():
+            self.columns[name].append(value)
+
+        self.count += 1
+        if len(self.columns["arxiv_id"]) >= self.row_group_size:
+            self.flush()
+
+
+    def write_papers(self, papers):
+        """
+        Write every paper of an iterable, e.g. Controller.stream_actions
+
+        Args:
+            papers: (iterable)
+
+        Returns:
+            count: (int) papers written by this call
+        """
+        started = self.count
+        for paper in papers:
+            self.write(paper)
+        return self.count - started
+
+
+    def flush(self):
+        """Write the buffered papers as a row group"""
+        if not self.columns["arxiv_id"]:
+            return
+
+        batch = self.pa.RecordBatch.from_pydict(self.columns, schema=self.schema)
+        if self.output_format == "parquet":
+            self.writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self.writer.write_batch(batch)
+
+        self.row_groups += 1
+        self.columns = {name: [] for name in self.schema.names}
+
+
+    def close(self):
+        """Write the last row group and close the file"""
+        self.flush()
+        self.writer.close()
+        logging.info(f"Exported {self.count} papers in {self.row_groups} row groups to {self.path}")
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    @staticmethod
+    def _part_path(directory, output_format):
+        """
+        New part file of a dataset directory
+
+        Args:
+            directory: (str)
+            output_format: (str)
+
+        Returns:
+            path: (str)
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        number = len([name for name in os.listdir(directory) if name.startswith("part-")])
+        return os.path.join(directory, f"part-{number:05d}-{stamp}{FILE_EXTENSIONS[output_format]}")
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the agent components, run from the project root e.g. python benchmarks/bench_items_extractor.py
+"""
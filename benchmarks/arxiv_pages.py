@@ -0,0 +1,89 @@
+import random
+
+WORDS = (
+    "policy optimisation reinforcement learning language model reward group relative "
+    "reasoning alignment preference training sample efficiency benchmark agent "
+    "transformer gradient variance baseline evaluation mathematical tasks"
+).split()
+
+
+def build_results_page(num_results, seed=0):
+    """
+    Build an arXiv search results page with the real page structure and varied content
+
+    Args:
+        num_results: (int)
+        seed: (int)
+
+    Returns:
+        html: (str)
+    """
+    rng = random.Random(seed)
+    results = []
+
+    for n in range(num_results):
+        arxiv_id = f"25{rng.randint(1, 12):02d}.{rng.randint(0, 99999):05d}"
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize()
+        authors = ",\n".join(
+            f'<a href="/search/?searchtype=author&amp;query=Author+{rng.randint(0, 5000)}">Author {rng.randint(0, 5000)}</a>'
+            for _ in range(rng.randint(1, 12))
+        )
+        abstract = ". ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize()
+            for _ in range(rng.randint(4, 10))
+        )
+
+        results.append(f"""
+    <li class="arxiv-result">
+      <div class="is-marginless">
+        <p class="list-title is-inline-block"><a href="https://arxiv.org/abs/{arxiv_id}">arXiv:{arxiv_id}</a>
+          <span>&nbsp;[<a href="https://arxiv.org/pdf/{arxiv_id}">pdf</a>, <a href="https://arxiv.org/format/{arxiv_id}">other</a>]&nbsp;</span>
+        </p>
+        <div class="tags is-inline-block">
+          <span class="tag is-small is-link tooltip is-tooltip-top" data-tooltip="Machine Learning (cs.LG)">cs.LG</span>
+          <span class="tag is-small is-grey tooltip is-tooltip-top" data-tooltip="Artificial Intelligence (cs.AI)">cs.AI</span>
+        </div>
+      </div>
+      <p class="title is-5 mathjax">
+        {title}
+      </p>
+      <p class="authors">
+        <span class="search-hit">Authors:</span>
+        {authors}
+      </p>
+      <p class="abstract mathjax">
+        <span class="has-text-black-bis has-text-weight-semibold">Abstract</span>:
+        <span class="abstract-short has-text-grey-dark mathjax" id="{arxiv_id}v1-abstract-short" style="display: inline;">
+          {abstract[:300]}&hellip;
+          <a class="is-size-7" style="white-space: nowrap;" onclick="document.getElementById('{arxiv_id}v1-abstract-full').style.display = 'inline';">&#9661; More</a>
+        </span>
+        <span class="abstract-full has-text-grey-dark mathjax" id="{arxiv_id}v1-abstract-full" style="display: none;">
+          {abstract}
+          <a class="is-size-7" style="white-space: nowrap;" onclick="document.getElementById('{arxiv_id}v1-abstract-short').style.display = 'inline';">&#9651; Less</a>
+        </span>
+      </p>
+      <p class="is-size-7"><span class="has-text-black-bis has-text-weight-semibold">Submitted</span> {rng.randint(1, 28)} March, 2025;
+        <span class="has-text-black-bis has-text-weight-semibold">originally announced</span> March 2025.</p>
+    </li>""")
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"/><title>Search | arXiv e-print repository</title></head>
+<body>
+  <main>
+    <div class="content">
+      <div class="level is-marginless">
+        <div class="level-left">
+          <h1 class="title is-clearfix">
+            Showing 1&ndash;{num_results} of {num_results:,} results for all: <span class="mathjax">grpo</span>
+          </h1>
+        </div>
+      </div>
+      <ol class="breathe-horizontal" start="1">
+        {"".join(results)}
+      </ol>
+    </div>
+  </main>
+</body>
+</html>
+"""
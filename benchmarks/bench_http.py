@@ -0,0 +1,109 @@
+"""
+Benchmark: requests per second of the WebScraper HTTP layer at different concurrency levels against a local keep-alive
+server, with the default requests connection pool, the tuned pool and (when httpx[http2] is installed) the HTTP/2 backend
+
+The server answers over HTTP/1.1 keep-alive with an artificial latency and gzips the page when the client accepts it.
+Pages are fetched (with the timeouts, retries and decompression) but not parsed, so the parser does not hide the network.
+
+Usage:
+    python benchmarks/bench_http.py --concurrency 1 4 16 32 --requests 400
+    python benchmarks/bench_http.py --latency 0.02 --results 50
+"""
+import argparse
+import gzip
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from http_backends import http2_available
+from web_scraper import WebScraper
+from benchmarks.arxiv_pages import build_results_page
+
+
+def start_server(page, latency):
+    """Local keep-alive server returning the page after the latency"""
+    body = page.encode("utf-8")
+    compressed = gzip.compress(body)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep connections alive between requests
+        disable_nagle_algorithm = True # headers and body are written separately
+
+        def do_GET(self):
+            time.sleep(latency)
+            gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            data = compressed if gzipped else body
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def requests_per_second(scraper, base_url, num_requests):
+    """Requests per second with max_concurrency requests in flight"""
+    urls = [f"{base_url}/page{i}" for i in range(num_requests)]
+
+    with ThreadPoolExecutor(max_workers=scraper.max_concurrency) as executor:
+        started = time.perf_counter()
+        pages = list(executor.map(scraper._get_text, urls))
+        elapsed = time.perf_counter() - started
+
+    assert all(pages)
+    return num_requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the WebScraper HTTP backends")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32, 64], help="Concurrent fetches")
+    parser.add_argument("--requests", type=int, default=400, help="Pages fetched per measurement")
+    parser.add_argument("--latency", type=float, default=0.02, help="Server latency per request in seconds")
+    parser.add_argument("--results", type=int, default=5, help="Results on the served page")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    server = start_server(build_results_page(args.results), args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    backends = {
+        "default pool": lambda c: WebScraper(session=requests.Session(), max_concurrency=c, per_host_limit=c, parser="html.parser"),
+        "tuned pool": lambda c: WebScraper(max_concurrency=c, per_host_limit=c, parser="html.parser"),
+    }
+    if http2_available():
+        backends["http2"] = lambda c: WebScraper(max_concurrency=c, per_host_limit=c, parser="html.parser", http2=True)
+    else:
+        print("httpx[http2] is not installed, skipping the HTTP/2 backend")
+
+    print(f"{'concurrency':>11} " + " ".join(f"{name + ' (req/s)':>20}" for name in backends))
+    for concurrency in args.concurrency:
+        rates = []
+        for build in backends.values():
+            scraper = build(concurrency)
+            requests_per_second(scraper, base_url, min(args.requests, 2 * concurrency)) # warm the connection pool
+            rates.append(requests_per_second(scraper, base_url, args.requests))
+
+        print(f"{concurrency:>11} " + " ".join(f"{rate:>20.0f}" for rate in rates))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
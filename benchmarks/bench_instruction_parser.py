@@ -0,0 +1,144 @@
+"""
+Benchmark: the parser before the plan cache (every pattern searched on every line) against the combined
+regex dispatch, both parsing the instructions every time, and against a plan cache hit
+
+The baseline is the previous parse_text, unchanged. re keeps its own cache of compiled patterns, so the
+baseline runs once before it is timed and is measured with that cache warm, as a long-running service would.
+
+Usage:
+    python benchmarks/bench_instruction_parser.py --lines 100 1000 10000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instruction_parser import InstructionParser
+
+LINES = [
+    "- goto: https://arxiv.org/search/?query=grpo&searchtype=all&source=header",
+    "- extract title, authors, links and abstracts",
+    "- summarise abstracts",
+    "- a note that is not an action",
+]
+RETURN_LINE = '- Return the data in a structured format: ```{"papers": {"title": <title>, "link": <link>}}```'
+
+BASELINE_ACTION_STYLES = {
+    "goto": r"goto:\s*(https?://\S+)",
+    "extract": r"extract\s+(.+?)(?=$|\n|-\s)",
+    "summarise": r"summari[sz]e\s+(.+?)(?=$|\n|-\s)",
+    "Return": r"Return the data in a structured format:\s*```(.+?)```"
+}
+
+
+def build_instructions(num_lines):
+    """Instruction file text with the given number of action lines"""
+    lines = [LINES[i % len(LINES)] for i in range(num_lines)]
+    return "\n".join(lines + [RETURN_LINE]) + "\n"
+
+
+def baseline_parse(text):
+    """The previous InstructionParser.parse_text"""
+    cleaned_text = re.sub(r"\n+", "\n", text)
+
+    instructions = []
+    for line in cleaned_text.split("\n"):
+        line = line.strip()
+        if line.startswith("-"):
+            instructions.append(line)
+
+    actions = []
+    output = None
+
+    for line in instructions:
+        line = line[1:].strip()
+
+        for action_type, input_style in BASELINE_ACTION_STYLES.items():
+            match = re.search(input_style, line, re.IGNORECASE)
+
+            if match:
+                if action_type == "goto":
+                    action = {
+                        "type": "goto",
+                        "url": match.group(1)
+                    }
+
+                elif action_type == "extract":
+                    extracted_items = []
+                    for item in match.group(1).split(","):
+                        extracted_items.append(item.strip())
+
+                    if len(extracted_items) > 1 and "and" in extracted_items[-1]:
+                        last_item = extracted_items.pop().split("and")
+                        for item in last_item:
+                            cleaned_item = item.strip()
+                            if cleaned_item:
+                                extracted_items.append(cleaned_item)
+
+                    action = {
+                        "type": "extract",
+                        "items": extracted_items
+                    }
+
+                elif action_type == "summarise":
+                    action = {
+                        "type": "summarise",
+                        "abstract": match.group(1)
+                    }
+
+                elif action_type == "Return":
+                    action = {
+                        "type": "Return",
+                        "structured_format": match.group(1)
+                    }
+
+                else:
+                    action = None
+
+        if action:
+            if action["type"] == "Return":
+                output = action["structured_format"]
+            else:
+                actions.append(action)
+
+    if output is not None:
+        actions.append({
+            "type": "Return",
+            "structured_output": output
+        })
+
+    return actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the instruction parser")
+    parser.add_argument("--lines", type=int, nargs="+", default=[100, 1000, 10000], help="Instruction lines per file")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Parses every time, like the baseline
+    uncached_parser = InstructionParser(plan_cache_size=0)
+    cached_parser = InstructionParser()
+
+    print(f"{'lines':>8} {'baseline (ms)':>14} {'compiled (ms)':>14} {'speedup':>8} {'cache hit (ms)':>15} {'speedup':>8}")
+    for num_lines in args.lines:
+        text = build_instructions(num_lines)
+
+        # The first runs compile the patterns (into re's cache for the baseline) and fill the plan cache
+        baseline_parse(text)
+        uncached_parser.parse_text(text)
+        cached_parser.parse_text(text)
+
+        baseline_time = min(timeit.repeat(lambda: baseline_parse(text), number=1, repeat=args.repeat))
+        compiled_time = min(timeit.repeat(lambda: uncached_parser.parse_text(text), number=1, repeat=args.repeat))
+        cached_time = min(timeit.repeat(lambda: cached_parser.parse_text(text), number=1, repeat=args.repeat))
+
+        print(f"{num_lines:>8} {baseline_time * 1000:>14.2f} {compiled_time * 1000:>14.2f} {baseline_time / compiled_time:>7.1f}x "
+              f"{cached_time * 1000:>15.2f} {baseline_time / cached_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
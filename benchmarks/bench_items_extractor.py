@@ -0,0 +1,53 @@
+"""
+Benchmark: single-pass record extraction against the four independent CSS selects
+
+Usage:
+    python benchmarks/bench_items_extractor.py --sizes 50 200 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from items_extractor import ItemsExtractor
+from benchmarks.arxiv_pages import build_results_page
+
+ITEMS = ["title", "authors", "links", "abstracts"]
+
+
+def four_selects(extractor, soup):
+    """The previous extraction: one full-tree select per field"""
+    return {
+        "title": extractor._extract_titles(soup),
+        "authors": extractor._extract_authors(soup),
+        "link": extractor._extract_links(soup),
+        "abstract": extractor._extract_abstracts(soup),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the items extractor")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000], help="Results per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = ItemsExtractor()
+
+    print(f"{'results':>8} {'4 selects (ms)':>15} {'single pass (ms)':>17} {'speedup':>8}")
+    for size in args.sizes:
+        soup = BeautifulSoup(build_results_page(size), "html.parser")
+
+        # Both approaches must agree before they are compared
+        assert four_selects(extractor, soup) == extractor.extract(soup, ITEMS)
+
+        selects = min(timeit.repeat(lambda: four_selects(extractor, soup), number=1, repeat=args.repeat))
+        single = min(timeit.repeat(lambda: extractor.extract(soup, ITEMS), number=1, repeat=args.repeat))
+
+        print(f"{size:>8} {selects * 1000:>15.1f} {single * 1000:>17.1f} {selects / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: memory and output time of the parallel lists the controller used to keep against a PaperBatch
+
+Papers are generated with a realistic share of repeated authors (large collaborations and prolific authors
+appear on many papers) and every author name is a separate string, as it is when parsed from the pages.
+
+Usage:
+    python benchmarks/bench_paper_batch.py --papers 10000 50000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from paper_batch import PaperBatch
+from Output_Structurer import OutputStructurer
+from benchmarks.arxiv_pages import WORDS
+
+
+def build_columns(num_papers, num_authors, seed=0):
+    """Parallel lists of generated papers"""
+    rng = random.Random(seed)
+    columns = {"title": [], "authors": [], "link": [], "abstract": [], "summary": []}
+
+    for n in range(num_papers):
+        columns["title"].append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize())
+        # "".join builds a new string per occurrence, like the parser does
+        columns["authors"].append(["".join(["Author ", str(int(rng.paretovariate(1.2)) % num_authors)]) for _ in range(rng.randint(1, 12))])
+        columns["link"].append(f"https://arxiv.org/abs/2501.{n:05d}")
+        columns["abstract"].append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 200))))
+        columns["summary"].append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 60))))
+
+    return columns
+
+
+def measure_memory(build):
+    """Bytes allocated by build() and still held by its result"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the paper batch against parallel lists")
+    parser.add_argument("--papers", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--authors", type=int, default=5000, help="Distinct authors")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    structurer = OutputStructurer(compact=True)
+
+    print(f"{'papers':>8} {'lists (MB)':>11} {'batch (MB)':>11} {'authors lists (MB)':>19} {'authors batch (MB)':>19} {'output lists (s)':>17} {'output batch (s)':>17}")
+    for num_papers in args.papers:
+        columns, lists_bytes = measure_memory(lambda: build_columns(num_papers, args.authors))
+        batch, _ = measure_memory(lambda: PaperBatch.from_columns(columns))
+
+        # The batch shares the text strings with the lists, so only the authors differ
+        authors, author_list_bytes = measure_memory(lambda: build_columns(num_papers, args.authors)["authors"])
+        _, author_batch_bytes = measure_memory(lambda: PaperBatch.from_columns({"authors": authors}))
+        batch_bytes = lists_bytes - author_list_bytes + author_batch_bytes
+
+        started = time.perf_counter()
+        from_lists = structurer.structure_output(columns)
+        lists_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        from_batch = structurer.structure_output(batch)
+        batch_seconds = time.perf_counter() - started
+
+        assert from_lists == from_batch
+
+        print(f"{num_papers:>8} {lists_bytes / 2**20:>11.1f} {batch_bytes / 2**20:>11.1f} {author_list_bytes / 2**20:>19.1f} "
+              f"{author_batch_bytes / 2**20:>19.1f} {lists_seconds:>17.2f} {batch_seconds:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
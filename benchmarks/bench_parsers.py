@@ -0,0 +1,100 @@
+"""
+Benchmark: parse time and peak memory of the HTML parser backends on arXiv result pages
+
+Every backend runs in its own process so the peak resident memory of one does not hide another.
+
+Usage:
+    python benchmarks/bench_parsers.py --sizes 50 200
+    python benchmarks/bench_parsers.py --pages saved_search_page.html
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_backends import available_backends, parse_html
+from items_extractor import ItemsExtractor
+from benchmarks.arxiv_pages import build_results_page
+
+ITEMS = ["title", "authors", "links", "abstracts"]
+
+
+def load_page(source):
+    """A saved page path, or a generated page with that many results"""
+    if source.isdigit():
+        return build_results_page(int(source))
+    with open(source, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def measure(backend, source, repeat):
+    """Parse and extract in this process, returning timings and memory in a dict"""
+    html = load_page(source)
+    extractor = ItemsExtractor()
+
+    # Warm up imports and caches before measuring
+    extractor.extract(parse_html(html, backend), ITEMS)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    parse_times = []
+    extract_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        document = parse_html(html, backend)
+        parsed = time.perf_counter()
+        extractor.extract(document, ITEMS)
+        extract_times.append(time.perf_counter() - parsed)
+        parse_times.append(parsed - start)
+        del document
+
+    tracemalloc.start()
+    document = parse_html(html, backend)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "parse_ms": min(parse_times) * 1000,
+        "extract_ms": min(extract_times) * 1000,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": max(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+        "python_peak_mb": python_peak / (1024 * 1024),
+        "page_kb": len(html) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML parser backends")
+    parser.add_argument("--sizes", nargs="+", default=["50", "200"], help="Generated pages with this many results")
+    parser.add_argument("--pages", nargs="*", default=[], help="Saved arXiv result pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "SOURCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], args.child[1], args.repeat)))
+        return
+
+    backends = available_backends()
+    print(f"{'page':>24} {'backend':>12} {'parse (ms)':>11} {'extract (ms)':>13} {'peak RSS (MB)':>14} {'python peak (MB)':>17}")
+
+    for source in args.pages + args.sizes:
+        for backend in backends:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", backend, source, "--repeat", str(args.repeat)],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+
+            label = f"{os.path.basename(source)} ({result['page_kb']:.0f} KB)"
+            print(f"{label:>24} {backend:>12} {result['parse_ms']:>11.1f} {result['extract_ms']:>13.1f} "
+                  f"{result['peak_rss_mb']:>14.1f} {result['python_peak_mb']:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
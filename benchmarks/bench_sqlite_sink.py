@@ -0,0 +1,76 @@
+"""
+Benchmark: papers per second written to SQLite one row per transaction (the post-processing it replaces)
+against the batched upserts of SqliteSink
+
+Usage:
+    python benchmarks/bench_sqlite_sink.py --papers 1000 10000
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_sink import SqliteSink
+from benchmarks.bench_paper_batch import build_columns
+
+
+def build_papers(num_papers):
+    """Generated papers as dicts"""
+    columns = build_columns(num_papers, num_authors=5000)
+    return [{field: values[n] for field, values in columns.items()} for n in range(num_papers)]
+
+
+def write_per_row(path, papers):
+    """One INSERT OR REPLACE and one commit per paper"""
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE papers (arxiv_id TEXT PRIMARY KEY, title TEXT, authors TEXT, link TEXT, abstract TEXT, summary TEXT)")
+    for paper in papers:
+        connection.execute(
+            "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?)",
+            (paper["link"].rsplit("/", 1)[-1], paper["title"], ", ".join(paper["authors"]), paper["link"], paper["abstract"], paper["summary"])
+        )
+        connection.commit()
+    connection.close()
+
+
+def write_sink(path, papers, batch_size):
+    with SqliteSink(path, batch_size=batch_size) as sink:
+        sink.write_papers(papers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-row SQLite inserts against SqliteSink")
+    parser.add_argument("--papers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'papers':>8} {'per row (papers/s)':>19} {'sink (papers/s)':>16} {'sink again (papers/s)':>22}")
+    for num_papers in args.papers:
+        papers = build_papers(num_papers)
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            write_per_row(os.path.join(directory, "per_row.sqlite"), papers)
+            per_row = num_papers / (time.perf_counter() - started)
+
+            path = os.path.join(directory, "sink.sqlite")
+            started = time.perf_counter()
+            write_sink(path, papers, args.batch_size)
+            sink = num_papers / (time.perf_counter() - started)
+
+            # A repeated run updates every paper in place
+            started = time.perf_counter()
+            write_sink(path, papers, args.batch_size)
+            again = num_papers / (time.perf_counter() - started)
+
+        print(f"{num_papers:>8} {per_row:>19.0f} {sink:>16.0f} {again:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: start-up time of a run without summarisation, with lazy model loading against loading the models up front
+
+Each measurement runs in a fresh interpreter, timing the imports, the Controller construction and
+(for the eager case) the model loading that Controller construction used to trigger.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --model-path models/llama-2-7b-chat.Q4_K_M.gguf
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import logging, sys, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+from agent import Agent
+from Controller import Controller
+from abstract_summariser import AbstractSummariser
+controller = Controller(summariser=AbstractSummariser(model_path={model_path!r}))
+if {eager}:
+    controller.summariser.warm_up()
+print(time.perf_counter() - started)
+"""
+
+
+def measure(eager, model_path, repeat):
+    """Start-up seconds of each fresh interpreter"""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(eager=eager, model_path=model_path)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the start-up time of runs without summarisation")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--model-path", help="Local GGUF model loaded by the eager start-up (default: the usual Gemini/Llama resolution)")
+    args = parser.parse_args()
+
+    print(f"{'start-up':>10} {'median (ms)':>12} {'min (ms)':>9}")
+    results = {}
+    for name, eager in [("eager", True), ("lazy", False)]:
+        times = measure(eager, args.model_path, args.repeat)
+        results[name] = statistics.median(times)
+        print(f"{name:>10} {results[name] * 1000:>12.1f} {min(times) * 1000:>9.1f}")
+
+    print(f"lazy start-up is {results['eager'] / results['lazy']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
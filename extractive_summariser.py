@@ -0,0 +1,213 @@
+import logging
+import re
+import numpy as np
+
+# Words ending with a period that do not end a sentence
+ABBREVIATIONS = {
+    "e.g", "i.e", "et al", "al", "etc", "vs", "cf", "fig", "figs", "eq", "eqs", "sec", "ref", "refs",
+    "approx", "resp", "dr", "prof", "mr", "mrs", "ms", "no", "vol", "pp", "ch", "st", "inc", "ltd", "jr", "sr",
+}
+
+# Common English words carrying no topic information
+STOPWORDS = {
+    "a", "about", "above", "after", "again", "against", "all", "also", "am", "an", "and", "any", "are", "as", "at",
+    "be", "because", "been", "before", "being", "below", "between", "both", "but", "by", "can", "could", "did", "do",
+    "does", "doing", "down", "during", "each", "few", "for", "from", "further", "had", "has", "have", "having", "he",
+    "her", "here", "hers", "him", "his", "how", "however", "i", "if", "in", "into", "is", "it", "its", "itself",
+    "just", "may", "me", "more", "most", "much", "must", "my", "no", "nor", "not", "now", "of", "off", "on", "once",
+    "only", "or", "other", "our", "ours", "out", "over", "own", "same", "she", "should", "so", "some", "such", "than",
+    "that", "the", "their", "theirs", "them", "then", "there", "these", "they", "this", "those", "through", "thus",
+    "to", "too", "under", "until", "up", "upon", "us", "very", "via", "was", "we", "were", "what", "when", "where",
+    "whether", "which", "while", "who", "whom", "why", "will", "with", "within", "without", "would", "you", "your",
+}
+
+# Candidate sentence ends: terminal punctuation (and closing quotes/brackets) followed by space and a sentence start
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, keeping abbreviations, initials and decimals inside their sentence
+
+    Args:
+        text: (str)
+
+    Returns:
+        sentences: (list)
+    """
+    text = " ".join(text.split())
+    if not text:
+        return []
+
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        candidate = text[start:match.start()]
+        last_word = candidate.rsplit(" ", 1)[-1].strip("([\"'").rstrip(".").lower()
+
+        # "et al." and "e.g." style abbreviations, or a single initial such as "J."
+        if last_word in ABBREVIATIONS or candidate.lower().endswith("et al.") or re.fullmatch(r"[a-z]", last_word):
+            continue
+
+        sentences.append(text[start:match.end()].strip())
+        start = match.end()
+
+    sentences.append(text[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def tokenise(sentence):
+    """
+    Lower-cased content words of a sentence
+
+    Args:
+        sentence: (str)
+
+    Returns:
+        words: (list)
+    """
+    return [word for word in WORD.findall(sentence.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+class ExtractiveSummariser:
+
+    """CPU-only extractive summariser: every sentence is scored by the TF-IDF cosine similarity
+    to the centroid of its abstract (a one-step TextRank centrality) with a small lead-position prior,
+    and the best sentences are kept in their original order. A whole batch of abstracts is scored at
+    once with NumPy over a sparse (coordinate) term matrix."""
+
+    def __init__(self, max_sentences=4, lead_weight=0.2):
+        """
+        Initialise the summary length and the position prior
+
+        Args:
+            max_sentences: (int) sentences kept per abstract
+            lead_weight: (float) bonus of the first sentence, decreasing with the position (abstracts open with their topic)
+        """
+        self.max_sentences = max(1, max_sentences)
+        self.lead_weight = lead_weight
+
+
+    def summarise(self, text):
+        """
+        Summarise a single abstract
+
+        Args:
+            text: (str)
+
+        Returns:
+            Summarised Text: (str)
+        """
+        return self.summarise_batch([text])[0]
+
+
+    def summarise_batch(self, texts):
+        """
+        Summarise a batch of abstracts with one vectorised scoring pass
+
+        Args:
+            texts: (list)
+
+        Returns:
+            Summarised Texts: (list) abstracts with at most max_sentences sentences are returned unchanged
+        """
+        documents = [split_sentences(text or "") for text in texts]
+        summaries = [(text or "").strip() for text in texts]
+
+        # Only abstracts longer than the summary need scoring
+        long_documents = [i for i, sentences in enumerate(documents) if len(sentences) > self.max_sentences]
+        if not long_documents:
+            return summaries
+
+        sentences = []
+        sentence_doc = []
+        sentence_pos = []
+        for doc, i in enumerate(long_documents):
+            for pos, sentence in enumerate(documents[i]):
+                sentences.append(sentence)
+                sentence_doc.append(doc)
+                sentence_pos.append(pos)
+
+        scores = self.score_sentences(sentences, np.array(sentence_doc), np.array(sentence_pos))
+        selected = self._select(scores, np.array(sentence_doc))
+
+        for doc, i in enumerate(long_documents):
+            summaries[i] = " ".join(sentences[s] for s in selected[doc])
+
+        logging.info(f"Extractive summaries of {len(long_documents)} abstracts from {len(sentences)} sentences")
+        return summaries
+
+
+    def score_sentences(self, sentences, sentence_doc, sentence_pos):
+        """
+        Score every sentence by its TF-IDF cosine similarity to its abstract centroid, weighted by position
+
+        Args:
+            sentences: (list) sentences of all the abstracts
+            sentence_doc: (numpy.ndarray) abstract of every sentence
+            sentence_pos: (numpy.ndarray) position of every sentence in its abstract
+
+        Returns:
+            scores: (numpy.ndarray)
+        """
+        num_sentences = len(sentences)
+
+        # Coordinate form of the sentence x term matrix: one (row, column) pair per word occurrence
+        vocabulary = {}
+        rows = []
+        columns = []
+        for row, sentence in enumerate(sentences):
+            for word in tokenise(sentence):
+                rows.append(row)
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+
+        scores = np.zeros(num_sentences)
+        if rows:
+            vocabulary_size = len(vocabulary)
+            pairs, counts = np.unique(np.array(rows) * vocabulary_size + np.array(columns), return_counts=True)
+            rows, columns = pairs // vocabulary_size, pairs % vocabulary_size
+
+            # Sublinear term frequency times smoothed inverse sentence frequency, L2-normalised per sentence
+            document_frequency = np.bincount(columns, minlength=vocabulary_size)
+            idf = np.log((1 + num_sentences) / (1 + document_frequency)) + 1
+            weights = (1 + np.log(counts)) * idf[columns]
+            norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=num_sentences))
+            weights /= norms[rows]
+
+            # Centroid of every abstract: sum of its sentence vectors, stored sparsely by (abstract, term)
+            num_docs = int(sentence_doc.max()) + 1
+            centroid_keys, centroid_index = np.unique(sentence_doc[rows] * vocabulary_size + columns, return_inverse=True)
+            centroid_weights = np.bincount(centroid_index, weights=weights)
+            centroid_norms = np.sqrt(np.bincount(centroid_keys // vocabulary_size, weights=centroid_weights ** 2, minlength=num_docs))
+
+            similarity = np.bincount(rows, weights=weights * centroid_weights[centroid_index], minlength=num_sentences)
+            doc_norms = centroid_norms[sentence_doc]
+            scores = np.divide(similarity, doc_norms, out=np.zeros(num_sentences), where=doc_norms > 0)
+
+        # Lead prior, also breaking ties in favour of earlier sentences
+        return scores * (1 + self.lead_weight / (1 + sentence_pos)) + 1e-9 / (1 + sentence_pos)
+
+
+    def _select(self, scores, sentence_doc):
+        """
+        Best max_sentences sentences of every abstract, in their original order
+
+        Args:
+            scores: (numpy.ndarray)
+            sentence_doc: (numpy.ndarray)
+
+        Returns:
+            selected: (list) sentence indices per abstract
+        """
+        # Sort by abstract, then by decreasing score, and rank the sentences inside each abstract
+        order = np.lexsort((-scores, sentence_doc))
+        sorted_docs = sentence_doc[order]
+        group_start = np.searchsorted(sorted_docs, sorted_docs, side="left")
+        rank = np.arange(len(order)) - group_start
+
+        keep = np.sort(order[rank < self.max_sentences])
+        selected = [[] for _ in range(int(sentence_doc.max()) + 1)]
+        for index in keep:
+            selected[sentence_doc[index]].append(int(index))
+        return selected
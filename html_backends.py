@@ -0,0 +1,176 @@
+import logging
+from bs4 import BeautifulSoup
+
+# Parser backends in order of preference when the backend is "auto"
+AUTO_BACKENDS = ["lxml", "html.parser"]
+
+
+def available_backends():
+    """
+    Parser backends that can be used in this environment
+
+    Returns:
+        backends: (list)
+    """
+    backends = ["html.parser"]
+
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+
+    try:
+        from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+        backends.append("selectolax")
+    except ImportError:
+        pass
+
+    return backends
+
+
+def resolve_backend(backend="auto"):
+    """
+    Choose the parser backend to use
+
+    Args:
+        backend: (str) "auto", "html.parser", "lxml" or "selectolax"
+
+    Returns:
+        backend: (str)
+    """
+    available = available_backends()
+
+    if backend == "auto":
+        for candidate in AUTO_BACKENDS:
+            if candidate in available:
+                return candidate
+
+    if backend not in ("html.parser", "lxml", "selectolax"):
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+
+    if backend not in available:
+        logging.warning(f"HTML parser backend {backend} is not installed, using html.parser instead")
+        return "html.parser"
+
+    return backend
+
+
+def parse_html(text, backend="html.parser"):
+    """
+    Parse an HTML page into a document exposing the BeautifulSoup interface used by the extractors
+
+    Args:
+        text: (str)
+        backend: (str) a resolved backend name
+
+    Returns:
+        document: (BeautifulSoup Object or SelectolaxNode)
+    """
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return SelectolaxNode(LexborHTMLParser(text).root)
+
+    return BeautifulSoup(text, backend)
+
+
+class SelectolaxNode:
+
+    """Adapter giving a selectolax (lexbor) node the subset of the BeautifulSoup
+    Tag interface used by ItemsExtractor and Paginator"""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+
+    @property
+    def name(self):
+        return self.node.tag
+
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+
+    @property
+    def parent(self):
+        parent = self.node.parent
+        return SelectolaxNode(parent) if parent is not None else None
+
+
+    def get(self, attribute, default=None):
+        """
+        Attribute value, with the class attribute split into a list like BeautifulSoup
+
+        Args:
+            attribute: (str)
+            default: (any)
+
+        Returns:
+            value: (str or list)
+        """
+        value = self.node.attributes.get(attribute)
+        if value is None:
+            return default
+        if attribute == "class":
+            return value.split()
+        return value
+
+
+    def select(self, selector):
+        """
+        All the descendants matching a CSS selector
+
+        Args:
+            selector: (str)
+
+        Returns:
+            nodes: (list)
+        """
+        return [SelectolaxNode(node) for node in self.node.css(selector)]
+
+
+    def select_one(self, selector):
+        """
+        First descendant matching a CSS selector
+
+        Args:
+            selector: (str)
+
+        Returns:
+            node: (SelectolaxNode) None when nothing matches
+        """
+        node = self.node.css_first(selector)
+        return SelectolaxNode(node) if node is not None else None
+
+
+    def find_all(self, name=True, class_=None):
+        """
+        Descendant elements by tag name and class (name=True matches every element)
+
+        Args:
+            name: (str or bool)
+            class_: (str)
+
+        Returns:
+            nodes: (list)
+        """
+        if name is True and class_ is None:
+            # traverse() starts with the node itself
+            return [SelectolaxNode(node) for node in self.node.traverse(include_text=False)][1:]
+
+        selector = "*" if name is True else name
+        if class_:
+            selector += f".{class_}"
+        return self.select(selector)
+
+
+    def __eq__(self, other):
+        return isinstance(other, SelectolaxNode) and self.node == other.node
+
+
+    def __hash__(self):
+        return hash(self.node)
@@ -0,0 +1,170 @@
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts whose connection pools are kept (requests keeps 10 by default)
+DEFAULT_POOL_CONNECTIONS = 10
+
+
+def accepted_encodings():
+    """
+    Content encodings the client can decode, brotli only when a decoder is installed
+
+    Returns:
+        Accept-Encoding header: (str)
+    """
+    encodings = ["gzip", "deflate"]
+
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+
+    return ", ".join(encodings)
+
+
+def http2_available():
+    """
+    Whether the HTTP/2 backend can be used (httpx with the h2 extra)
+
+    Returns:
+        (bool)
+    """
+    try:
+        import httpx  # noqa: F401
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_session(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=10, http2=False):
+    """
+    HTTP session with keep-alive connection pools sized for the concurrent fetches
+
+    Args:
+        pool_connections: (int) hosts whose connection pools are kept
+        pool_maxsize: (int) connections kept alive per host
+        http2: (bool) use the httpx HTTP/2 client, multiplexing the requests to a host on one connection
+
+    Returns:
+        session: (requests.Session or HttpxSession)
+    """
+    if http2:
+        if http2_available():
+            return HttpxSession(max_connections=pool_connections * pool_maxsize, max_keepalive=pool_maxsize)
+        logging.warning("HTTP/2 needs httpx[http2] (pip install 'httpx[http2]'), using requests over HTTP/1.1 instead")
+
+    session = requests.Session()
+
+    # Without a larger pool, concurrent fetches beyond 10 per host open and discard a connection each time
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    session.headers["Accept-Encoding"] = accepted_encodings()
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class HttpxSession:
+
+    """Adapter giving an HTTP/2 httpx client the subset of the requests.Session interface used by WebScraper:
+    get() with headers, a (connect, read) timeout and streaming, returning requests-like responses and
+    raising the requests exceptions"""
+
+    def __init__(self, max_connections=100, max_keepalive=10):
+        """
+        Initialise the HTTP/2 client
+
+        Args:
+            max_connections: (int) open connections across all hosts
+            max_keepalive: (int) idle connections kept alive
+        """
+        import httpx
+
+        self.httpx = httpx
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            headers={"Accept-Encoding": accepted_encodings()},
+        )
+        self.headers = self.client.headers
+
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        """
+        GET a url
+
+        Args:
+            url: (str)
+            headers: (dict)
+            timeout: (tuple or float) (connect, read) seconds, as for requests
+            stream: (bool) read the body later with iter_content
+
+        Returns:
+            (HttpxResponse)
+        """
+        if isinstance(timeout, tuple):
+            timeout = self.httpx.Timeout(timeout[1], connect=timeout[0])
+
+        try:
+            request = self.client.build_request("GET", url, headers=headers, timeout=timeout)
+            response = self.client.send(request, stream=stream)
+        except self.httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except self.httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+        return HttpxResponse(response)
+
+
+    def close(self):
+        self.client.close()
+
+
+class HttpxResponse:
+
+    """requests.Response interface over an httpx response"""
+
+    def __init__(self, response):
+        """
+        Args:
+            response: (httpx.Response)
+        """
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+
+    @property
+    def text(self):
+        return self.response.read().decode(self.encoding, errors="replace")
+
+
+    @property
+    def encoding(self):
+        return self.response.encoding or "utf-8"
+
+
+    def iter_content(self, chunk_size=None):
+        """Decoded body chunks of a streamed response"""
+        return self.response.iter_bytes(chunk_size)
+
+
+    def raise_for_status(self):
+        """Raise requests' HTTPError for 4xx and 5xx responses"""
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error: {self.response.reason_phrase} for url: {self.url}", response=self)
+
+
+    def close(self):
+        self.response.close()
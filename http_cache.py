@@ -0,0 +1,193 @@
+import json
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from sqlite_store import connect_shared
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    """Raised in offline replay mode when a url has never been cached"""
+
+
+class HttpCache:
+    """Persistent HTTP response cache honouring Cache-Control, ETag and Last-Modified"""
+
+    def __init__(self, path="http_cache.sqlite", default_ttl=0):
+        """
+        Open the response cache
+
+        Args:
+            path: (str) SQLite database file, ":memory:" keeps the cache in memory
+            default_ttl: (float) seconds a response without freshness headers is served without revalidation
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+
+        # Used by the concurrent fetches
+        self.connection, self.lock = connect_shared(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+            "body TEXT NOT NULL, stored REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+
+    def get(self, url):
+        """
+        Look up the cached response of a url
+
+        Args:
+            url: (str)
+
+        Returns:
+            entry: (dict) with status, headers, body and stored time, None when not cached
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT status, headers, body, stored FROM responses WHERE url = ?", (url,)).fetchone()
+
+        if row is None:
+            return None
+
+        return {"status": row[0], "headers": json.loads(row[1]), "body": row[2], "stored": row[3]}
+
+
+    def store(self, url, response):
+        """
+        Store a response unless it forbids caching
+
+        Args:
+            url: (str)
+            response: (requests.Response)
+
+        Returns:
+            stored: (bool)
+        """
+        headers = dict(response.headers)
+        if "no-store" in self._cache_control(headers):
+            return False
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (url, status, headers, body, stored) VALUES (?, ?, ?, ?, ?)",
+                (url, response.status_code, json.dumps(headers), response.text, time.time())
+            )
+            self.connection.commit()
+        return True
+
+
+    def refresh(self, url, entry, response):
+        """
+        Update a cached entry after a 304 Not Modified revalidation
+
+        Args:
+            url: (str)
+            entry: (dict)
+            response: (requests.Response) the 304 response
+
+        Returns:
+            entry: (dict) with the merged headers
+        """
+        headers = dict(entry["headers"])
+        headers.update(response.headers)
+        entry = {**entry, "headers": headers, "stored": time.time()}
+
+        with self.lock:
+            self.connection.execute(
+                "UPDATE responses SET headers = ?, stored = ? WHERE url = ?",
+                (json.dumps(headers), entry["stored"], url)
+            )
+            self.connection.commit()
+        return entry
+
+
+    def is_fresh(self, entry, now=None):
+        """
+        Whether a cached entry can be served without asking the server
+
+        Args:
+            entry: (dict)
+            now: (float)
+
+        Returns:
+            (bool)
+        """
+        now = time.time() if now is None else now
+        headers = entry["headers"]
+        directives = self._cache_control(headers)
+
+        if "no-cache" in directives or "no-store" in directives:
+            return False
+
+        age = now - entry["stored"] + self._int(self._header(headers, "Age"), 0)
+
+        # max-age takes precedence over Expires
+        if "max-age" in directives:
+            return age < self._int(directives["max-age"], 0)
+
+        expires = self._header(headers, "Expires")
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp() > now
+            except (TypeError, ValueError):
+                # An invalid Expires date means already expired
+                return False
+
+        return age < self.default_ttl
+
+
+    def conditional_headers(self, entry):
+        """
+        Request headers to revalidate a cached entry
+
+        Args:
+            entry: (dict)
+
+        Returns:
+            headers: (dict)
+        """
+        headers = {}
+        etag = self._header(entry["headers"], "ETag")
+        last_modified = self._header(entry["headers"], "Last-Modified")
+
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+
+
+    @staticmethod
+    def _header(headers, name):
+        """Case-insensitive header lookup"""
+        name = name.lower()
+        for key, value in headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+
+    @classmethod
+    def _cache_control(cls, headers):
+        """Parse the Cache-Control header into a dict of directives"""
+        directives = {}
+        for part in (cls._header(headers, "Cache-Control") or "").split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                directives[name.lower()] = value.strip('"')
+        return directives
+
+
+    @staticmethod
+    def _int(value, default):
+        """Header value as an int, or the default when it is not a number"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
@@ -1,22 +1,48 @@
 from typing import List, Dict, Any
+from collections import OrderedDict
+import hashlib
+import logging
 import re
+import threading
 
 class InstructionParser:
     """Parses instructions from a text file and then executes the defined actions."""
     
-    def __init__(self): 
-        # Accounting for different variations of each item
+    def __init__(self, plan_cache_size=128): 
+        """
+        Initialise the action patterns and the parsed plan cache
+
+        Args:
+            plan_cache_size: (int) number of parsed instruction files kept, 0 disables the cache
+        """
+        # Accounting for different variations of each item, the value of each is captured in a group named after its type
         self.action_styles = {
-            "goto": r"goto:\s*(https?://\S+)",
-            "extract": r"extract\s+(.+?)(?=$|\n|-\s)",
-            "summarise": r"summari[sz]e\s+(.+?)(?=$|\n|-\s)",
-            "Return": r"Return the data in a structured format:\s*```(.+?)```"
+            "goto": r"goto:\s*(?P<goto>https?://\S+)",
+            "extract": r"extract\s+(?P<extract>.+?)(?=$|\n|-\s)",
+            "summarise": r"summari[sz]e\s+(?P<summarise>.+?)(?=$|\n|-\s)",
+            "Return": r"Return the data in a structured format:\s*```(?P<Return>.+?)```"
         }
 
+        # Every pattern in one regex compiled once, a line is matched in a single call. The alternatives go from the
+        # last action type to the first since a later type takes priority: each one scans the whole line before the next
+        self.action_pattern = re.compile(
+            "|".join(rf"^.*?{input_style}" for input_style in reversed(list(self.action_styles.values()))),
+            re.IGNORECASE
+        )
+
+        self.plan_cache_size = plan_cache_size
+        self.plan_cache = OrderedDict() # content hash -> parsed actions
+        self.lock = threading.Lock() # the cache is shared by concurrent jobs
+        self.cache_hits = 0
+        self.cache_misses = 0
+
 
     def parse_text(self, text):
         """
         Function for parsing text lines into instructions and actions
+
+        Plans are cached by content hash, so instructions already parsed by this parser (an unchanged
+        instruction file, or the same job sent again to the service) are not parsed again.
         
         Args: 
             text: (str)
@@ -24,7 +50,35 @@ class InstructionParser:
         Returns: 
             actions: (list)
         """
-        
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self.lock:
+            actions = self.plan_cache.get(key)
+            if actions is not None:
+                self.cache_hits += 1
+                self.plan_cache.move_to_end(key)
+            else:
+                self.cache_misses += 1
+
+        if actions is not None:
+            logging.info("Reusing a parsed plan of the same instructions")
+        else:
+            actions = self._parse_actions(text)
+            self._cache_plan(key, actions)
+
+        # The controller adds items to the actions, so the cached plan is never handed out
+        return self._copy_plan(actions)
+
+
+    def _parse_actions(self, text):
+        """
+        Parse instruction text into actions, without the plan cache
+
+        Args:
+            text: (str)
+
+        Returns:
+            actions: (list)
+        """
         # Convert multiple new lines to single new line
         cleaned_text = re.sub(r"\n+", "\n", text)
         
@@ -41,57 +95,7 @@ class InstructionParser:
 
         for line in instructions:
             line = line[1:].strip()  # Remove the leading -
-
-            for action_type, input_style in self.action_styles.items():
-                match = re.search(input_style, line, re.IGNORECASE)
-                
-                # Parse instructions under every respective action
-                if match: 
-                    # Parsing "goto"
-                    if action_type == "goto": 
-                        action = {
-                            "type": "goto",
-                            "url": match.group(1)
-                        }
-                    
-                    # Parsing "extract"
-                    elif action_type == "extract":
-                        extracted_items = []
-                        for item in match.group(1).split(","): 
-                            extracted_items.append(item.strip())
-
-                        # Handling the case for when there is "and" before the last item in executing "extract"
-                        if len(extracted_items) > 1 and "and" in extracted_items[-1]:
-                            # Remove last item from list and split "and"
-                            last_item = extracted_items.pop().split("and")
-                            # Extend the extract_items list with cleaned items from last_items
-                            for item in last_item:
-                                cleaned_item = item.strip()  # Remove leading and trailing whitespaces
-                                if cleaned_item: # Add only non-empty items
-                                    extracted_items.append(cleaned_item)  # Add the cleaned item to extract_items
-                        
-                        action = {
-                            "type": "extract",
-                            "items": extracted_items
-                        }
-                    
-                    # Parsing "summarise"
-                    elif action_type == "summarise": 
-                        action = {
-                            "type": "summarise",
-                            "abstract": match.group(1) 
-                        }
-
-                    # Parsing "Return"
-                    elif action_type == "Return": 
-                        action = {
-                            "type": "Return", 
-                            "structured_format": match.group(1)
-                        }
-                    
-                    else: 
-                        action = None
-
+            action = self._parse_line(line)
                 
             if action:
                 if action["type"] == "Return":
@@ -109,6 +113,70 @@ class InstructionParser:
         return actions
 
 
+    def _parse_line(self, line):
+        """
+        Parse a single instruction line into its action
+
+        Args:
+            line: (str) instruction without the leading -
+
+        Returns:
+            action: (dict) None when the line matches no action
+        """
+        match = self.action_pattern.match(line)
+        if not match:
+            return None
+
+        # The matched alternative is the only one whose value group took part in the match
+        action_type = match.lastgroup
+        value = match.group(action_type)
+
+        # Parse instructions under every respective action
+        # Parsing "goto"
+        if action_type == "goto": 
+            return {
+                "type": "goto",
+                "url": value
+            }
+        
+        # Parsing "extract"
+        elif action_type == "extract":
+            extracted_items = []
+            for item in value.split(","): 
+                extracted_items.append(item.strip())
+
+            # Handling the case for when there is "and" before the last item in executing "extract"
+            if len(extracted_items) > 1 and "and" in extracted_items[-1]:
+                # Remove last item from list and split "and"
+                last_item = extracted_items.pop().split("and")
+                # Extend the extract_items list with cleaned items from last_items
+                for item in last_item:
+                    cleaned_item = item.strip()  # Remove leading and trailing whitespaces
+                    if cleaned_item: # Add only non-empty items
+                        extracted_items.append(cleaned_item)  # Add the cleaned item to extract_items
+            
+            return {
+                "type": "extract",
+                "items": extracted_items
+            }
+        
+        # Parsing "summarise"
+        elif action_type == "summarise": 
+            return {
+                "type": "summarise",
+                "abstract": value 
+            }
+
+        # Parsing "Return"
+        elif action_type == "Return": 
+            return {
+                "type": "Return", 
+                "structured_format": value
+            }
+
+        return None
+
+
     def parse_file(self, file_path):
         """
         Function for parsing the text content in the prompt file
@@ -121,10 +189,40 @@ class InstructionParser:
 
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
+            with open(file_path, "rb") as file:
                 content = file.read()
-            return self.parse_text(content)
+
+            # Unchanged instruction files reuse their parsed plan without parsing again
+            return self.parse_text(content.decode("utf-8"))
         except FileNotFoundError:
             raise ValueError(f"Prompt text file is not found: {file_path}")
         except Exception as e:
-            raise ValueError(f"Error in reading the prompt text file: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error in reading the prompt text file: {str(e)}")
+
+
+    def _cache_plan(self, key, actions):
+        """
+        Keep a parsed plan, dropping the least recently used ones beyond the cache size
+
+        Args:
+            key: (str) content hash of the instructions
+            actions: (list)
+        """
+        if self.plan_cache_size <= 0:
+            return
+
+        plan = self._copy_plan(actions)
+        with self.lock:
+            self.plan_cache[key] = plan
+            while len(self.plan_cache) > self.plan_cache_size:
+                self.plan_cache.popitem(last=False)
+
+
+    @staticmethod
+    def _copy_plan(actions):
+        """Copy of a plan, actions only hold strings and lists of strings so a shallow copy of each is enough"""
+        return [
+            {key: list(value) if isinstance(value, list) else value for key, value in action.items()}
+            for action in actions
+        ]
+
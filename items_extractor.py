@@ -18,6 +18,11 @@ class ItemsExtractor:
         """
         extracted = {}
         logging.info(f"Extracting items: {items_to_extract}")
+
+        # Result pages with one container per paper are read record by record in a single pass
+        records = self.extract_records(soup)
+        if records:
+            return self._records_to_items(records, items_to_extract)
         
         for item in items_to_extract:
             if item.lower() == "title":
@@ -30,6 +35,114 @@ class ItemsExtractor:
                 extracted["abstract"] = self._extract_abstracts(soup)
             
         return extracted
+
+
+    def extract_records(self, soup):
+        """
+        Extract one record per paper by walking each result container once
+
+        Args:
+            soup: (BeautifulSoup object)
+
+        Returns:
+            records: (list) dicts with title, authors, link and abstract, empty when the page has no result containers
+        """
+        records = []
+        for container in soup.find_all("li", class_="arxiv-result"):
+            records.append(self.extract_record(container))
+
+        if records:
+            logging.info(f"Successfully extracted {len(records)} paper records")
+
+        return records
+
+
+    def extract_record(self, container):
+        """
+        Extract the fields of a single paper from its result container in one walk of its elements
+
+        Args:
+            container: (BeautifulSoup Tag)
+
+        Returns:
+            record: (dict) missing fields are left empty so every record keeps all the fields
+        """
+        record = {"title": "", "authors": [], "link": "", "abstract": ""}
+
+        for element in container.find_all(True):
+            classes = element.get("class") or []
+
+            if element.name == "p" and "title" in classes and "is-5" in classes and not record["title"]:
+                record["title"] = element.text.strip()
+
+            elif element.name == "p" and "authors" in classes and not record["authors"]:
+                record["authors"] = self._split_authors(element.text)
+
+            elif element.name == "a" and not record["link"]:
+                href = element.get("href") or ""
+                parent_classes = element.parent.get("class") or []
+                if "/abs/" in href and "list-title" in parent_classes:
+                    record["link"] = self._absolute_link(href)
+
+            elif element.name == "span" and "abstract-short" in classes and not record["abstract"]:
+                record["abstract"] = element.text.strip()
+
+        return record
+
+
+    def _records_to_items(self, records, items_to_extract):
+        """
+        Turn paper records into the lists of requested items, aligned by paper
+
+        Args:
+            records: (list)
+            items_to_extract: (list)
+
+        Returns:
+            extracted data: (dict)
+        """
+        extracted = {}
+        for item in items_to_extract:
+            if item.lower() == "title":
+                extracted["title"] = [record["title"] for record in records]
+            elif item.lower() == "authors":
+                extracted["authors"] = [record["authors"] for record in records]
+            elif item.lower() == "links":
+                extracted["link"] = [record["link"] for record in records]
+            elif item.lower() in ["abstract", "abstracts"]:
+                extracted["abstract"] = [record["abstract"] for record in records]
+
+        return extracted
+
+
+    def _split_authors(self, text):
+        """
+        Split the text of an authors element into clean author names
+
+        Args:
+            text: (str)
+
+        Returns:
+            authors: (list)
+        """
+        # Take out the Authors: prefix, then remove spaces from start and end of each author's name
+        raw_authors_text = text.replace("Authors:", "")
+        return [author.strip() for author in raw_authors_text.split(",")]
+
+
+    def _absolute_link(self, href):
+        """
+        Convert relative arXiv URLs to absolutes
+
+        Args:
+            href: (str)
+
+        Returns:
+            link: (str)
+        """
+        if href.startswith("/"):
+            return f"https://arxiv.org{href}"
+        return href
     
 
 
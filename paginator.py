@@ -0,0 +1,135 @@
+import logging
+import re
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse, urljoin
+
+
+class Paginator:
+
+    """This class includes the methods used to walk through the pages of
+    arXiv search results (start=/size= offsets or the "next" links)"""
+
+    # Results per page used by arXiv when the url has no size parameter
+    DEFAULT_PAGE_SIZE = 50
+
+    def __init__(self, max_results=200):
+        """
+        Initialise the paginator with a cap on the number of results
+
+        Args:
+            max_results: (int) maximum number of results collected across all pages
+        """
+        self.max_results = max(1, max_results)
+
+
+    def total_results(self, soup):
+        """
+        Read the total number of results from the "Showing 1–50 of 1,234 results" header
+
+        Args:
+            soup: (BeautifulSoup Object)
+
+        Returns:
+            total: (int) None when the page does not show it
+        """
+        header = soup.select_one("h1.title")
+        if header is None:
+            return None
+
+        match = re.search(r"of\s+([\d,]+)\s+results", header.text)
+        if not match:
+            return None
+
+        return int(match.group(1).replace(",", ""))
+
+
+    def count_results(self, soup):
+        """
+        Number of results listed on a single page
+
+        Args:
+            soup: (BeautifulSoup Object)
+
+        Returns:
+            count: (int)
+        """
+        results = soup.select("li.arxiv-result")
+        return len(results) if results else len(soup.select("p.title.is-5"))
+
+
+    def page_urls(self, url, soup):
+        """
+        Urls of the remaining pages worked out from the offsets, once the total is known
+
+        Args:
+            url: (str) url of the first page
+            soup: (BeautifulSoup Object) first page
+
+        Returns:
+            urls: (list) in page order, None when the total number of results is unknown
+        """
+        total = self.total_results(soup)
+        if total is None:
+            return None
+
+        params = dict(parse_qsl(urlparse(url).query))
+        start = int(params.get("start", 0))
+        size = int(params.get("size", 0)) or self.count_results(soup) or self.DEFAULT_PAGE_SIZE
+
+        # Stop at whichever comes first: the last result or the cap
+        end = min(total, start + self.max_results)
+
+        urls = []
+        for offset in range(start + size, end, size):
+            urls.append(self._with_params(url, start=offset, size=size))
+
+        logging.info(f"Paginating {min(total, self.max_results)} of {total} results over {len(urls) + 1} pages")
+        return urls
+
+
+    def next_url(self, url, soup):
+        """
+        Url of the "next" link on a page
+
+        Args:
+            url: (str) url of the page
+            soup: (BeautifulSoup Object)
+
+        Returns:
+            url: (str) None on the last page
+        """
+        link = soup.select_one("a.pagination-next")
+        if link is None or not link.get("href"):
+            return None
+
+        return urljoin(url, link.get("href"))
+
+
+    def sorted_newest_first(self, url):
+        """
+        Whether a search url sorts its results by date, newest first (e.g. order=-announced_date_first)
+
+        Args:
+            url: (str)
+
+        Returns:
+            (bool) False for the default relevance order
+        """
+        order = dict(parse_qsl(urlparse(url).query)).get("order", "")
+        return order.startswith("-") and "date" in order
+
+
+    def _with_params(self, url, **params):
+        """
+        Replace query parameters in a url
+
+        Args:
+            url: (str)
+            params: (dict)
+
+        Returns:
+            url: (str)
+        """
+        parts = urlparse(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        query.update({key: str(value) for key, value in params.items()})
+        return urlunparse(parts._replace(query=urlencode(query)))
@@ -0,0 +1,268 @@
+import sys
+from array import array
+from itertools import islice
+
+# Columns of a batch, in output order
+PAPER_COLUMNS = ["title", "authors", "link", "abstract", "summary"]
+
+
+class PaperRecord:
+
+    """A single paper of a PaperBatch, read with attributes or like a dict"""
+
+    __slots__ = PAPER_COLUMNS
+
+    def __init__(self, title=None, authors=None, link=None, abstract=None, summary=None):
+        self.title = title
+        self.authors = authors
+        self.link = link
+        self.abstract = abstract
+        self.summary = summary
+
+
+    def get(self, field, default=None):
+        """
+        Value of a field
+
+        Args:
+            field: (str)
+            default: (any) returned when the field is missing
+
+        Returns:
+            value: (any)
+        """
+        value = getattr(self, field, None) if field in PAPER_COLUMNS else None
+        return default if value is None else value
+
+
+    def to_dict(self, fields=None):
+        """
+        Paper as a dict
+
+        Args:
+            fields: (list) fields to include, all of them by default
+
+        Returns:
+            paper: (dict)
+        """
+        return {field: getattr(self, field) for field in (fields or PAPER_COLUMNS)}
+
+
+class PaperBatch:
+
+    """Columnar store of the papers of a run: one list per text column and the authors as interned names
+    referenced by a flat array of ids with row offsets, so a crawl of tens of thousands of papers keeps
+    neither a list per paper nor a copy of every repeated author name
+
+    Columns can be ragged (the extractor may find more titles than links); missing values read as None.
+    """
+
+    __slots__ = ("columns", "author_names", "author_lookup", "author_ids", "author_offsets", "has_authors")
+
+    def __init__(self, fields=None):
+        """
+        Initialise an empty batch
+
+        Args:
+            fields: (list) columns filled by append, in addition to the ones set later
+        """
+        self.columns = {} # text column -> list
+        self.author_names = [] # author id -> interned name
+        self.author_lookup = {} # name -> author id
+        self.author_ids = array("I") # author ids of every paper, one paper after the other
+        self.author_offsets = array("I", [0]) # start of every paper in author_ids
+        self.has_authors = False
+
+        for field in fields or []:
+            self._check_field(field)
+            if field == "authors":
+                self.has_authors = True
+            else:
+                self.columns[field] = []
+
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a batch from parallel lists, e.g. the output of ItemsExtractor.extract
+
+        Args:
+            columns: (dict) field -> list, keys that are not paper columns are ignored
+
+        Returns:
+            (PaperBatch)
+        """
+        batch = cls()
+        batch.update(columns)
+        return batch
+
+
+    def update(self, columns):
+        """
+        Set several columns at once
+
+        Args:
+            columns: (dict) field -> list, keys that are not paper columns are ignored
+        """
+        for field, values in columns.items():
+            if field in PAPER_COLUMNS:
+                self.set_column(field, values)
+
+
+    def set_column(self, field, values):
+        """
+        Set (or replace) a whole column
+
+        Args:
+            field: (str)
+            values: (list)
+        """
+        self._check_field(field)
+
+        if field != "authors":
+            self.columns[field] = list(values)
+            return
+
+        self.author_ids = array("I")
+        self.author_offsets = array("I", [0])
+        self.has_authors = True
+        for names in values:
+            self._append_authors(names)
+
+
+    def append(self, paper):
+        """
+        Add a paper at the end of every column of the batch
+
+        Args:
+            paper: (dict) missing fields are stored as None
+        """
+        for field, values in self.columns.items():
+            values.append(paper.get(field))
+        if self.has_authors:
+            self._append_authors(paper.get("authors"))
+
+
+    def keep_rows(self, rows):
+        """
+        Keep only the given rows, in the given order
+
+        Args:
+            rows: (list) row indices
+        """
+        for field, values in self.columns.items():
+            self.columns[field] = [values[i] for i in rows if i < len(values)]
+
+        if self.has_authors:
+            kept = [self.authors_of(i) for i in rows if i < self.column_length("authors")]
+            self.author_ids = array("I")
+            self.author_offsets = array("I", [0])
+            for names in kept:
+                self._append_authors(names)
+
+
+    def column_length(self, field):
+        """
+        Number of values in a column
+
+        Args:
+            field: (str)
+
+        Returns:
+            length: (int) 0 for a column that is not set
+        """
+        if field == "authors":
+            return len(self.author_offsets) - 1
+        return len(self.columns.get(field, ()))
+
+
+    def authors_of(self, row):
+        """
+        Author names of a paper
+
+        Args:
+            row: (int)
+
+        Returns:
+            authors: (list)
+        """
+        names = self.author_names
+        return [names[author] for author in self.author_ids[self.author_offsets[row]:self.author_offsets[row + 1]]]
+
+
+    def record(self, row):
+        """
+        A paper of the batch
+
+        Args:
+            row: (int)
+
+        Returns:
+            (PaperRecord)
+        """
+        values = {
+            field: column[row] if row < len(column) else None
+            for field, column in self.columns.items()
+        }
+        if self.has_authors and row < self.column_length("authors"):
+            values["authors"] = self.authors_of(row)
+        return PaperRecord(**values)
+
+
+    def records(self, limit=None):
+        """
+        Iterate over the papers, one record at a time
+
+        Args:
+            limit: (int) stop after this many papers
+
+        Returns:
+            generator: (PaperRecord)
+        """
+        return islice((self.record(row) for row in range(len(self))), limit)
+
+
+    @property
+    def fields(self):
+        """Columns that are set, in output order"""
+        return [field for field in PAPER_COLUMNS if field in self]
+
+
+    def get(self, field, default=None):
+        """Column values as a list, or the default when the column is not set"""
+        return self[field] if field in self else default
+
+
+    def __getitem__(self, field):
+        if field == "authors" and self.has_authors:
+            return [self.authors_of(row) for row in range(self.column_length("authors"))]
+        return self.columns[field]
+
+
+    def __contains__(self, field):
+        return field in self.columns or (field == "authors" and self.has_authors)
+
+
+    def __iter__(self):
+        return self.records()
+
+
+    def __len__(self):
+        return max((self.column_length(field) for field in self.fields), default=0)
+
+
+    def _append_authors(self, names):
+        """Intern the authors of one paper and add them as the next row"""
+        for name in names or []:
+            author = self.author_lookup.get(name)
+            if author is None:
+                author = len(self.author_names)
+                self.author_names.append(sys.intern(name))
+                self.author_lookup[self.author_names[author]] = author
+            self.author_ids.append(author)
+        self.author_offsets.append(len(self.author_ids))
+
+
+    def _check_field(self, field):
+        if field not in PAPER_COLUMNS:
+            raise KeyError(f"Unknown paper column: {field}")
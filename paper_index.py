@@ -0,0 +1,169 @@
+import logging
+import re
+import time
+from sqlite_store import connect_shared
+
+# New style identifiers (2401.12345) and old style ones (hep-th/9901001, math.GT/0309136), with an optional version
+ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5}|[a-z][a-z\-]*(?:\.[a-z]{2})?/\d{7})(?:v\d+)?", re.IGNORECASE)
+
+# Papers looked up per query, below the SQLite limit of bound parameters
+LOOKUP_CHUNK = 500
+
+# Index modes: "skip" reuses the stored summaries of known papers, "new" only outputs papers not seen before
+INDEX_MODES = ["skip", "new"]
+
+
+def normalise_arxiv_id(link):
+    """
+    Version-less arXiv identifier of an abstract or pdf link (or of a bare identifier)
+
+    Args:
+        link: (str) e.g. https://arxiv.org/abs/2401.12345v2, arXiv:2401.12345 or hep-th/9901001
+
+    Returns:
+        arxiv_id: (str) e.g. 2401.12345 or hep-th/9901001, None when there is no identifier
+    """
+    if not link:
+        return None
+
+    # Identifiers follow /abs/ or /pdf/ in links, otherwise the whole value is the identifier
+    marker = re.search(r"/(?:abs|pdf)/", link)
+    value = link[marker.end():] if marker else re.sub(r"^arxiv:", "", link.strip(), flags=re.IGNORECASE)
+
+    match = ARXIV_ID.match(value)
+    if match is None:
+        return None
+
+    arxiv_id = match.group(1)
+    if "/" in arxiv_id:
+        # Archive names are lower case, subject classes upper case (math.GT)
+        archive, number = arxiv_id.split("/")
+        name, _, subject = archive.partition(".")
+        arxiv_id = f"{name.lower()}.{subject.upper()}/{number}" if subject else f"{name.lower()}/{number}"
+    return arxiv_id
+
+
+class PaperIndex:
+    """Persistent index of the papers processed by earlier runs, keyed by arXiv identifier, with their summaries"""
+
+    def __init__(self, path="paper_index.sqlite"):
+        """
+        Open the index
+
+        Args:
+            path: (str) SQLite database file, ":memory:" keeps the index in memory
+        """
+        self.path = path
+
+        # Known and new papers among the lookups
+        self.hits = 0
+        self.misses = 0
+
+        # Used by the pipeline worker threads
+        self.connection, self.lock = connect_shared(path)
+
+        # The identifier is the clustered key, so a lookup is a single B-tree descent however large the index grows
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "arxiv_id TEXT PRIMARY KEY, title TEXT, link TEXT, summary TEXT, "
+            "first_seen REAL NOT NULL, last_seen REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+
+    def lookup(self, arxiv_ids):
+        """
+        Stored entries of the known papers among the identifiers
+
+        Args:
+            arxiv_ids: (list) normalised identifiers, None entries are ignored
+
+        Returns:
+            entries: (dict) arxiv id -> {"title", "link", "summary", "first_seen"} for the known papers only
+        """
+        wanted = list(dict.fromkeys(arxiv_id for arxiv_id in arxiv_ids if arxiv_id))
+        entries = {}
+
+        with self.lock:
+            for start in range(0, len(wanted), LOOKUP_CHUNK):
+                chunk = wanted[start:start + LOOKUP_CHUNK]
+                rows = self.connection.execute(
+                    f"SELECT arxiv_id, title, link, summary, first_seen FROM papers WHERE arxiv_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+
+                for arxiv_id, title, link, summary, first_seen in rows:
+                    entries[arxiv_id] = {"title": title, "link": link, "summary": summary, "first_seen": first_seen}
+
+            self.hits += len(entries)
+            self.misses += len(wanted) - len(entries)
+
+        return entries
+
+
+    def __contains__(self, arxiv_id):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM papers WHERE arxiv_id = ?", (arxiv_id,)).fetchone() is not None
+
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+    def record(self, papers):
+        """
+        Add papers to the index, or refresh the ones already there, in a single transaction
+
+        A paper recorded without a summary keeps the summary stored by an earlier run.
+
+        Args:
+            papers: (list) dicts with a link (or arxiv_id) and optionally a title and a summary
+
+        Returns:
+            recorded: (int) papers with an arXiv identifier
+        """
+        now = time.time()
+        rows = []
+        for paper in papers:
+            arxiv_id = paper.get("arxiv_id") or normalise_arxiv_id(paper.get("link"))
+            if arxiv_id:
+                rows.append((arxiv_id, paper.get("title"), paper.get("link"), paper.get("summary"), now, now))
+
+        if not rows:
+            return 0
+
+        with self.lock:
+            self.connection.executemany(
+                "INSERT INTO papers (arxiv_id, title, link, summary, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (arxiv_id) DO UPDATE SET "
+                "title = COALESCE(excluded.title, title), link = COALESCE(excluded.link, link), "
+                "summary = COALESCE(excluded.summary, summary), last_seen = excluded.last_seen",
+                rows
+            )
+            self.connection.commit()
+
+        return len(rows)
+
+
+    def stats(self):
+        """
+        Lookup counters and size of the index
+
+        Returns:
+            (dict)
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "papers": len(self),
+        }
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+        logging.info(f"Paper index closed: {self.hits} known papers, {self.misses} new papers")
@@ -0,0 +1,140 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to keep request rates under a budget"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initialise a full bucket
+
+        Args:
+            rate: (float) tokens added per second
+            capacity: (int) maximum number of tokens that can be spent in a burst
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    @classmethod
+    def per_minute(cls, requests_per_minute, capacity=1):
+        """
+        Build a bucket from a requests-per-minute budget
+
+        Args:
+            requests_per_minute: (float)
+            capacity: (int)
+
+        Returns:
+            (TokenBucket)
+        """
+        return cls(requests_per_minute / 60.0, capacity)
+
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, blocking until they are available
+
+        Args:
+            tokens: (int)
+
+        Returns:
+            waited seconds: (float)
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Reserve the tokens straight away (the balance may go negative) so waiting callers queue fairly
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+    def pause(self, seconds):
+        """
+        Hold back the next tokens for a while, e.g. when the server asks to retry later
+
+        Args:
+            seconds: (float)
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # A debt of rate * seconds tokens makes the next caller wait at least that long
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class DomainRateLimiter:
+    """One token bucket per host, shared by every fetch going through the same limiter"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initialise an empty set of buckets
+
+        Args:
+            rate: (float) requests per second allowed per host
+            capacity: (int) requests per host that can be sent in a burst
+        """
+        if rate <= 0:
+            raise ValueError("Domain rate limit must be positive")
+
+        self.rate = float(rate)
+        self.capacity = max(1, capacity)
+        self.buckets = {} # host -> TokenBucket
+        self.lock = threading.Lock()
+
+
+    def bucket(self, url):
+        """
+        Token bucket of the url's host, created on first use
+
+        Args:
+            url: (str)
+
+        Returns:
+            (TokenBucket)
+        """
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self.buckets[host]
+
+
+    def acquire(self, url):
+        """
+        Wait for a request slot on the url's host
+
+        Args:
+            url: (str)
+
+        Returns:
+            waited seconds: (float)
+        """
+        return self.bucket(url).acquire()
+
+
+    def pause(self, url, seconds):
+        """
+        Hold back every request to the url's host for a while
+
+        Args:
+            url: (str)
+            seconds: (float)
+        """
+        self.bucket(url).pause(seconds)
@@ -0,0 +1,215 @@
+import logging
+import time
+from abstract_summariser import SUMMARY_UNAVAILABLE
+from paper_index import normalise_arxiv_id
+from sqlite_store import connect_shared
+
+
+class SqliteSink:
+
+    """Writes papers to an embedded SQLite database, keyed by arXiv id, as they arrive
+
+    Papers are buffered and upserted batch_size at a time with executemany, one transaction per batch, so a
+    crawl pays one commit per batch instead of one per paper. A paper written again (by a later run, or by
+    another instruction file) is updated in place: its title, link, abstract and summary are replaced when
+    the new run has them, and its authors are replaced when the new run extracted them.
+
+    The database is in WAL mode, so readers never block the writer, and every batch takes the write lock
+    up front (BEGIN IMMEDIATE) and waits up to busy_timeout for it, so several processes (e.g. scheduled
+    batch jobs) can write to the same file. Inside a process the sink can be shared by threads.
+    """
+
+    def __init__(self, path="papers.sqlite", batch_size=500, source=None, busy_timeout=30.0):
+        """
+        Open the database in WAL mode and create the tables and indexes it lacks
+
+        Args:
+            path: (str) SQLite database file, ":memory:" keeps the papers in memory
+            batch_size: (int) papers per transaction
+            source: (str) where the papers come from (e.g. the instructions file), stored with every paper
+            busy_timeout: (float) seconds to wait for another writer to finish its transaction
+        """
+        self.path = path
+        # Record fields the pipeline keeps for the database, in addition to the extracted ones
+        self.fields = ["link", "abstract"]
+        self.batch_size = max(1, batch_size)
+        self.source = source
+
+        self.count = 0
+        self.skipped = 0
+        self.batches = 0
+
+        self.buffer = {} # arxiv id -> row, a paper written twice in a batch keeps its last version
+        # Transactions are opened explicitly (see _Transaction)
+        self.connection, self.lock = connect_shared(path, timeout=busy_timeout, isolation_level=None)
+
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            # Durable at every checkpoint, and safe from corruption, without an fsync per transaction
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        with self._transaction():
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "arxiv_id TEXT PRIMARY KEY, title TEXT, link TEXT, abstract TEXT, summary TEXT, source TEXT, "
+                "first_seen REAL NOT NULL, last_seen REAL NOT NULL) WITHOUT ROWID"
+            )
+            # One row per author of a paper, in author order, so papers can be searched by author
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS paper_authors ("
+                "arxiv_id TEXT NOT NULL, position INTEGER NOT NULL, author TEXT NOT NULL, "
+                "PRIMARY KEY (arxiv_id, position)) WITHOUT ROWID"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS papers_title ON papers (title)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS paper_authors_author ON paper_authors (author)")
+
+
+    def write(self, paper):
+        """
+        Add a paper, writing a batch once enough papers are buffered
+
+        Args:
+            paper: (dict or PaperRecord) papers without an arXiv link are skipped
+        """
+        arxiv_id = paper.get("arxiv_id") or normalise_arxiv_id(paper.get("link"))
+
+        with self.lock:
+            if not arxiv_id:
+                self.skipped += 1
+                return
+
+            summary = paper.get("summary")
+            self.buffer[arxiv_id] = {
+                "arxiv_id": arxiv_id,
+                "title": paper.get("title"),
+                "link": paper.get("link"),
+                "abstract": paper.get("abstract"),
+                # A failed summary never replaces the one stored by an earlier run
+                "summary": summary if summary != SUMMARY_UNAVAILABLE else None,
+                "authors": paper.get("authors"),
+            }
+            self.count += 1
+
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+
+    def write_papers(self, papers):
+        """
+        Write every paper of an iterable, e.g. Controller.stream_actions
+
+        Args:
+            papers: (iterable)
+
+        Returns:
+            count: (int) papers written by this call
+        """
+        started = self.count
+        for paper in papers:
+            self.write(paper)
+        return self.count - started
+
+
+    def flush(self):
+        """Write the buffered papers in one transaction"""
+        with self.lock:
+            self._flush()
+
+
+    def stats(self):
+        """
+        Counters of the sink and size of the database
+
+        Returns:
+            (dict)
+        """
+        with self.lock:
+            papers = self.connection.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+            authors = self.connection.execute("SELECT COUNT(DISTINCT author) FROM paper_authors").fetchone()[0]
+        return {"written": self.count, "skipped": self.skipped, "batches": self.batches, "papers": papers, "authors": authors}
+
+
+    def close(self):
+        """Write the last batch and close the database connection"""
+        with self.lock:
+            self._flush()
+            self.connection.close()
+
+        if self.skipped:
+            logging.warning(f"{self.skipped} papers without an arXiv link were not written to {self.path} (extract the links)")
+        logging.info(f"Wrote {self.count} papers in {self.batches} transactions to {self.path}")
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def _flush(self):
+        """Upsert the buffered papers and their authors in one transaction (lock must be held)
+
+        The papers stay buffered until the transaction commits, so a batch that could not be written
+        (e.g. another writer held the database past busy_timeout) is written by the next flush.
+        """
+        if not self.buffer:
+            return
+
+        now = time.time()
+        rows = list(self.buffer.values())
+
+        # Authors are only replaced for the papers whose authors were extracted by this run
+        with_authors = [row for row in rows if row["authors"] is not None]
+
+        with self._transaction():
+            self.connection.executemany(
+                "INSERT INTO papers (arxiv_id, title, link, abstract, summary, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (arxiv_id) DO UPDATE SET "
+                "title = COALESCE(excluded.title, title), link = COALESCE(excluded.link, link), "
+                "abstract = COALESCE(excluded.abstract, abstract), summary = COALESCE(excluded.summary, summary), "
+                "source = COALESCE(excluded.source, source), last_seen = excluded.last_seen",
+                [
+                    (row["arxiv_id"], row["title"], row["link"], row["abstract"], row["summary"], self.source, now, now)
+                    for row in rows
+                ]
+            )
+            self.connection.executemany(
+                "DELETE FROM paper_authors WHERE arxiv_id = ?",
+                [(row["arxiv_id"],) for row in with_authors]
+            )
+            self.connection.executemany(
+                "INSERT INTO paper_authors (arxiv_id, position, author) VALUES (?, ?, ?)",
+                [
+                    (row["arxiv_id"], position, author)
+                    for row in with_authors
+                    for position, author in enumerate(row["authors"])
+                ]
+            )
+
+        self.buffer = {}
+        self.batches += 1
+
+
+    def _transaction(self):
+        return _Transaction(self.connection)
+
+
+class _Transaction:
+
+    """Write transaction taking the database write lock up front, so concurrent writers queue on the busy
+    timeout instead of failing when a read transaction is upgraded"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
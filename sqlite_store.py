@@ -0,0 +1,23 @@
+import os
+import sqlite3
+import threading
+
+
+def connect_shared(path, **options):
+    """
+    Open (or create) a SQLite database whose connection is shared by the threads of the process
+
+    The connection may be used from any thread, as long as the returned lock is held.
+
+    Args:
+        path: (str) database file, ":memory:" keeps the database in memory
+        options: passed on to sqlite3.connect (e.g. timeout, isolation_level)
+
+    Returns:
+        tuple: (sqlite3.Connection, threading.Lock)
+    """
+    directory = os.path.dirname(path) if path != ":memory:" else ""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    return sqlite3.connect(path, check_same_thread=False, **options), threading.Lock()
@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import time
+from sqlite_store import connect_shared
+
+
+class SummaryCache:
+    """On-disk summary cache keyed by a hash of the abstract, the model and the prompt template"""
+
+    def __init__(self, path="summary_cache.sqlite", max_bytes=64 * 1024 * 1024, ttl=None):
+        """
+        Open the summary cache and measure the size of the stored summaries
+
+        Args:
+            path: (str) SQLite database file, ":memory:" keeps the cache in memory
+            max_bytes: (int) total size of the stored summaries before least recently used entries are evicted
+            ttl: (float) seconds after which an entry expires, None keeps entries until evicted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # Reported as the cache hit rate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Used by the summariser worker threads
+        self.connection, self.lock = connect_shared(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed)")
+        self.connection.commit()
+
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+
+
+    @staticmethod
+    def make_key(text, model, prompt_template):
+        """
+        Content-addressed key of a summary
+
+        Args:
+            text: (str) abstract
+            model: (str) model identifier
+            prompt_template: (str)
+
+        Returns:
+            key: (str) sha256 hex digest
+        """
+        digest = hashlib.sha256()
+        for part in (model, prompt_template, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+
+    def get(self, key):
+        """
+        Look up a summary, refreshing its position in the LRU order
+
+        Args:
+            key: (str)
+
+        Returns:
+            summary: (str) None on a miss
+        """
+        now = time.time()
+
+        with self.lock:
+            row = self.connection.execute("SELECT summary, size, created FROM summaries WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                # Expired entries count as misses and are dropped straight away
+                self.connection.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self.connection.commit()
+                self.total_bytes -= row[1]
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.connection.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+
+    def put(self, key, summary):
+        """
+        Store a summary and evict the least recently used entries when over the size limit
+
+        Args:
+            key: (str)
+            summary: (str)
+        """
+        now = time.time()
+        size = len(summary.encode("utf-8"))
+
+        with self.lock:
+            previous = self.connection.execute("SELECT size FROM summaries WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, summary, size, now, now)
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            self._evict()
+            self.connection.commit()
+
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits max_bytes (lock must be held)"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.connection.execute("SELECT key, size FROM summaries ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+
+            for key, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.connection.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self.total_bytes -= size
+                self.evictions += 1
+
+
+    def stats(self):
+        """
+        Hit/miss counters and current size of the cache
+
+        Returns:
+            (dict)
+        """
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self.total_bytes,
+        }
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+        logging.info(f"Summary cache closed: {self.hits} hits, {self.misses} misses")
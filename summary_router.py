@@ -0,0 +1,432 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class TierUnavailableError(Exception):
+    """Raised when a tier is skipped: its circuit is open or it cannot finish within the run budget"""
+
+
+class CircuitBreaker:
+
+    """Stops calling a failing backend: after failure_threshold consecutive failures the circuit opens
+    for the cool-down window, then a single trial call decides whether it closes again"""
+
+    def __init__(self, failure_threshold=3, cooldown=60.0, clock=time.monotonic):
+        """
+        Initialise a closed circuit
+
+        Args:
+            failure_threshold: (int) consecutive failures opening the circuit
+            cooldown: (float) seconds the circuit stays open before a trial call
+            clock: (func) monotonic time source
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+
+    @property
+    def state(self):
+        """"closed", "open" or "half-open" (cool-down over, waiting for a trial call)"""
+        with self.lock:
+            return self._state()
+
+
+    def allow(self):
+        """
+        Whether a call may go through now
+
+        Returns:
+            (bool)
+        """
+        with self.lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                # Only one trial call while the backend might still be down
+                self.trial_running = True
+                return True
+            return False
+
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+
+    def release_trial(self):
+        """Let another trial call through after a trial that never reached the backend (counted neither way)"""
+        with self.lock:
+            self.trial_running = False
+
+
+    def record_failure(self):
+        """
+        Count a failed call, opening the circuit at the threshold (or again after a failed trial)
+
+        Returns:
+            opened: (bool) the circuit has just opened
+        """
+        with self.lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            self.trial_running = False
+
+            if was_open or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                return not was_open
+            return False
+
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+
+class TierMetrics:
+
+    """Call counts and latencies (per abstract) of a summariser tier"""
+
+    def __init__(self, window=1000):
+        """
+        Args:
+            window: (int) most recent latencies kept for the percentiles
+        """
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.total_latency = 0.0
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+
+    def record(self, latency, outcome):
+        """
+        Record a finished (or skipped) call
+
+        Args:
+            latency: (float) seconds
+            outcome: (str) "success", "failure", "timeout" or "skipped"
+        """
+        with self.lock:
+            if outcome == "skipped":
+                self.skipped += 1
+                return
+
+            self.calls += 1
+            self.total_latency += latency
+            self.latencies.append(latency)
+            if outcome == "success":
+                self.successes += 1
+            elif outcome == "timeout":
+                self.timeouts += 1
+                self.failures += 1
+            else:
+                self.failures += 1
+
+
+    def mean_latency(self):
+        """Average seconds per call, None before the first call"""
+        with self.lock:
+            return self.total_latency / self.calls if self.calls else None
+
+
+    def snapshot(self):
+        """
+        Metrics as a dict
+
+        Returns:
+            (dict)
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "skipped": self.skipped,
+                "failure_rate": self.failures / self.calls if self.calls else 0.0,
+                "mean_latency": self.total_latency / self.calls if self.calls else None,
+                "p95_latency": p95,
+            }
+
+
+class RunBudget:
+
+    """Time budget of one run (e.g. a Summarise_abstracts call), shared by the items of that run only"""
+
+    def __init__(self, budget, items, clock=time.monotonic):
+        """
+        Start the budget now
+
+        Args:
+            budget: (float) seconds for the whole run
+            items: (int) abstracts to summarise in the run
+            clock: (func) monotonic time source
+        """
+        self.clock = clock
+        self.deadline = clock() + budget
+        self.remaining_items = max(0, items)
+        self.lock = threading.Lock()
+
+
+    def next_item(self):
+        """
+        Seconds of the budget left per remaining item, counting the item about to be summarised
+
+        Returns:
+            per_item: (float)
+        """
+        with self.lock:
+            per_item = max(0.0, self.deadline - self.clock()) / max(1, self.remaining_items)
+            self.remaining_items = max(0, self.remaining_items - 1)
+            return per_item
+
+
+class SummaryRouter:
+
+    """Routes every abstract through the summariser tiers in order (e.g. Gemini, local Llama, extractive),
+    with a deadline per call, a circuit breaker per tier and an optional budget for the whole run"""
+
+    def __init__(self, failure_threshold=3, cooldown=60.0, max_workers=8, clock=time.monotonic):
+        """
+        Initialise an empty router
+
+        Args:
+            failure_threshold: (int) consecutive failures opening a tier's circuit
+            cooldown: (float) seconds a failing tier is skipped
+            max_workers: (int) threads of each tier running its calls that have a deadline
+            clock: (func) monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.max_workers = max(1, max_workers)
+        self.tiers = []
+
+
+    def add_tier(self, name, summarise, deadline=None, expected_latency=None, available=None):
+        """
+        Append a tier, tried after the ones already added
+
+        Args:
+            name: (str)
+            summarise: (func) text -> summary, raises on failure
+            deadline: (float) seconds allowed per call, None waits for the call to finish
+            expected_latency: (float) seconds per call assumed before any call was measured
+            available: (func) returns False when the backend is not loaded
+
+        Returns:
+            (SummaryRouter)
+        """
+        self.tiers.append({
+            "name": name,
+            "summarise": summarise,
+            "deadline": deadline,
+            "expected_latency": expected_latency,
+            "available": available or (lambda: True),
+            "breaker": CircuitBreaker(self.failure_threshold, self.cooldown, self.clock),
+            "metrics": TierMetrics(),
+            # Every tier has its own workers, so calls abandoned by a hanging backend never hold up the next tier
+            "executor": ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"summary-{name}"),
+            # Calls submitted to the workers and not finished yet, the queued ones are cancelled by close
+            "pending": set(),
+        })
+        return self
+
+
+    def start_run(self, budget, items):
+        """
+        Time budget for a run of items, passed to route so slow tiers are skipped once it runs short
+
+        Args:
+            budget: (float) seconds for the whole run, None for no budget
+            items: (int) abstracts to summarise in the run
+
+        Returns:
+            (RunBudget) None when there is no budget
+        """
+        return None if budget is None else RunBudget(budget, items, self.clock)
+
+
+    def route(self, text, run=None):
+        """
+        Summarise with the first tier that is available, allowed and answers in time
+
+        Args:
+            text: (str)
+            run: (RunBudget) budget of the run the text belongs to, None for no budget
+
+        Returns:
+            tuple: (Summarised Text, name of the tier that produced it)
+        """
+        per_item = run.next_item() if run is not None else None
+
+        available = [tier for tier in self.tiers if tier["available"]()]
+        if not available:
+            raise TierUnavailableError("No summariser tier is available")
+
+        for position, tier in enumerate(available):
+            last = position == len(available) - 1
+            try:
+                return self.call(tier["name"], lambda tier=tier: tier["summarise"](text), per_item=None if last else per_item), tier["name"]
+            except Exception as e:
+                if last:
+                    raise
+                logging.warning(f"Summariser tier {tier['name']} failed ({type(e).__name__}: {e}), trying {available[position + 1]['name']}")
+
+        raise TierUnavailableError("No summariser tier is available")
+
+
+    def call(self, name, request, per_item=None, items=1):
+        """
+        Run a request on a tier, honouring its circuit breaker, deadline and the run budget
+
+        Args:
+            name: (str) tier name
+            request: (func) runs the backend call
+            per_item: (float) seconds left per remaining item of the run, None when there is no budget
+            items: (int) abstracts handled by the request, the deadline grows with them and latencies are recorded per abstract
+
+        Returns:
+            result: (any) what the request returned
+        """
+        tier = self._tier(name)
+        breaker = tier["breaker"]
+        metrics = tier["metrics"]
+
+        # A faster tier gets the work when this one would not fit in the time left per item
+        expected = metrics.mean_latency() or tier["expected_latency"]
+        if per_item is not None and expected is not None and expected > per_item:
+            metrics.record(0.0, "skipped")
+            raise TierUnavailableError(f"{name} needs about {expected:.1f}s per call, {per_item:.1f}s left per item")
+
+        if not breaker.allow():
+            metrics.record(0.0, "skipped")
+            raise TierUnavailableError(f"{name} circuit is open")
+
+        deadline = tier["deadline"] * items if tier["deadline"] is not None else None
+        if per_item is not None:
+            deadline = per_item * items if deadline is None else min(deadline, per_item * items)
+
+        started = [self.clock()]
+        try:
+            if deadline is None:
+                result = request()
+            else:
+                result = self._call_with_deadline(tier, request, deadline, started)
+
+        except TimeoutError:
+            metrics.record((self.clock() - started[0]) / items, "timeout")
+            self._failed(name, breaker)
+            raise TimeoutError(f"{name} did not answer within {deadline:.1f}s")
+
+        except TierUnavailableError:
+            metrics.record(0.0, "skipped")
+            # The call never ran, so a half-open circuit still waits for its trial
+            breaker.release_trial()
+            raise
+
+        except Exception:
+            metrics.record((self.clock() - started[0]) / items, "failure")
+            self._failed(name, breaker)
+            raise
+
+        metrics.record((self.clock() - started[0]) / items, "success")
+        breaker.record_success()
+        return result
+
+
+    def metrics(self):
+        """
+        Latency and failure metrics of every tier
+
+        Returns:
+            metrics: (dict) tier name -> metrics, including the circuit state
+        """
+        return {
+            tier["name"]: {**tier["metrics"].snapshot(), "circuit": tier["breaker"].state}
+            for tier in self.tiers
+        }
+
+
+    def close(self):
+        """Cancel the calls still queued and stop the deadline worker threads of every tier"""
+        for tier in self.tiers:
+            # Calls already running cannot be cancelled, they finish on their worker
+            for future in list(tier["pending"]):
+                future.cancel()
+            tier["executor"].shutdown(wait=False)
+
+
+    def _call_with_deadline(self, tier, request, deadline, started):
+        """
+        Run a request on the tier workers and wait for it at most deadline seconds from the moment it starts
+
+        A call still queued when the deadline has passed is cancelled. A call that has started cannot be
+        interrupted: it keeps its worker until the backend answers and its result is ignored.
+
+        Args:
+            tier: (dict)
+            request: (func)
+            deadline: (float) seconds
+            started: (list) holds the start time of the call, set when a worker picks it up
+
+        Returns:
+            result: (any) what the request returned
+        """
+        running = threading.Event()
+        began = []
+
+        def run():
+            started[0] = self.clock()
+            began.append(time.monotonic())
+            running.set()
+            return request()
+
+        future = tier["executor"].submit(run)
+        tier["pending"].add(future)
+        future.add_done_callback(tier["pending"].discard)
+
+        # Waiting for a free worker does not count against the call, but it is not waited for longer than the deadline
+        if not running.wait(deadline) and future.cancel():
+            raise TierUnavailableError(f"{tier['name']} has no free worker, {self.max_workers} calls still running")
+
+        running.wait()
+        try:
+            return future.result(timeout=max(0.0, deadline - (time.monotonic() - began[0])))
+        except TimeoutError:
+            future.cancel()
+            raise
+
+
+    def _failed(self, name, breaker):
+        """Count a failure and report the circuit opening"""
+        if breaker.record_failure():
+            logging.warning(f"Summariser tier {name} failed {breaker.failures} times in a row, skipping it for {breaker.cooldown:.0f}s")
+
+
+    def _tier(self, name):
+        for tier in self.tiers:
+            if tier["name"] == name:
+                return tier
+        raise KeyError(f"Unknown summariser tier: {name}")
+
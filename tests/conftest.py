@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
 import pytest
 from bs4 import BeautifulSoup
 
@@ -138,4 +142,162 @@ def sample_instructions_file(tmp_path):
         - summarise abstracts
         - Return the data in a structured format: ```{"papers": {"title": <title>, "authors: <>, "link": <link>, "summary": <summary>}}```
         """)
-    return file_path
\ No newline at end of file
+    return file_path
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Request handler for the local HTTP stand-in server"""
+
+    def do_GET(self):
+        server = self.server
+        path = urlparse(self.path).path
+
+        with server.lock:
+            server.requests.append(self.path)
+            server.request_headers.append(dict(self.headers))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        try:
+            # Artificial network latency
+            time.sleep(server.delay)
+
+            route = server.routes.get(path)
+            if route is not None:
+                status, headers, body = route(self)
+            else:
+                status, headers = 200, {"Content-Type": "text/html; charset=utf-8"}
+                body = f"<html><body><p class='title is-5'>Page {path}</p></body></html>"
+
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+
+            if isinstance(body, bytes):
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                # A list or generator of chunks is streamed until the connection closes
+                self.end_headers()
+                for chunk in body:
+                    self.wfile.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+                    self.wfile.flush()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        # Keep the test output quiet
+        pass
+
+
+class _StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server ignoring clients that hang up early (e.g. after a read timeout)"""
+
+    def handle_error(self, request, client_address):
+        import sys
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+@pytest.fixture
+def local_server():
+    """Local HTTP stand-in server with configurable delay and routes
+
+    Routes map a path to a callable taking the handler and returning (status, headers, body),
+    where body may also be an iterable of chunks to stream
+    """
+    server = _StandInServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.delay = 0.0
+    server.routes = {}
+    server.requests = []
+    server.request_headers = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def build_arxiv_page(start=0, count=2, total=2, size=50, base_url="https://arxiv.org/search/?query=grpo&searchtype=all"):
+    """Build an arXiv search results page with the real page structure"""
+    results = []
+    for n in range(start, start + count):
+        arxiv_id = f"2501.{n:05d}"
+        results.append(f"""
+        <li class="arxiv-result">
+          <div class="is-marginless">
+            <p class="list-title is-inline-block"><a href="https://arxiv.org/abs/{arxiv_id}">arXiv:{arxiv_id}</a>
+              <span>&nbsp;[<a href="https://arxiv.org/pdf/{arxiv_id}">pdf</a>]</span>
+            </p>
+          </div>
+          <p class="title is-5 mathjax">
+            Paper {n}: Group Relative Policy Optimisation
+          </p>
+          <p class="authors">
+            <span class="search-hit">Authors:</span>
+            <a href="/search/?searchtype=author&amp;query=Author+{n}">Author {n}</a>,
+            <a href="/search/?searchtype=author&amp;query=Shared+Author">Shared Author</a>
+          </p>
+          <p class="abstract mathjax">
+            <span class="search-hit">Abstract</span>:
+            <span class="abstract-short has-text-grey-dark mathjax" id="{arxiv_id}v1-abstract-short" style="display: inline;">
+              Abstract of paper {n}. It studies reinforcement learning. The results are strong.
+            </span>
+          </p>
+          <p class="is-size-7"><span class="has-text-black-bis has-text-weight-semibold">Submitted</span> {28 - n % 28} January, 2025;
+            <span class="has-text-black-bis has-text-weight-semibold">originally announced</span> January 2025.</p>
+        </li>""")
+
+    end = start + count
+    next_link = ""
+    if end < total:
+        next_link = f'<a href="{base_url.replace("https://arxiv.org", "")}&amp;size={size}&amp;start={end}" class="pagination-next">Next</a>'
+
+    return f"""
+    <html>
+    <body>
+      <h1 class="title is-clearfix">
+        Showing {start + 1}&ndash;{end} of {total:,} results for all: <span class="mathjax">grpo</span>
+      </h1>
+      <nav class="pagination is-small is-centered breathe-horizontal" role="navigation" aria-label="pagination">
+        {next_link}
+      </nav>
+      <ol class="breathe-horizontal" start="{start + 1}">
+        {"".join(results)}
+      </ol>
+    </body>
+    </html>
+    """
+
+
+@pytest.fixture
+def arxiv_page():
+    """Factory for arXiv search results pages"""
+    return build_arxiv_page
+
+
+def build_papers(count, start=0, summary="Summary"):
+    """Build paper records as the pipeline yields them, with arXiv links and a shared author"""
+    return [
+        {"title": f"Paper {n}", "authors": [f"Author {n}", "Shared Author"], "link": f"https://arxiv.org/abs/2501.{n:05d}v1",
+         "abstract": f"Abstract {n}", "summary": f"{summary} {n}"}
+        for n in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def papers():
+    """Factory for paper records"""
+    return build_papers
@@ -1,7 +1,25 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import os
-from abstract_summariser import AbstractSummariser
+from abstract_summariser import AbstractSummariser, clear_model_registry, default_thread_count, choose_context_size
+
+
+@pytest.fixture(autouse=True)
+def fresh_model_registry():
+    """Every test loads its own (mocked) models"""
+    clear_model_registry()
+    yield
+    clear_model_registry()
+
+
+@pytest.fixture
+def make_summariser():
+    """Summarisers built by the real __init__ without a Gemini key, the tests then set stub backends"""
+    def make(**options):
+        with patch.dict(os.environ, {}, clear=True):
+            return AbstractSummariser(**options)
+    return make
+
 
 class TestAbstractSummariser:
     
@@ -17,6 +35,10 @@ class TestAbstractSummariser:
         with patch('google.generativeai.configure') as mock_configure:
             summariser = AbstractSummariser(api_key="test_api_key")
             assert summariser.api_key == "test_api_key"
+
+            # The client is configured on first use, not when the summariser is created
+            mock_configure.assert_not_called()
+            summariser.warm_up()
             mock_configure.assert_called_once_with(api_key="test_api_key")
     
     def test_init_with_env_api_key(self):
@@ -25,6 +47,7 @@ class TestAbstractSummariser:
             with patch('google.generativeai.configure') as mock_configure:
                 summariser = AbstractSummariser()
                 assert summariser.api_key == "env_api_key"
+                summariser.warm_up()
                 mock_configure.assert_called_once_with(api_key="env_api_key")
     
     def test_init_with_custom_model_path(self):
@@ -34,13 +57,13 @@ class TestAbstractSummariser:
             mock_llama.return_value = mock_llama_instance
             
             summariser = AbstractSummariser(model_path="custom/model/path")
+            mock_llama.assert_not_called()
             
             assert summariser.llm == mock_llama_instance
-            mock_llama.assert_called_once_with(model_path="custom/model/path")
+            mock_llama.assert_called_once_with(model_path="custom/model/path", n_ctx=2048, n_threads=default_thread_count())
     
-    @patch('abstract_summariser.AbstractSummariser.__init__', return_value=None)
     @patch('google.generativeai.GenerativeModel')
-    def test_summarise_with_gemini(self, mock_generative_model, mock_init):
+    def test_summarise_with_gemini(self, mock_generative_model, make_summariser):
         """Test summarizing with Gemini API"""
         # Setup mock response
         mock_model_instance = Mock()
@@ -50,7 +73,7 @@ class TestAbstractSummariser:
         mock_generative_model.return_value = mock_model_instance
         
         # Create summariser instance and configure it
-        summariser = AbstractSummariser()
+        summariser = make_summariser()
         summariser.api_key = "test_api_key"
         summariser.genai = MagicMock()
         summariser.genai.GenerativeModel = mock_generative_model
@@ -64,8 +87,7 @@ class TestAbstractSummariser:
         mock_generative_model.assert_called_once_with('gemini-2.0-flash-lite')
         mock_model_instance.generate_content.assert_called_once()
     
-    @patch('abstract_summariser.AbstractSummariser.__init__', return_value=None)
-    def test_summarise_with_llama(self, mock_init):
+    def test_summarise_with_llama(self, make_summariser):
         """Test summarizing with Llama model"""
         # Create mock Llama model
         mock_llama = Mock()
@@ -74,7 +96,7 @@ class TestAbstractSummariser:
         }
         
         # Create summariser instance and configure it
-        summariser = AbstractSummariser()
+        summariser = make_summariser()
         summariser.api_key = None
         summariser.genai = None
         summariser.llm = mock_llama
@@ -86,11 +108,10 @@ class TestAbstractSummariser:
         assert result == "This is a summarised abstract with Llama."
         mock_llama.assert_called_once()
     
-    @patch('abstract_summariser.AbstractSummariser.__init__', return_value=None)
-    def test_summarise_fallback(self, mock_init):
+    def test_summarise_fallback(self, make_summariser):
         """Test fallback to simple extraction when both models fail"""
         # Create summariser instance with no working models
-        summariser = AbstractSummariser()
+        summariser = make_summariser()
         summariser.api_key = None
         summariser.genai = None
         summariser.llm = None
@@ -138,4 +159,436 @@ class TestAbstractSummariser:
         assert len(summaries) == 3
         assert summaries[0] == "Summary of Abstract 1"
         assert "Error" in summaries[1]
-        assert summaries[2] == "Summary of Abstract 3"
\ No newline at end of file
+        assert summaries[2] == "Summary of Abstract 3"
+
+    def test_init_concurrency_options(self):
+        """Test the concurrency and request budget options"""
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(max_in_flight=4, requests_per_minute=120)
+            assert summariser.max_in_flight == 4
+            assert summariser.rate_limiter is not None
+            assert summariser.rate_limiter.rate == 2.0
+
+            summariser = AbstractSummariser()
+            assert summariser.max_in_flight == 1
+            assert summariser.rate_limiter is None
+
+    @patch('abstract_summariser.AbstractSummariser.summarise')
+    def test_summarise_abstracts_concurrent_keeps_order(self, mock_summarise):
+        """Test concurrent summarisation runs requests at once and keeps the output order"""
+        import threading
+        import time
+
+        in_flight = []
+        lock = threading.Lock()
+        current = [0]
+
+        def side_effect(text):
+            with lock:
+                current[0] += 1
+                in_flight.append(current[0])
+            # Later abstracts finish first
+            time.sleep(0.05 * (5 - int(text.split()[-1])))
+            with lock:
+                current[0] -= 1
+            return f"Summary of {text}"
+
+        mock_summarise.side_effect = side_effect
+
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(max_in_flight=4)
+        abstracts = [f"Abstract {i}" for i in range(5)]
+        summaries = summariser.Summarise_abstracts(abstracts)
+
+        assert summaries == [f"Summary of Abstract {i}" for i in range(5)]
+        assert 1 < max(in_flight) <= 4
+
+    @patch('abstract_summariser.AbstractSummariser.summarise')
+    def test_summarise_abstracts_concurrent_with_errors(self, mock_summarise):
+        """Test the placeholder is kept per item when running concurrently"""
+        def side_effect(text):
+            if text == "Abstract 2":
+                raise Exception("Test error")
+            return f"Summary of {text}"
+
+        mock_summarise.side_effect = side_effect
+
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(max_in_flight=3)
+        summaries = summariser.Summarise_abstracts(["Abstract 1", "Abstract 2", "Abstract 3"])
+
+        assert summaries[0] == "Summary of Abstract 1"
+        assert "Error" in summaries[1]
+        assert summaries[2] == "Summary of Abstract 3"
+
+    @patch('abstract_summariser.AbstractSummariser._generate_summary')
+    def test_summarise_abstracts_uses_request_budget(self, mock_generate_summary):
+        """Test every request to the model takes a token from the rate limiter, cache hits do not"""
+        from summary_cache import SummaryCache
+
+        mock_generate_summary.side_effect = lambda text: (f"Summary of {text}", "gemini")
+
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(max_in_flight=2, cache=SummaryCache(":memory:"))
+        summariser.genai = MagicMock()
+        summariser.rate_limiter = Mock()
+
+        summariser.Summarise_abstracts(["Abstract 1", "Abstract 2", "Abstract 3"])
+        assert summariser.rate_limiter.acquire.call_count == 3
+
+        summaries = summariser.Summarise_abstracts(["Abstract 1", "Abstract 2", "Abstract 3", "Abstract 4"])
+        assert summaries[3] == "Summary of Abstract 4"
+        assert summariser.rate_limiter.acquire.call_count == 4
+
+    def test_plan_batches_respects_token_budget(self, make_summariser):
+        """Test batches adapt to the token budget and the maximum batch size"""
+        summariser = make_summariser(batch_token_budget=1000, max_batch_size=3)
+
+        # Each abstract costs 400 / 4 + 120 = 220 tokens, so 4 fit the budget but the size caps it at 3
+        texts = ["x" * 400] * 7
+        assert summariser._plan_batches(texts) == [[0, 1, 2], [3, 4, 5], [6]]
+
+        # A longer abstract takes a batch on its own
+        summariser.max_batch_size = 25
+        texts = ["x" * 400, "y" * 4000, "z" * 400]
+        assert summariser._plan_batches(texts) == [[0], [1], [2]]
+
+    def test_summarise_batch_parses_json(self, make_summariser):
+        """Test a batched JSON response is split back into per-abstract summaries"""
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text='```json\n[{"id": 1, "summary": "Second."}, {"id": 0, "summary": "First."}]\n```')
+
+        summariser = make_summariser()
+        summariser.genai = MagicMock()
+        summariser.gemini_model = mock_model
+
+        summaries = summariser.summarise_batch(["Abstract A", "Abstract B", "Abstract C"])
+
+        assert summaries == ["First.", "Second.", None]
+        prompt = mock_model.generate_content.call_args[0][0]
+        assert "[0] Abstract A" in prompt
+        assert "[2] Abstract C" in prompt
+
+    def test_summarise_batch_invalid_json(self, make_summariser):
+        """Test an unparseable batched response leaves every entry unsummarised"""
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text="Not JSON at all")
+
+        summariser = make_summariser()
+        summariser.genai = MagicMock()
+        summariser.gemini_model = mock_model
+
+        assert summariser.summarise_batch(["Abstract A", "Abstract B"]) == [None, None]
+
+    @patch('abstract_summariser.AbstractSummariser.summarise')
+    @patch('abstract_summariser.AbstractSummariser.summarise_batch')
+    def test_summarise_abstracts_batch_mode(self, mock_summarise_batch, mock_summarise):
+        """Test batch mode sends one request per batch and falls back for missing entries"""
+        mock_summarise_batch.side_effect = lambda texts: [None if text == "Abstract 2" else f"Batch summary of {text}" for text in texts]
+        mock_summarise.side_effect = lambda text: f"Single summary of {text}"
+
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(batch_mode=True, max_batch_size=2)
+        summariser.genai = MagicMock()
+
+        abstracts = ["Abstract 1", "Abstract 2", "Abstract 3", "Abstract 4", "Abstract 5"]
+        summaries = summariser.Summarise_abstracts(abstracts)
+
+        assert summaries == [
+            "Batch summary of Abstract 1",
+            "Single summary of Abstract 2",
+            "Batch summary of Abstract 3",
+            "Batch summary of Abstract 4",
+            "Batch summary of Abstract 5",
+        ]
+        assert mock_summarise_batch.call_count == 3
+        mock_summarise.assert_called_once_with("Abstract 2")
+
+    def test_summarise_uses_cache(self, make_summariser):
+        """Test repeated abstracts are served from the summary cache"""
+        from summary_cache import SummaryCache
+
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text="Model summary.")
+
+        summariser = make_summariser(cache=SummaryCache(":memory:"))
+        summariser.genai = MagicMock()
+        summariser.llm = None
+        summariser.gemini_model = mock_model
+
+        assert summariser.summarise("An abstract.") == "Model summary."
+        assert summariser.summarise("An abstract.") == "Model summary."
+
+        mock_model.generate_content.assert_called_once()
+        assert summariser.cache.stats()["hits"] == 1
+        assert summariser.cache.stats()["misses"] == 1
+
+    def test_summarise_does_not_cache_fallback(self, make_summariser):
+        """Test the simple extraction fallback is never cached"""
+        from summary_cache import SummaryCache
+
+        summariser = make_summariser(cache=SummaryCache(":memory:"))
+        summariser.genai = None
+        summariser.llm = None
+
+        summariser.summarise("First. Second.")
+        assert summariser.cache.stats()["entries"] == 0
+
+    def test_summarise_caches_under_answering_tier(self, make_summariser):
+        """Test a summary is cached under the model that wrote it when the preferred model failed"""
+        from summary_cache import SummaryCache
+
+        cache = SummaryCache(":memory:")
+        gemini_model = Mock()
+        gemini_model.generate_content.side_effect = ConnectionError("Service unavailable")
+
+        summariser = make_summariser(model_path="models/tiny.gguf", cache=cache)
+        summariser.genai = MagicMock()
+        summariser.gemini_model = gemini_model
+        summariser.llm = Mock(return_value={"choices": [{"text": "Llama summary."}]})
+
+        assert summariser.summarise("An abstract.") == "Llama summary."
+        assert cache.get(summariser._cache_key("An abstract.", "gemini")) is None
+        assert cache.get(summariser._cache_key("An abstract.", "llama")) == "Llama summary."
+
+        # Both models down: the extraction fallback is not cached under either of them
+        summariser.llm.side_effect = RuntimeError("Model crashed")
+        summariser.summarise("First sentence. Second sentence.")
+        assert cache.stats()["entries"] == 1
+
+    @patch('abstract_summariser.AbstractSummariser.summarise_batch')
+    def test_summarise_abstracts_batch_mode_only_sends_misses(self, mock_summarise_batch):
+        """Test batch mode only sends cache misses to the model"""
+        from summary_cache import SummaryCache
+
+        mock_summarise_batch.side_effect = lambda texts: [f"Summary of {text}" for text in texts]
+
+        with patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(batch_mode=True, cache=SummaryCache(":memory:"))
+        summariser.genai = MagicMock()
+
+        summariser.Summarise_abstracts(["Abstract 1", "Abstract 2"])
+        summaries = summariser.Summarise_abstracts(["Abstract 1", "Abstract 2", "Abstract 3"])
+
+        assert summaries == ["Summary of Abstract 1", "Summary of Abstract 2", "Summary of Abstract 3"]
+        assert mock_summarise_batch.call_args_list[1][0][0] == ["Abstract 3"]
+        assert summariser.cache.stats()["hits"] == 2
+
+    def test_models_load_lazily_once_per_process(self):
+        """Test models load on the first summary and are shared by every summariser with the same settings"""
+        with patch('llama_cpp.Llama') as mock_llama, patch.dict(os.environ, {}, clear=True):
+            mock_llama.return_value.return_value = {"choices": [{"text": "Llama summary"}]}
+
+            first = AbstractSummariser(model_path="custom/model/path")
+            second = AbstractSummariser(model_path="custom/model/path")
+            mock_llama.assert_not_called()
+
+            assert first.summarise("Abstract") == "Llama summary"
+            assert second.summarise("Abstract") == "Llama summary"
+
+            mock_llama.assert_called_once()
+            assert first.llm is second.llm
+
+            # Another model path is a different model
+            AbstractSummariser(model_path="other/model/path").warm_up()
+            assert mock_llama.call_count == 2
+
+    def test_model_context_is_part_of_the_registry_key(self):
+        """Test a model loaded with a small context is never handed to a summariser needing a larger one"""
+        with patch('llama_cpp.Llama') as mock_llama, patch.dict(os.environ, {}, clear=True):
+            mock_llama.side_effect = lambda **settings: Mock(settings=settings)
+            short, long = ["word " * 100], ["word " * 2000]
+
+            first = AbstractSummariser(model_path="custom/model/path", llama_threads=2)
+            first.warm_up(short)
+            assert first.llm.settings["n_ctx"] == 512
+
+            # An explicit context is always honoured
+            explicit = AbstractSummariser(model_path="custom/model/path", llama_threads=2, llama_ctx=4096)
+            explicit.warm_up(short)
+            assert explicit.llm.settings["n_ctx"] == 4096
+
+            # Contexts sized from the abstracts reuse any loaded copy that is large enough
+            sized = AbstractSummariser(model_path="custom/model/path", llama_threads=2)
+            sized.warm_up(long)
+            assert sized.llm is explicit.llm
+
+            again = AbstractSummariser(model_path="custom/model/path", llama_threads=2)
+            again.warm_up(short)
+            assert again.llm.settings["n_ctx"] >= 512
+            assert mock_llama.call_count == 2
+
+            # Another thread count is another model
+            AbstractSummariser(model_path="custom/model/path", llama_threads=4).warm_up(short)
+            assert mock_llama.call_count == 3
+
+    def test_summarise_abstracts_empty_does_not_load(self):
+        """Test nothing is loaded when there is nothing to summarise"""
+        with patch('llama_cpp.Llama') as mock_llama, patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(model_path="custom/model/path")
+            assert summariser.Summarise_abstracts([]) == []
+            mock_llama.assert_not_called()
+
+    def test_warm_up_failed_load_is_not_retried(self):
+        """Test a model that failed to load falls back without trying again on every summary"""
+        with patch('llama_cpp.Llama', side_effect=Exception("Bad model file")) as mock_llama, patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(model_path="broken/model/path")
+            assert summariser.warm_up() is summariser
+            assert summariser.llm is None
+
+            AbstractSummariser(model_path="broken/model/path").warm_up()
+            assert mock_llama.call_count == 1
+
+    def test_choose_context_size(self):
+        """Test the local context grows with the abstracts per prompt within the model limits"""
+        short = ["word " * 100] * 10
+        long = ["word " * 2000] * 10
+
+        assert choose_context_size([]) == 2048
+        assert choose_context_size(short, batch_size=1) == 512
+        assert choose_context_size(short, batch_size=2) == 1024
+        assert choose_context_size(long, batch_size=4) == 4096
+
+    def test_local_model_settings(self):
+        """Test the thread count and context size given to the local model"""
+        with patch('llama_cpp.Llama') as mock_llama, patch.dict(os.environ, {}, clear=True):
+            summariser = AbstractSummariser(model_path="custom/model/path", llama_threads=2)
+            summariser.Summarise_abstracts(["A short abstract."])
+
+            mock_llama.assert_called_once_with(model_path="custom/model/path", n_ctx=512, n_threads=2)
+
+        assert default_thread_count() >= 1
+
+    def test_summarise_abstracts_local_batches(self, make_summariser):
+        """Test local batch mode packs several abstracts per prompt behind the same instruction prefix"""
+        import json
+        from abstract_summariser import LLAMA_BATCH_PROMPT
+
+        prompts = []
+
+        def generate(prompt, **kwargs):
+            prompts.append(prompt)
+            count = prompt.count("\n\n[")
+            entries = [{"id": i, "summary": f"Summary {i}"} for i in range(count + 1)]
+            return {"choices": [{"text": json.dumps(entries)}], "usage": {"prompt_tokens": 300, "completion_tokens": 60}}
+
+        summariser = make_summariser(batch_mode=True, llama_batch_size=2)
+        summariser.genai = None
+        summariser.llm = Mock(side_effect=generate)
+        summariser.llm.n_ctx.return_value = 4096
+
+        summaries = summariser.Summarise_abstracts([f"Abstract {i}" for i in range(5)])
+
+        assert summaries == ["Summary 0", "Summary 1", "Summary 0", "Summary 1", "Summary 0"]
+        assert len(prompts) == 3
+
+        # Every batch starts with the same prefix so its KV state is reused
+        prefix = LLAMA_BATCH_PROMPT.split("{abstracts}")[0]
+        assert all(prompt.startswith(prefix) for prompt in prompts)
+
+        stats = summariser.llama_throughput()
+        assert stats["calls"] == 3
+        assert stats["completion_tokens"] == 180
+        assert stats["tokens_per_sec"] > 0
+
+    def test_summarise_abstracts_local_batch_falls_back(self, make_summariser):
+        """Test abstracts missing from a local batched answer are summarised one by one"""
+        summariser = make_summariser(batch_mode=True)
+        summariser.genai = None
+        summariser.llm = Mock(side_effect=[
+            {"choices": [{"text": '[{"id": 0, "summary": "Batched summary"}]'}]},
+            {"choices": [{"text": "Single summary"}]},
+        ])
+        summariser.llm.n_ctx.return_value = 2048
+
+        assert summariser.Summarise_abstracts(["Abstract 0", "Abstract 1"]) == ["Batched summary", "Single summary"]
+
+
+    def test_extractive_mode(self):
+        """Test the extractive mode summarises the whole batch without loading any model"""
+        with patch('llama_cpp.Llama') as mock_llama, patch('google.generativeai.configure') as mock_configure:
+            summariser = AbstractSummariser(api_key="test_api_key", mode="extractive")
+            abstract = "First sentence. Second sentence. Third sentence. Fourth sentence. Fifth sentence."
+
+            summaries = summariser.Summarise_abstracts([abstract, "Only one sentence."])
+            assert summaries == ["First sentence. Second sentence. Third sentence. Fourth sentence.", "Only one sentence."]
+            assert summariser.summarise("Only one sentence.") == "Only one sentence."
+
+            mock_llama.assert_not_called()
+            mock_configure.assert_not_called()
+
+        with pytest.raises(ValueError):
+            AbstractSummariser(mode="unknown")
+
+    def test_gemini_outage_opens_circuit(self, make_summariser):
+        """Test a Gemini outage costs a few failed calls, not one per abstract"""
+        summariser = make_summariser()
+        summariser.genai = MagicMock()
+        summariser.llm = None
+        summariser.gemini_model = MagicMock()
+        summariser.gemini_model.generate_content.side_effect = Exception("503 Service Unavailable")
+
+        abstract = "First sentence. Second sentence. Third sentence. Fourth sentence. Fifth sentence."
+        summaries = summariser.Summarise_abstracts([abstract] * 10)
+
+        assert summaries == ["First sentence. Second sentence. Third sentence. Fourth sentence."] * 10
+        assert summariser.gemini_model.generate_content.call_count == 3
+
+        metrics = summariser.tier_metrics()
+        assert metrics["gemini"]["failures"] == 3
+        assert metrics["gemini"]["skipped"] == 7
+        assert metrics["gemini"]["circuit"] == "open"
+        assert metrics["extraction"]["successes"] == 10
+
+    def test_gemini_deadline(self, make_summariser):
+        """Test a Gemini call over its deadline falls through to the next tier"""
+        import time
+
+        summariser = make_summariser(tier_deadlines={"gemini": 0.05})
+        summariser.genai = MagicMock()
+        summariser.llm = None
+        summariser.gemini_model = MagicMock()
+        summariser.gemini_model.generate_content.side_effect = lambda prompt: time.sleep(0.5)
+
+        assert summariser.summarise("Only one sentence.") == "Only one sentence."
+        assert summariser.tier_metrics()["gemini"]["timeouts"] == 1
+
+    def test_hanging_gemini_does_not_trip_llama(self, make_summariser):
+        """Test Gemini calls that hang past their deadline leave the local model answering every abstract"""
+        import threading
+        import time
+
+        release = threading.Event()
+        summariser = make_summariser(max_in_flight=4, tier_deadlines={"gemini": 0.2, "llama": 1.0})
+        summariser.genai = MagicMock()
+        summariser.llm = Mock(side_effect=lambda prompt, **kwargs: time.sleep(0.05) or {"choices": [{"text": "Llama summary"}]})
+        summariser.gemini_model = MagicMock()
+        summariser.gemini_model.generate_content.side_effect = lambda prompt: release.wait()
+
+        assert summariser.Summarise_abstracts(["An abstract."] * 8) == ["Llama summary"] * 8
+
+        metrics = summariser.tier_metrics()
+        assert metrics["llama"]["successes"] == 8
+        assert metrics["llama"]["circuit"] == "closed"
+        assert metrics["extraction"]["calls"] == 0
+
+        release.set()
+        summariser.router.close()
+
+    def test_run_budget_per_call(self, make_summariser):
+        """Test every Summarise_abstracts call routes with its own budget"""
+        summariser = make_summariser(run_budget=100)
+        summariser.genai = MagicMock()
+        summariser.llm = None
+        summariser.gemini_model = MagicMock()
+        summariser.gemini_model.generate_content.return_value.text = "Gemini summary"
+
+        router = summariser._get_router()
+        with patch.object(router, 'route', wraps=router.route) as mock_route:
+            summariser.Summarise_abstracts(["Abstract 0", "Abstract 1"])
+            summariser.Summarise_abstracts(["Abstract 2"])
+
+        runs = [call.args[1] for call in mock_route.call_args_list]
+        assert runs[0] is runs[1]
+        assert runs[2] is not runs[0]
+        assert runs[2].remaining_items == 0
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import Mock, patch
 import json
+import io
 from agent import Agent
+from sqlite_sink import SqliteSink
 
 class TestAgent:
     
@@ -75,6 +77,22 @@ class TestAgent:
         # Setup mocks
         mock_args = Mock()
         mock_args.instructions_file = "test_instructions.txt"
+        mock_args.http_cache = None
+        mock_args.offline = False
+        mock_args.rate_limit = None
+        mock_args.max_results = None
+        mock_args.parser = "auto"
+        mock_args.pipeline = False
+        mock_args.stream = None
+        mock_args.output = None
+        mock_args.compact = False
+        mock_args.summariser = "auto"
+        mock_args.index = None
+        mock_args.index_mode = "skip"
+        mock_args.incremental = False
+        mock_args.watermarks = "watermarks.json"
+        mock_args.export = None
+        mock_args.sqlite = None
         mock_parse_args.return_value = mock_args
         
         mock_run.return_value = json.dumps({"result": "success"})
@@ -89,4 +107,302 @@ class TestAgent:
         
         # Check stdout
         captured = capsys.readouterr()
-        assert '{"result": "success"}' in captured.out
\ No newline at end of file
+        assert '{"result": "success"}' in captured.out
+
+    def test_init_with_custom_controller(self):
+        """Test Agent initialisation with a custom controller"""
+        mock_controller = Mock()
+        agent = Agent(controller=mock_controller)
+        assert agent.controller == mock_controller
+
+    def test_build_controller(self, tmp_path):
+        """Test the command-line options are turned into controller components"""
+        from agent import build_controller
+
+        args = Mock()
+        args.http_cache = str(tmp_path / "http.sqlite")
+        args.offline = True
+        args.rate_limit = None
+        args.max_results = None
+        args.parser = "auto"
+        args.pipeline = False
+        args.compact = False
+        args.summariser = "auto"
+        args.index = None
+        args.index_mode = "skip"
+
+        controller = build_controller(args)
+        assert controller.scraper.offline
+        assert controller.scraper.cache.path == args.http_cache
+        assert controller.paginator is None
+
+        # Pagination on its own keeps the default scraper
+        args.http_cache = None
+        args.offline = False
+        args.max_results = 500
+        controller = build_controller(args)
+        assert controller.paginator.max_results == 500
+
+        # A parser backend on its own configures the scraper without a cache
+        args.max_results = None
+        args.parser = "html.parser"
+        controller = build_controller(args)
+        assert controller.scraper.parser == "html.parser"
+        assert controller.scraper.cache is None
+        args.parser = "auto"
+
+        # A rate limit configures the scraper's per-host limiter
+        args.rate_limit = 2.0
+        assert build_controller(args).scraper.rate_limiter.rate == 2.0
+        args.rate_limit = None
+
+        # The pipeline option switches the controller to streaming mode
+        args.pipeline = True
+        controller = build_controller(args)
+        assert controller.pipeline
+        args.pipeline = False
+
+        # Compact output configures the structurer
+        args.compact = True
+        assert build_controller(args).structurer.compact
+        args.compact = False
+
+        # The extractive mode configures the summariser
+        args.summariser = "extractive"
+        assert build_controller(args).summariser.mode == "extractive"
+        args.summariser = "auto"
+
+        # A paper index path opens the index
+        args.index = str(tmp_path / "index.sqlite")
+        args.index_mode = "new"
+        controller = build_controller(args)
+        assert controller.index.path == args.index
+        assert controller.index_mode == "new"
+        args.index = None
+        args.index_mode = "skip"
+
+        # Without any options the default components are used
+        args.max_results = None
+        assert build_controller(args) is None
+
+    def test_stream(self, sample_instructions_file):
+        """Test streamed runs write one paper per line as the controller yields them"""
+        from Output_Structurer import OutputStructurer
+
+        papers = [{"title": "Paper 1", "link": "https://arxiv.org/abs/1", "summary": "Summary 1"}, {"title": "Paper 2"}]
+        mock_controller = Mock()
+        mock_controller.stream_actions.return_value = iter(papers)
+        mock_controller.structurer = OutputStructurer()
+
+        stream = io.StringIO()
+        agent = Agent(controller=mock_controller)
+        assert agent.stream(sample_instructions_file, stream) == 2
+
+        lines = stream.getvalue().splitlines()
+        assert json.loads(lines[0]) == {"title": "Paper 1", "authors": [], "link": "https://arxiv.org/abs/1", "summary": "Summary 1"}
+        assert json.loads(lines[1])["title"] == "Paper 2"
+
+    def test_stream_error(self, sample_instructions_file):
+        """Test streamed runs report failures instead of raising"""
+
+        mock_controller = Mock()
+        mock_controller.stream_actions.side_effect = Exception("Failed to execute actions")
+
+        agent = Agent(controller=mock_controller)
+        assert agent.stream(sample_instructions_file, io.StringIO()) is None
+
+
+    def test_run_batch(self, tmp_path, arxiv_page):
+        """Test many instruction files run on shared components with one output per job and a report"""
+        from bs4 import BeautifulSoup
+        from Controller import Controller
+        from items_extractor import ItemsExtractor
+        from Output_Structurer import OutputStructurer
+
+        page = arxiv_page(start=0, count=3, total=3)
+        mock_scraper = Mock()
+        mock_scraper.fetch_many = None
+        mock_summariser = Mock()
+        mock_summariser.Summarise_abstracts.side_effect = lambda abstracts: ["Summary"] * len(abstracts)
+
+        jobs_dir = tmp_path / "jobs"
+        jobs_dir.mkdir()
+        for n in range(3):
+            (jobs_dir / f"job_{n}.txt").write_text(
+                f"- goto: https://arxiv.org/search/?query=job{n}\n- extract title, authors and links\n- summarise abstracts\n",
+                encoding="utf-8"
+            )
+        # An instruction file whose page cannot be fetched
+        (jobs_dir / "broken.txt").write_text("- goto: https://arxiv.org/broken\n- extract title\n", encoding="utf-8")
+
+        def fetch_n_parse(url):
+            if "broken" in url:
+                raise Exception("Connection refused")
+            return page, BeautifulSoup(page, "html.parser")
+
+        mock_scraper.fetch_n_parse.side_effect = fetch_n_parse
+
+        from agent import collect_instruction_files
+        files = collect_instruction_files(str(jobs_dir))
+        assert [path.split("/")[-1] for path in files] == ["broken.txt", "job_0.txt", "job_1.txt", "job_2.txt"]
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=mock_summariser, structurer=OutputStructurer())
+        sink = SqliteSink(str(tmp_path / "papers.sqlite"))
+        report = Agent(controller=controller).run_batch(files, str(tmp_path / "out"), max_workers=2, sink=sink)
+
+        assert report["total"] == 4
+        assert report["succeeded"] == 3
+        assert report["failed"] == 1
+        assert report["papers"] == 9
+        assert report["jobs"][0]["status"] == "error"
+        assert "Connection refused" in report["jobs"][0]["error"]
+
+        output = json.loads((tmp_path / "out" / "job_1.json").read_text(encoding="utf-8"))
+        assert len(output["papers"]) == 3
+        assert output["papers"][0]["summary"] == "Summary"
+        assert json.loads((tmp_path / "out" / "batch_report.json").read_text(encoding="utf-8")) == report
+
+        # The jobs found the same papers, upserted once into the shared database
+        assert sink.stats()["written"] == 9
+        assert sink.stats()["papers"] == 3
+        sink.close()
+
+        # The template controller keeps no state from the jobs
+        assert controller.state == {}
+
+    def test_batch_output_paths(self):
+        """Test instruction files sharing a name get numbered output files"""
+        from agent import batch_output_paths
+
+        paths = batch_output_paths(["a/jobs.txt", "b/jobs.txt", "c/other.txt"], "out")
+        assert paths == ["out/jobs.json", "out/jobs_2.json", "out/other.json"]
+
+    @patch('agent.Agent.run_batch')
+    def test_main_run_many(self, mock_run_batch, tmp_path, capsys):
+        """Test the run-many command collects the instruction files of a glob"""
+        from agent import main
+
+        for name in ["a.txt", "b.txt", "c.md"]:
+            (tmp_path / name).write_text("- goto: https://example.com\n", encoding="utf-8")
+        mock_run_batch.return_value = {"jobs": [], "total": 2, "succeeded": 2, "failed": 0, "papers": 0, "seconds": 0.1}
+
+        exit_code = main(["run-many", str(tmp_path / "*.txt"), "--output-dir", str(tmp_path / "out"), "--workers", "3"])
+
+        assert exit_code == 0
+        files, output_dir = mock_run_batch.call_args[0]
+        assert [path.split("/")[-1] for path in files] == ["a.txt", "b.txt"]
+        assert output_dir == str(tmp_path / "out")
+        assert mock_run_batch.call_args[1]["max_workers"] == 3
+        assert '"succeeded": 2' in capsys.readouterr().out
+
+        # Nothing to run
+        assert main(["run-many", str(tmp_path / "*.json")]) == 1
+
+    @patch('agent_server.AgentServer.serve_forever')
+    def test_main_serve(self, mock_serve_forever):
+        """Test the serve command starts the service with the given options"""
+        from agent import main
+
+        with patch('agent_server.AgentServer.__init__', return_value=None) as mock_init:
+            assert main(["serve", "--port", "9000", "--workers", "3"]) == 0
+
+        assert mock_init.call_args[1]["port"] == 9000
+        assert mock_init.call_args[1]["workers"] == 3
+        mock_serve_forever.assert_called_once()
+
+
+    def test_run_incremental(self, tmp_path, arxiv_page):
+        """Test a second run stops paginating at the papers of the first run and only outputs the new ones"""
+        from urllib.parse import urlparse, parse_qs
+        from bs4 import BeautifulSoup
+        from Controller import Controller
+        from items_extractor import ItemsExtractor
+        from Output_Structurer import OutputStructurer
+        from paginator import Paginator
+        from watermarks import WatermarkStore
+
+        instructions = tmp_path / "search.txt"
+        instructions.write_text(
+            "- goto: https://arxiv.org/search/?query=grpo&order=-announced_date_first\n- extract title and links\n- summarise abstracts\n",
+            encoding="utf-8"
+        )
+
+        # Results newest first, 2 per page: the first run sees papers 2 to 7, then papers 0 and 1 are published
+        newest = {"id": 2, "total": 6}
+        fetched = []
+
+        def fetch_n_parse(url):
+            fetched.append(url)
+            offset = int(parse_qs(urlparse(url).query).get("start", ["0"])[0])
+            page = arxiv_page(start=newest["id"] + offset, count=2, total=newest["total"])
+            return page, BeautifulSoup(page, "html.parser")
+
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.side_effect = fetch_n_parse
+        mock_scraper.fetch_many.side_effect = lambda urls: ((url, *fetch_n_parse(url)) for url in urls)
+        mock_summariser = Mock()
+        mock_summariser.Summarise_abstracts.side_effect = lambda abstracts: ["Summary"] * len(abstracts)
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=mock_summariser,
+                                structurer=OutputStructurer(), paginator=Paginator(max_results=100))
+        agent = Agent(controller=controller, watermarks=WatermarkStore(str(tmp_path / "watermarks.json")))
+
+        first = json.loads(agent.run(str(instructions)))
+        assert [paper["link"][-5:] for paper in first["papers"]] == ["00002", "00003", "00004", "00005", "00006", "00007"]
+        assert len(fetched) == 3
+
+        newest.update(id=0, total=8)
+        fetched.clear()
+        second = json.loads(agent.run(str(instructions)))
+
+        # The second page already lists papers of the first run, so pagination stops there
+        assert [paper["link"][-5:] for paper in second["papers"]] == ["00000", "00001"]
+        assert len(fetched) == 2
+        assert mock_summariser.Summarise_abstracts.call_args[0][0] == ["Abstract of paper 0. It studies reinforcement learning. The results are strong.",
+                                                                       "Abstract of paper 1. It studies reinforcement learning. The results are strong."]
+
+        # Nothing new: a single page is fetched and nothing is output
+        fetched.clear()
+        assert json.loads(agent.run(str(instructions)))["papers"] == []
+        assert len(fetched) == 1
+
+        # The shared controller is not left in incremental mode
+        assert controller.watermark is None
+
+    def test_export_incremental(self, tmp_path, arxiv_page):
+        """Test an incremental export only writes the papers new since the last run and moves the watermark"""
+        import sqlite3
+        from bs4 import BeautifulSoup
+        from Controller import Controller
+        from items_extractor import ItemsExtractor
+        from Output_Structurer import OutputStructurer
+        from watermarks import WatermarkStore
+
+        instructions = tmp_path / "search.txt"
+        instructions.write_text("- goto: https://arxiv.org/search/?query=grpo\n- extract title and links\n", encoding="utf-8")
+
+        # A single results page, newest first: the first run sees papers 2 to 5
+        newest = {"id": 2}
+
+        def fetch_n_parse(url):
+            page = arxiv_page(start=newest["id"], count=6 - newest["id"], total=6 - newest["id"])
+            return page, BeautifulSoup(page, "html.parser")
+
+        mock_scraper = Mock(spec=["fetch_n_parse"])
+        mock_scraper.fetch_n_parse.side_effect = fetch_n_parse
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=Mock(), structurer=OutputStructurer())
+        watermarks = WatermarkStore(str(tmp_path / "watermarks.json"))
+        agent = Agent(controller=controller, watermarks=watermarks)
+        path = str(tmp_path / "papers.sqlite")
+
+        assert agent.export(str(instructions), SqliteSink(path)) == 4
+
+        # Papers 0 and 1 are published, the page now lists all six
+        newest["id"] = 0
+        assert agent.export(str(instructions), SqliteSink(path)) == 2
+        assert agent.export(str(instructions), SqliteSink(path)) == 0
+
+        assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM papers").fetchone()[0] == 6
+        assert len(watermarks.seen(WatermarkStore.key(str(instructions)))) == 6
+        assert controller.watermark is None
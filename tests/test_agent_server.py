@@ -0,0 +1,148 @@
+import pytest
+import json
+import threading
+import urllib.request
+import urllib.error
+from unittest.mock import Mock
+from agent import Agent
+from agent_server import AgentServer
+from Controller import Controller
+from items_extractor import ItemsExtractor
+from Output_Structurer import OutputStructurer
+
+INSTRUCTIONS = "- goto: https://arxiv.org/search/?query=grpo\n- extract title, authors and links\n- summarise abstracts\n"
+
+
+def request(url, data=None, content_type="text/plain"):
+    """Local client call returning (status, JSON body)"""
+    req = urllib.request.Request(url, data=data.encode("utf-8") if data is not None else None)
+    if data is not None:
+        req.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def service(arxiv_page):
+    """Agent service on a free local port with a stand-in scraper and summariser"""
+    from bs4 import BeautifulSoup
+
+    page = arxiv_page(start=0, count=2, total=2)
+    mock_scraper = Mock()
+    mock_scraper.fetch_many = None
+    mock_scraper.fetch_n_parse.side_effect = lambda url: (page, BeautifulSoup(page, "html.parser"))
+    mock_summariser = Mock()
+    mock_summariser.Summarise_abstracts.side_effect = lambda abstracts: ["Summary"] * len(abstracts)
+
+    controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=mock_summariser, structurer=OutputStructurer())
+    server = AgentServer(Agent(controller=controller), port=0, workers=2).start()
+    yield server
+    if server.accepting:
+        server.shutdown(timeout=5)
+
+
+class TestAgentServer:
+
+    def test_submit_and_wait(self, service):
+        """Test a job sent with wait=1 returns its result"""
+        status, body = request(f"{service.url}/jobs?wait=1", INSTRUCTIONS)
+
+        assert status == 200
+        assert body["status"] == "finished"
+        assert len(body["result"]["papers"]) == 2
+        assert body["result"]["papers"][0]["summary"] == "Summary"
+
+    def test_submit_returns_job_id(self, service):
+        """Test queued jobs return an id that can be polled for the result"""
+        status, body = request(f"{service.url}/jobs", json.dumps({"instructions": INSTRUCTIONS}), "application/json")
+
+        assert status == 202
+        assert body["status"] in ("queued", "running", "finished")
+
+        service.get_job(body["id"])["done"].wait(5)
+        status, body = request(f"{service.url}/jobs/{body['id']}")
+        assert status == 200
+        assert body["status"] == "finished"
+        assert body["result"]["papers"][1]["title"] == "Paper 1: Group Relative Policy Optimisation"
+
+    def test_components_shared_across_jobs(self, service):
+        """Test every job runs on the same warm components with its own state"""
+        for _ in range(3):
+            assert request(f"{service.url}/jobs?wait=1", INSTRUCTIONS)[1]["status"] == "finished"
+
+        assert service.agent.controller.summariser.Summarise_abstracts.call_count == 3
+        assert service.agent.controller.state == {}
+        # The same instructions are parsed once
+        assert service.agent.parser.cache_misses == 1
+        assert service.agent.parser.cache_hits == 2
+
+    def test_bad_requests(self, service):
+        """Test empty submissions, unknown jobs and failing jobs are reported"""
+        assert request(f"{service.url}/jobs", "  ")[0] == 400
+        assert request(f"{service.url}/jobs/unknown")[0] == 404
+        assert request(f"{service.url}/other")[0] == 404
+
+        status, body = request(f"{service.url}/jobs?wait=1", "- nothing to do here\n")
+        assert status == 200
+        assert body["status"] == "failed"
+        assert "No actions" in body["error"]
+
+    def test_health(self, service):
+        """Test the health endpoint reports the workers and job counts"""
+        request(f"{service.url}/jobs?wait=1", INSTRUCTIONS)
+
+        status, body = request(f"{service.url}/health")
+        assert status == 200
+        assert body["status"] == "ok"
+        assert body["workers"] == 2
+        assert body["finished"] == 1
+
+    def test_worker_concurrency_and_graceful_shutdown(self, service):
+        """Test jobs run up to the worker count at once and queued jobs finish before shutdown"""
+        release = threading.Event()
+        running = []
+        lock = threading.Lock()
+
+        def summarise(abstracts):
+            with lock:
+                running.append(threading.current_thread().name)
+            release.wait(5)
+            return ["Summary"] * len(abstracts)
+
+        service.agent.controller.summariser.Summarise_abstracts.side_effect = summarise
+        jobs = [service.submit(INSTRUCTIONS) for _ in range(4)]
+
+        # Two workers: two jobs running and two waiting
+        for _ in range(50):
+            if len(running) == 2:
+                break
+            threading.Event().wait(0.02)
+        assert len(running) == 2
+        assert [job["status"] for job in jobs].count("queued") == 2
+
+        shutdown = threading.Thread(target=service.shutdown)
+        shutdown.start()
+        threading.Event().wait(0.1)
+
+        # New jobs are refused while the queued ones are finishing
+        assert service.submit(INSTRUCTIONS) is None
+        release.set()
+        shutdown.join(5)
+
+        assert not shutdown.is_alive()
+        assert [job["status"] for job in jobs] == ["finished"] * 4
+
+    def test_queue_full(self):
+        """Test submissions are refused once the queue is full"""
+        mock_controller = Mock()
+        server = AgentServer(Agent(controller=mock_controller), port=0, workers=1, max_queue=1)
+
+        # Not started: nothing is accepted
+        assert server.submit(INSTRUCTIONS) is None
+
+        server.accepting = True
+        assert server.submit(INSTRUCTIONS) is not None
+        assert server.submit(INSTRUCTIONS) is None
@@ -0,0 +1,96 @@
+import pytest
+from arrow_sink import ArrowSink
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset
+import pyarrow.ipc
+import pyarrow.parquet
+
+class TestArrowSink:
+
+    def test_parquet_row_groups(self, tmp_path, papers):
+        """Test papers are written in row groups with authors as a list column and the fetch metadata"""
+        path = str(tmp_path / "papers.parquet")
+        with ArrowSink(path, row_group_size=4, source="search.txt", metadata={"query": "grpo"}) as sink:
+            assert sink.write_papers(papers(10)) == 10
+
+        parquet_file = pa.parquet.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.schema_arrow.field("authors").type == pa.list_(pa.string())
+        assert parquet_file.schema_arrow.metadata[b"query"] == b"grpo"
+
+        table = parquet_file.read()
+        assert table.num_rows == 10
+        assert table.column("arxiv_id").to_pylist()[0] == "2501.00000"
+        assert table.column("authors").to_pylist()[3] == ["Author 3", "Shared Author"]
+        assert table.column("summary").to_pylist()[9] == "Summary 9"
+        assert set(table.column("source").to_pylist()) == {"search.txt"}
+        assert table.column("fetched_at").null_count == 0
+
+    def test_missing_fields(self, tmp_path):
+        """Test fields that were not extracted are stored as nulls"""
+        path = str(tmp_path / "papers.parquet")
+        with ArrowSink(path) as sink:
+            sink.write({"title": "Paper 1"})
+
+        row = pa.parquet.read_table(path).to_pylist()[0]
+        assert row["title"] == "Paper 1"
+        assert row["authors"] is None
+        assert row["arxiv_id"] is None
+
+    def test_arrow_format(self, tmp_path, papers):
+        """Test the Arrow IPC file format"""
+        path = str(tmp_path / "papers.arrow")
+        with ArrowSink(path, output_format="arrow", row_group_size=3) as sink:
+            sink.write_papers(papers(7))
+
+        reader = pa.ipc.open_file(path)
+        assert reader.num_record_batches == 3
+        assert reader.read_all().num_rows == 7
+
+    def test_append(self, tmp_path, papers):
+        """Test every appending run adds a part file to the dataset directory"""
+        directory = str(tmp_path / "dataset")
+        for start in (0, 5):
+            with ArrowSink(directory, append=True) as sink:
+                sink.write_papers(papers(5, start))
+
+        table = pa.dataset.dataset(directory, format="parquet").to_table()
+        assert table.num_rows == 10
+        assert sorted(table.column("arxiv_id").to_pylist())[-1] == "2501.00009"
+
+    def test_unknown_format(self, tmp_path):
+        """Test unknown export formats are rejected"""
+        with pytest.raises(ValueError):
+            ArrowSink(str(tmp_path / "papers.csv"), output_format="csv")
+
+    def test_agent_export(self, tmp_path, sample_instructions_file, arxiv_page):
+        """Test an export of the real pipeline keeps the abstracts and stamps the papers when their page was fetched"""
+        import time
+        from datetime import datetime, timedelta, timezone
+        from unittest.mock import Mock
+        from bs4 import BeautifulSoup
+        from agent import Agent
+        from Controller import Controller
+        from items_extractor import ItemsExtractor
+        from Output_Structurer import OutputStructurer
+
+        page = arxiv_page(start=0, count=3, total=3)
+        scraper = Mock(spec=["fetch_n_parse"])
+        scraper.fetch_n_parse.return_value = page, BeautifulSoup(page, "html.parser")
+        # The summaries take a while, so the papers are written well after the page was fetched
+        summariser = Mock()
+        summariser.Summarise_abstracts.side_effect = lambda abstracts: time.sleep(0.3) or ["Summary"] * len(abstracts)
+
+        controller = Controller(scraper=scraper, extractor=ItemsExtractor(), summariser=summariser, structurer=OutputStructurer())
+        path = str(tmp_path / "papers.parquet")
+
+        started = datetime.now(timezone.utc)
+        assert Agent(controller=controller).export(sample_instructions_file, ArrowSink(path, source="search.txt")) == 3
+
+        rows = pa.parquet.read_table(path).to_pylist()
+        assert [row["arxiv_id"] for row in rows] == ["2501.00000", "2501.00001", "2501.00002"]
+        assert rows[1]["abstract"].startswith("Abstract of paper 1.")
+        assert rows[1]["authors"] == ["Author 1", "Shared Author"]
+        assert rows[1]["summary"] == "Summary"
+        assert all(row["fetched_at"] - started < timedelta(seconds=0.25) for row in rows)
@@ -64,9 +64,10 @@ class TestController:
         
         # Verify results
         mock_extract.assert_called_once_with(sample_soup, ["title", "authors", "links"])
-        assert "title" in controller.state
-        assert "authors" in controller.state
-        assert "link" in controller.state
+        assert "title" in controller.papers
+        assert "authors" in controller.papers
+        assert "link" in controller.papers
+        assert controller.papers["authors"] == sample_extracted_data["authors"]
     
     def test_execute_extract_action_no_soup(self):
         """Test extract action without prior goto action"""
@@ -104,7 +105,7 @@ class TestController:
         
         # Create controller and set initial state
         controller = Controller()
-        controller.state["abstract"] = sample_extracted_data["abstract"]
+        controller.papers.set_column("abstract", sample_extracted_data["abstract"])
         
         # Execute action
         action = {"type": "summarise"}
@@ -112,7 +113,7 @@ class TestController:
         
         # Verify results
         mock_summarise_abstracts.assert_called_once_with(sample_extracted_data["abstract"])
-        assert controller.state["summary"] == sample_summarised_abstracts
+        assert controller.papers["summary"] == sample_summarised_abstracts
     
     def test_execute_summarise_action_no_abstracts(self):
         """Test summarise action without abstracts in state"""
@@ -121,7 +122,7 @@ class TestController:
         
         # Should not raise an exception, just log an error
         controller._execute_one_action(action, [])
-        assert "summary" not in controller.state
+        assert "summary" not in controller.papers
     
     @patch('Controller.Controller._execute_one_action')
     @patch('Output_Structurer.OutputStructurer.structure_output')
@@ -131,8 +132,10 @@ class TestController:
         mock_structure_output.return_value = sample_structured_output
         
         # Create controller 
+        from paper_batch import PaperBatch
+
         controller = Controller()
-        controller.state = sample_state_data
+        controller.papers = PaperBatch.from_columns(sample_state_data)
         
         # Create actions
         actions = [
@@ -146,5 +149,388 @@ class TestController:
         
         # Verify results
         assert mock_execute_one_action.call_count == 3
-        mock_structure_output.assert_called_once_with(sample_state_data)
-        assert result == sample_structured_output
\ No newline at end of file
+        mock_structure_output.assert_called_once_with(controller.papers)
+        assert result == sample_structured_output
+
+    def test_execute_actions_prefetches_multiple_pages(self, sample_soup):
+        """Test every goto target is fetched concurrently when there are several"""
+        mock_scraper = Mock()
+        mock_scraper.fetch_many.return_value = iter([
+            ("https://example.com/b", "html b", sample_soup),
+            ("https://example.com/a", "html a", sample_soup),
+        ])
+        mock_structurer = Mock()
+
+        controller = Controller(scraper=mock_scraper, extractor=Mock(), summariser=Mock(), structurer=mock_structurer)
+        actions = [
+            {"type": "goto", "url": "https://example.com/a"},
+            {"type": "goto", "url": "https://example.com/b"},
+        ]
+        controller.execute_actions(actions)
+
+        mock_scraper.fetch_many.assert_called_once_with(["https://example.com/a", "https://example.com/b"])
+        mock_scraper.fetch_n_parse.assert_not_called()
+        assert controller.state["current_url"] == "https://example.com/b"
+        assert controller.prefetched == {}
+
+    def test_goto_with_pagination_merges_pages(self, arxiv_page):
+        """Test pages are fetched concurrently and merged without duplicates across pages"""
+        from bs4 import BeautifulSoup
+        from items_extractor import ItemsExtractor
+        from paginator import Paginator
+
+        first_url = "https://arxiv.org/search/?query=grpo&searchtype=all"
+        pages = {
+            0: arxiv_page(start=0, count=50, total=120),
+            # The second page repeats the last paper of the first page (results shifted between requests)
+            50: arxiv_page(start=49, count=50, total=120),
+            100: arxiv_page(start=100, count=20, total=120),
+        }
+
+        def fetch_many(urls):
+            # Complete the pages in reverse order
+            for url in reversed(urls):
+                start = int(url.split("start=")[1].split("&")[0])
+                yield url, pages[start], BeautifulSoup(pages[start], "html.parser")
+
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.return_value = (pages[0], BeautifulSoup(pages[0], "html.parser"))
+        mock_scraper.fetch_many.side_effect = fetch_many
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=Mock(), structurer=Mock(), paginator=Paginator(max_results=500))
+        controller._execute_one_action({"type": "goto", "url": first_url}, [])
+        controller._execute_one_action({"type": "extract", "items": ["title", "links"]}, [])
+
+        assert len(controller.state["current_soups"]) == 3
+        links = controller.papers["link"]
+        assert len(links) == len(set(links)) == 119
+        assert links[0] == "https://arxiv.org/abs/2501.00000"
+        assert links[-1] == "https://arxiv.org/abs/2501.00119"
+        assert links == sorted(links)
+        assert len(controller.papers["title"]) == 119
+
+    def test_goto_with_pagination_result_cap(self, arxiv_page):
+        """Test merged results stop at the result cap"""
+        from bs4 import BeautifulSoup
+        from items_extractor import ItemsExtractor
+        from paginator import Paginator
+
+        page = arxiv_page(start=0, count=50, total=50)
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.return_value = (page, BeautifulSoup(page, "html.parser"))
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=Mock(), structurer=Mock(), paginator=Paginator(max_results=10))
+        controller._execute_one_action({"type": "goto", "url": "https://arxiv.org/search/?query=grpo"}, [])
+        controller._execute_one_action({"type": "extract", "items": ["title", "links"]}, [])
+
+        mock_scraper.fetch_many.assert_not_called()
+        assert len(controller.papers["link"]) == 10
+        assert len(controller.papers["title"]) == 10
+
+    def test_goto_with_pagination_follows_next_links(self, sample_html):
+        """Test next links are followed when the total number of results is unknown"""
+        from bs4 import BeautifulSoup
+        from paginator import Paginator
+
+        first = sample_html.replace('<div class="results">', '<a class="pagination-next" href="/search/?start=2">Next</a><div class="results">')
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.side_effect = [
+            (first, BeautifulSoup(first, "html.parser")),
+            (sample_html, BeautifulSoup(sample_html, "html.parser")),
+        ]
+
+        controller = Controller(scraper=mock_scraper, extractor=Mock(), summariser=Mock(), structurer=Mock(), paginator=Paginator(max_results=100))
+        controller._execute_one_action({"type": "goto", "url": "https://arxiv.org/search/?query=grpo"}, [])
+
+        assert len(controller.state["current_soups"]) == 2
+        mock_scraper.fetch_n_parse.assert_called_with("https://arxiv.org/search/?start=2")
+
+
+class TestControllerPipeline:
+
+    ACTIONS = [
+        {"type": "goto", "url": "https://arxiv.org/search/?query=grpo"},
+        {"type": "extract", "items": ["title", "links"]},
+        {"type": "summarise", "target": "abstracts"},
+    ]
+
+    def _scraper(self, records):
+        """Mock scraper streaming the given records"""
+        mock_scraper = Mock()
+        mock_scraper.stream_records.side_effect = lambda url, extractor: iter(records)
+        return mock_scraper
+
+    def _records(self, count):
+        return [
+            {"title": f"Paper {n}", "authors": [f"Author {n}"], "link": f"https://arxiv.org/abs/2501.{n:05d}", "abstract": f"Abstract {n}"}
+            for n in range(count)
+        ]
+
+    def test_pipeline_execute_actions(self):
+        """Test the pipeline fills the state in page order with the requested fields and summaries"""
+        import time
+
+        mock_summariser = Mock()
+
+        def summarise(abstracts):
+            # Later papers finish first
+            time.sleep(0.02 if abstracts[0].endswith("0") else 0)
+            return [f"Summary of {abstract}" for abstract in abstracts]
+
+        mock_summariser.Summarise_abstracts.side_effect = summarise
+        mock_structurer = Mock()
+        mock_structurer.structure_output.side_effect = lambda state: state
+
+        controller = Controller(scraper=self._scraper(self._records(6)), extractor=Mock(), summariser=mock_summariser,
+                                structurer=mock_structurer, pipeline=True, summary_batch_size=1)
+        state = controller.execute_actions(self.ACTIONS)
+
+        assert state["title"] == [f"Paper {n}" for n in range(6)]
+        assert state["link"][0] == "https://arxiv.org/abs/2501.00000"
+        assert state["summary"] == [f"Summary of Abstract {n}" for n in range(6)]
+        assert "authors" not in state
+
+    def test_pipeline_first_result_before_summarising_finishes(self):
+        """Test the first paper comes out while the rest are still being summarised"""
+        import threading
+
+        release = threading.Event()
+        mock_summariser = Mock()
+
+        def summarise(abstracts):
+            if abstracts != ["Abstract 0"]:
+                release.wait(5)
+            return ["Summary"] * len(abstracts)
+
+        mock_summariser.Summarise_abstracts.side_effect = summarise
+        controller = Controller(scraper=self._scraper(self._records(4)), extractor=Mock(), summariser=mock_summariser,
+                                structurer=Mock(), summary_workers=1, summary_batch_size=1)
+
+        papers = controller.stream_actions(self.ACTIONS)
+        assert next(papers)["title"] == "Paper 0"
+        release.set()
+        assert [paper["title"] for paper in papers] == ["Paper 1", "Paper 2", "Paper 3"]
+
+    def test_pipeline_backpressure(self):
+        """Test a slow summariser stops the producer once the queues are full"""
+        import threading
+
+        produced = []
+        release = threading.Event()
+
+        def stream_records(url, extractor):
+            for record in self._records(50):
+                produced.append(record)
+                yield record
+
+        mock_scraper = Mock()
+        mock_scraper.stream_records.side_effect = stream_records
+        mock_summariser = Mock()
+        mock_summariser.Summarise_abstracts.side_effect = lambda abstracts: release.wait(5) and ["Summary"] * len(abstracts)
+
+        controller = Controller(scraper=mock_scraper, extractor=Mock(), summariser=mock_summariser, structurer=Mock(),
+                                queue_size=2, summary_workers=1, summary_batch_size=1)
+        papers = controller.stream_actions(self.ACTIONS)
+
+        threading.Timer(0.3, release.set).start()
+        first = next(papers)
+
+        # One record being summarised, the queue and the producer waiting on a full queue
+        assert first["summary"] == "Summary"
+        assert len(produced) < 10
+        assert len(list(papers)) == 49
+
+    def test_pipeline_error_propagates(self):
+        """Test errors raised in a stage reach the consumer"""
+        import requests
+
+        def stream_records(url, extractor):
+            yield self._records(1)[0]
+            raise requests.exceptions.ConnectionError("Connection refused")
+
+        mock_scraper = Mock()
+        mock_scraper.stream_records.side_effect = stream_records
+
+        controller = Controller(scraper=mock_scraper, extractor=Mock(), summariser=Mock(), structurer=Mock(), pipeline=True)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            controller.execute_actions(self.ACTIONS[:2])
+
+    def test_pipeline_error_stops_every_thread(self):
+        """Test the stage threads all exit after a summariser error instead of waiting for records forever"""
+        import threading
+        import time
+
+        def stream_records(url, extractor):
+            # The other workers are left waiting for the next record when the first one fails
+            for record in self._records(2):
+                yield record
+                time.sleep(0.2)
+
+        mock_scraper = Mock()
+        mock_scraper.stream_records.side_effect = stream_records
+        mock_summariser = Mock()
+        mock_summariser.Summarise_abstracts.side_effect = RuntimeError("Summariser crashed")
+        running = threading.active_count()
+
+        for _ in range(5):
+            controller = Controller(scraper=mock_scraper, extractor=Mock(), summariser=mock_summariser,
+                                    structurer=Mock(), summary_workers=4, summary_batch_size=1)
+            with pytest.raises(RuntimeError):
+                list(controller.stream_actions(self.ACTIONS))
+
+        assert threading.active_count() == running
+
+    def test_pipeline_with_pagination(self, arxiv_page):
+        """Test paginated pages are extracted into records, deduplicated and capped"""
+        from bs4 import BeautifulSoup
+        from items_extractor import ItemsExtractor
+        from paginator import Paginator
+
+        page = arxiv_page(start=0, count=50, total=50)
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.return_value = (page, BeautifulSoup(page, "html.parser"))
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=Mock(), structurer=Mock(),
+                                paginator=Paginator(max_results=10))
+        papers = list(controller.stream_actions(self.ACTIONS[:2]))
+
+        mock_scraper.stream_records.assert_not_called()
+        assert len(papers) == 10
+        assert papers[0] == {"title": "Paper 0: Group Relative Policy Optimisation", "link": "https://arxiv.org/abs/2501.00000"}
+
+    @pytest.mark.parametrize("order, pages, links", [
+        ("&order=-announced_date_first", 2, ["00000", "00001", "00003"]),
+        ("", 4, ["00000", "00001", "00003", "00004", "00005", "00007"]),
+    ])
+    def test_pipeline_watermark_pagination(self, arxiv_page, caplog, order, pages, links):
+        """Test incremental pagination stops at a paper of the last run only when the results are sorted newest first"""
+        from urllib.parse import urlparse, parse_qs
+        from bs4 import BeautifulSoup
+        from items_extractor import ItemsExtractor
+        from paginator import Paginator
+
+        fetched = []
+
+        def fetch_n_parse(url):
+            fetched.append(url)
+            offset = int(parse_qs(urlparse(url).query).get("start", ["0"])[0])
+            page = arxiv_page(start=offset, count=2, total=8)
+            return page, BeautifulSoup(page, "html.parser")
+
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.side_effect = fetch_n_parse
+        mock_scraper.fetch_many.side_effect = lambda urls: ((url, *fetch_n_parse(url)) for url in urls)
+
+        controller = Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=Mock(), structurer=Mock(),
+                                paginator=Paginator(max_results=100))
+        controller.watermark = {"2501.00002", "2501.00006"}
+        actions = [{"type": "goto", "url": f"https://arxiv.org/search/?query=grpo{order}"}, self.ACTIONS[1]]
+
+        assert [paper["link"][-5:] for paper in controller.stream_actions(actions)] == links
+        assert len(fetched) == pages
+        assert ("not sorted newest first" in caplog.text) == (not order)
+
+
+class TestControllerIndex:
+
+    ACTIONS = [
+        {"type": "goto", "url": "https://arxiv.org/search/?query=grpo"},
+        {"type": "extract", "items": ["title"]},
+        {"type": "summarise", "target": "abstracts"},
+    ]
+
+    def _controller(self, page, index, **options):
+        from bs4 import BeautifulSoup
+        from items_extractor import ItemsExtractor
+
+        mock_scraper = Mock()
+        mock_scraper.fetch_n_parse.return_value = (page, BeautifulSoup(page, "html.parser"))
+        mock_scraper.stream_records.side_effect = lambda url, extractor: iter(extractor.extract_records(BeautifulSoup(page, "html.parser")))
+
+        mock_summariser = Mock()
+        mock_summariser.Summarise_abstracts.side_effect = lambda abstracts: [f"Summary of {abstract}" for abstract in abstracts]
+        mock_structurer = Mock()
+        mock_structurer.structure_output.side_effect = lambda state: state
+
+        return Controller(scraper=mock_scraper, extractor=ItemsExtractor(), summariser=mock_summariser,
+                          structurer=mock_structurer, index=index, **options)
+
+    def _actions(self):
+        import copy
+        return copy.deepcopy(self.ACTIONS)
+
+    def test_skip_reuses_summaries(self, arxiv_page):
+        """Test known papers keep their stored summary and only new papers are summarised"""
+        from paper_index import PaperIndex
+
+        index = PaperIndex(":memory:")
+        index.record([{"link": "https://arxiv.org/abs/2501.00001v1", "summary": "Stored summary"}])
+
+        controller = self._controller(arxiv_page(count=3, total=3), index)
+        state = controller.execute_actions(self._actions())
+
+        assert len(state["title"]) == 3
+        assert state["link"][1] == "https://arxiv.org/abs/2501.00001"
+        assert state["summary"][1] == "Stored summary"
+        assert state["summary"][0].startswith("Summary of Abstract of paper 0")
+
+        summarised = controller.summariser.Summarise_abstracts.call_args[0][0]
+        assert len(summarised) == 2
+
+        # Every paper of the run is in the index afterwards, with its summary
+        assert len(index) == 3
+        assert index.lookup(["2501.00002"])["2501.00002"]["summary"].startswith("Summary of Abstract of paper 2")
+
+    def test_failed_summaries_not_stored(self, arxiv_page):
+        """Test placeholders of failed summaries are not reused by later runs"""
+        from abstract_summariser import SUMMARY_UNAVAILABLE
+        from paper_index import PaperIndex
+
+        index = PaperIndex(":memory:")
+        controller = self._controller(arxiv_page(count=1, total=1), index)
+        controller.summariser.Summarise_abstracts.side_effect = lambda abstracts: [SUMMARY_UNAVAILABLE] * len(abstracts)
+        controller.execute_actions(self._actions())
+
+        assert index.lookup(["2501.00000"])["2501.00000"]["summary"] is None
+
+    def test_new_only_outputs_new_papers(self, arxiv_page):
+        """Test papers seen by an earlier run are dropped before summarising"""
+        from paper_index import PaperIndex
+
+        index = PaperIndex(":memory:")
+        self._controller(arxiv_page(count=2, total=2), index).execute_actions(self._actions())
+
+        controller = self._controller(arxiv_page(count=4, total=4), index, index_mode="new")
+        state = controller.execute_actions(self._actions())
+
+        assert state["link"] == ["https://arxiv.org/abs/2501.00002", "https://arxiv.org/abs/2501.00003"]
+        assert state["title"] == ["Paper 2: Group Relative Policy Optimisation", "Paper 3: Group Relative Policy Optimisation"]
+        assert len(state["summary"]) == 2
+        assert len(index) == 4
+
+    @pytest.mark.parametrize("index_mode", ["skip", "new"])
+    def test_pipeline(self, arxiv_page, index_mode):
+        """Test the pipeline reuses stored summaries or drops known papers, and records the run"""
+        from paper_index import PaperIndex
+
+        index = PaperIndex(":memory:")
+        index.record([{"link": "https://arxiv.org/abs/2501.00000", "summary": "Stored summary"}])
+
+        controller = self._controller(arxiv_page(count=3, total=3), index, pipeline=True, index_mode=index_mode)
+        state = controller.execute_actions(self._actions())
+
+        if index_mode == "skip":
+            assert state["summary"][0] == "Stored summary"
+            assert len(state["summary"]) == 3
+        else:
+            assert state["link"] == ["https://arxiv.org/abs/2501.00001", "https://arxiv.org/abs/2501.00002"]
+        assert len(index) == 3
+
+    def test_pipeline_watermark(self, arxiv_page):
+        """Test the pipeline drops the papers output by the last incremental run"""
+        controller = self._controller(arxiv_page(count=3, total=3), None, pipeline=True)
+        controller.watermark = {"2501.00000", "2501.00002"}
+        state = controller.execute_actions(self._actions())
+
+        assert state["link"] == ["https://arxiv.org/abs/2501.00001"]
+        assert controller.summariser.Summarise_abstracts.call_count == 1
@@ -0,0 +1,88 @@
+from extractive_summariser import ExtractiveSummariser, split_sentences, tokenise
+
+ABSTRACT = (
+    "Large language models are increasingly trained with reinforcement learning. "
+    "We propose Group Relative Policy Optimisation (GRPO), a variant of PPO for language models. "
+    "GRPO removes the value model and estimates the baseline from the scores of a group of sampled outputs. "
+    "The weather during the experiments was pleasant. "
+    "Experiments on mathematical reasoning benchmarks show that GRPO improves reinforcement learning of language models. "
+    "Code is available online."
+)
+
+
+class TestSplitSentences:
+
+    def test_split_sentences(self):
+        """Test sentences split on terminal punctuation followed by a new sentence"""
+        assert split_sentences("First one. Second one! Third one? Fourth") == ["First one.", "Second one!", "Third one?", "Fourth"]
+        assert split_sentences("  ") == []
+
+    def test_split_sentences_keeps_abbreviations(self):
+        """Test abbreviations, initials and decimals do not end a sentence"""
+        text = "We study GRPO, e.g. in RL. Smith et al. report a 3.5 point gain. J. Doe agrees. Results (Fig. 2) are strong."
+        assert split_sentences(text) == [
+            "We study GRPO, e.g. in RL.",
+            "Smith et al. report a 3.5 point gain.",
+            "J. Doe agrees.",
+            "Results (Fig. 2) are strong.",
+        ]
+
+    def test_tokenise(self):
+        """Test stopwords and punctuation are dropped"""
+        assert tokenise("The GRPO method, a variant of PPO.") == ["grpo", "method", "variant", "ppo"]
+
+
+class TestExtractiveSummariser:
+
+    def test_summarise_keeps_central_sentences_in_order(self):
+        """Test the off-topic sentences are dropped and the rest keep their order"""
+        summary = ExtractiveSummariser(max_sentences=3).summarise(ABSTRACT)
+        sentences = split_sentences(summary)
+
+        assert len(sentences) == 3
+        assert "weather" not in summary
+        assert "Code is available" not in summary
+        assert sentences == sorted(sentences, key=ABSTRACT.index)
+
+    def test_short_abstracts_unchanged(self):
+        """Test abstracts no longer than the summary are returned as they are"""
+        summariser = ExtractiveSummariser(max_sentences=4)
+        assert summariser.summarise("First sentence. Second sentence.") == "First sentence. Second sentence."
+        assert summariser.summarise("") == ""
+
+    def test_lead_breaks_ties(self):
+        """Test equally central sentences are kept from the start of the abstract"""
+        abstract = "First sentence. Second sentence. Third sentence. Fourth sentence. Fifth sentence."
+        assert ExtractiveSummariser(max_sentences=4).summarise(abstract) == "First sentence. Second sentence. Third sentence. Fourth sentence."
+
+    def test_summarise_batch_matches_single(self):
+        """Test scoring a batch at once gives the same summaries as one abstract at a time"""
+        summariser = ExtractiveSummariser(max_sentences=2)
+        abstracts = [
+            ABSTRACT,
+            "Short abstract.",
+            "Transformers dominate vision. We study vision transformers at scale. Scaling improves vision accuracy. Lunch was served.",
+            None,
+        ]
+
+        batch = summariser.summarise_batch(abstracts)
+        assert len(batch) == 4
+        assert batch[1] == "Short abstract."
+        assert batch[3] == ""
+        assert "Lunch" not in batch[2]
+
+        # Term weights are shared by the batch, so only the sentence choice is compared
+        for text, summary in zip(abstracts[:3], batch[:3]):
+            assert len(split_sentences(summary)) == min(2, len(split_sentences(text)))
+            assert all(sentence in text for sentence in split_sentences(summary))
+
+    def test_summarise_batch_is_fast(self):
+        """Test a large batch is summarised in milliseconds per abstract"""
+        import time
+
+        abstracts = [ABSTRACT.replace("GRPO", f"Method{i}") for i in range(500)]
+        started = time.perf_counter()
+        summaries = ExtractiveSummariser().summarise_batch(abstracts)
+
+        assert len(summaries) == 500
+        assert (time.perf_counter() - started) / 500 < 0.005
@@ -0,0 +1,73 @@
+import pytest
+from bs4 import BeautifulSoup
+from html_backends import available_backends, resolve_backend, parse_html
+from items_extractor import ItemsExtractor
+from paginator import Paginator
+
+ITEMS = ["title", "authors", "links", "abstracts"]
+
+class TestHtmlBackends:
+
+    def test_available_backends(self):
+        """Test the standard library parser is always available"""
+        assert "html.parser" in available_backends()
+
+    def test_resolve_backend(self):
+        """Test resolving explicit and automatic backend choices"""
+        assert resolve_backend("html.parser") == "html.parser"
+        assert resolve_backend("auto") in ("lxml", "html.parser")
+
+        with pytest.raises(ValueError):
+            resolve_backend("not-a-parser")
+
+    def test_resolve_missing_backend_falls_back(self):
+        """Test a backend that is not installed falls back to html.parser"""
+        from unittest.mock import patch
+        with patch('html_backends.available_backends', return_value=["html.parser"]):
+            assert resolve_backend("selectolax") == "html.parser"
+            assert resolve_backend("auto") == "html.parser"
+
+    @pytest.mark.parametrize("backend", ["html.parser", "lxml", "selectolax"])
+    def test_backends_extract_the_same_records(self, backend, arxiv_page):
+        """Test every backend gives the extractor the same results"""
+        if backend not in available_backends():
+            pytest.skip(f"{backend} is not installed")
+
+        html = arxiv_page(count=5, total=120)
+        extractor = ItemsExtractor()
+        expected = extractor.extract(BeautifulSoup(html, "html.parser"), ITEMS)
+
+        document = parse_html(html, backend)
+
+        assert extractor.extract(document, ITEMS) == expected
+        assert Paginator().total_results(document) == 120
+        assert Paginator().next_url("https://arxiv.org/search/?query=grpo", document) is not None
+
+    @pytest.mark.parametrize("backend", ["html.parser", "lxml", "selectolax"])
+    def test_backends_without_result_containers(self, backend, sample_html):
+        """Test the per-field selects work on every backend"""
+        if backend not in available_backends():
+            pytest.skip(f"{backend} is not installed")
+
+        extracted = ItemsExtractor().extract(parse_html(sample_html, backend), ITEMS)
+
+        assert extracted["title"] == ["GRPO: A New Approach to Reinforcement Learning", "Multi-Agent GRPO for Collaborative Environments"]
+        assert extracted["link"] == ["https://arxiv.org/abs/2401.12345", "https://arxiv.org/abs/2402.54321"]
+        assert extracted["authors"][1] == ["Jane Doe", "Robert Johnson"]
+
+    def test_selectolax_node_interface(self):
+        """Test the selectolax adapter mimics the BeautifulSoup tag interface"""
+        if "selectolax" not in available_backends():
+            pytest.skip("selectolax is not installed")
+
+        document = parse_html('<div><p class="list-title is-5"><a href="/abs/1">link</a></p></div>', "selectolax")
+        link = document.select_one("p.list-title a")
+
+        assert link.name == "a"
+        assert link.text == "link"
+        assert link.get("href") == "/abs/1"
+        assert link.get("missing", "default") == "default"
+        assert link.parent.get("class") == ["list-title", "is-5"]
+        assert document.select_one("span") is None
+        assert [node.name for node in document.find_all(True)][-3:] == ["div", "p", "a"]
+        assert document.select_one("a") == link
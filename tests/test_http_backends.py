@@ -0,0 +1,72 @@
+import gzip
+import pytest
+import requests
+from unittest.mock import patch
+from http_backends import accepted_encodings, build_session, http2_available
+from web_scraper import WebScraper
+
+class TestHttpBackends:
+
+    def test_accepted_encodings(self):
+        """Test gzip is always negotiated and brotli only with a decoder installed"""
+        encodings = accepted_encodings().split(", ")
+        assert "gzip" in encodings
+        assert "deflate" in encodings
+
+        try:
+            import brotli  # noqa: F401
+            assert "br" in encodings
+        except ImportError:
+            pass
+
+    def test_build_session_pool_sizes(self):
+        """Test the connection pools are sized as configured"""
+        session = build_session(pool_connections=4, pool_maxsize=32)
+        adapter = session.get_adapter("https://arxiv.org/")
+
+        assert isinstance(session, requests.Session)
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 32
+        assert session.headers["Accept-Encoding"] == accepted_encodings()
+
+    def test_scraper_pool_follows_concurrency(self):
+        """Test the default pool keeps a connection per concurrent fetch"""
+        assert WebScraper(max_concurrency=32).session.get_adapter("https://arxiv.org/")._pool_maxsize == 32
+        assert WebScraper(max_concurrency=4).session.get_adapter("https://arxiv.org/")._pool_maxsize == 10
+        assert WebScraper(pool_maxsize=16).session.get_adapter("https://arxiv.org/")._pool_maxsize == 16
+
+    def test_http2_missing_falls_back(self):
+        """Test HTTP/2 falls back to requests when httpx is not installed"""
+        with patch('http_backends.http2_available', return_value=False):
+            assert isinstance(build_session(http2=True), requests.Session)
+
+    def test_gzip_response(self, local_server):
+        """Test compressed pages are negotiated and decoded"""
+        page = "<html><body><p class='title is-5'>Compressed</p></body></html>"
+
+        def route(handler):
+            if "gzip" in handler.headers.get("Accept-Encoding", ""):
+                return 200, {"Content-Type": "text/html", "Content-Encoding": "gzip"}, gzip.compress(page.encode("utf-8"))
+            return 200, {"Content-Type": "text/html"}, page
+
+        local_server.routes["/gzip"] = route
+        text, _ = WebScraper().fetch_n_parse(f"{local_server.url}/gzip")
+        assert text == page
+
+    @pytest.mark.skipif(not http2_available(), reason="httpx[http2] is not installed")
+    def test_http2_session(self, local_server):
+        """Test the httpx backend fetches pages and raises the requests exceptions"""
+        from http_backends import HttpxSession
+
+        local_server.routes["/missing"] = lambda handler: (404, {}, "Not Found")
+        scraper = WebScraper(http2=True)
+        assert isinstance(scraper.session, HttpxSession)
+
+        text, soup = scraper.fetch_n_parse(f"{local_server.url}/search")
+        assert soup.select_one("p.title").text == "Page /search"
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            scraper.fetch_n_parse(f"{local_server.url}/missing")
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            WebScraper(http2=True, max_retries=0).fetch_n_parse("http://127.0.0.1:1/")
@@ -0,0 +1,100 @@
+import time
+from unittest.mock import Mock
+from http_cache import HttpCache
+
+def make_response(status=200, headers=None, text="<html></html>"):
+    """Minimal stand-in for a requests.Response"""
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.text = text
+    return response
+
+class TestHttpCache:
+
+    def test_store_and_get(self):
+        """Test a stored response is returned with its headers and body"""
+        cache = HttpCache(":memory:")
+        cache.store("https://example.com", make_response(headers={"ETag": '"v1"'}, text="body"))
+
+        entry = cache.get("https://example.com")
+        assert entry["status"] == 200
+        assert entry["headers"] == {"ETag": '"v1"'}
+        assert entry["body"] == "body"
+        assert cache.get("https://example.com/other") is None
+
+    def test_no_store_is_not_cached(self):
+        """Test responses with Cache-Control: no-store are never stored"""
+        cache = HttpCache(":memory:")
+        stored = cache.store("https://example.com", make_response(headers={"Cache-Control": "no-store"}))
+
+        assert stored is False
+        assert cache.get("https://example.com") is None
+
+    def test_persists_between_instances(self, tmp_path):
+        """Test responses survive reopening the cache"""
+        path = str(tmp_path / "http.sqlite")
+        cache = HttpCache(path)
+        cache.store("https://example.com", make_response(text="body"))
+        cache.close()
+
+        assert HttpCache(path).get("https://example.com")["body"] == "body"
+
+    def test_is_fresh_max_age(self):
+        """Test max-age controls freshness"""
+        cache = HttpCache(":memory:")
+        entry = {"headers": {"Cache-Control": "public, max-age=60"}, "stored": 1000.0}
+
+        assert cache.is_fresh(entry, now=1030.0)
+        assert not cache.is_fresh(entry, now=1061.0)
+
+        # The Age header counts against max-age
+        entry["headers"]["Age"] = "50"
+        assert not cache.is_fresh(entry, now=1030.0)
+
+    def test_is_fresh_no_cache(self):
+        """Test no-cache always requires revalidation"""
+        cache = HttpCache(":memory:")
+        entry = {"headers": {"Cache-Control": "no-cache, max-age=60"}, "stored": time.time()}
+        assert not cache.is_fresh(entry)
+
+    def test_is_fresh_expires(self):
+        """Test the Expires header is used when there is no max-age"""
+        cache = HttpCache(":memory:")
+        entry = {"headers": {"Expires": "Thu, 01 Jan 2037 00:00:00 GMT"}, "stored": time.time()}
+        assert cache.is_fresh(entry)
+
+        entry["headers"]["Expires"] = "Thu, 01 Jan 2015 00:00:00 GMT"
+        assert not cache.is_fresh(entry)
+
+        entry["headers"]["Expires"] = "0"
+        assert not cache.is_fresh(entry)
+
+    def test_is_fresh_default_ttl(self):
+        """Test responses without freshness headers use the default ttl"""
+        entry = {"headers": {}, "stored": 1000.0}
+        assert not HttpCache(":memory:").is_fresh(entry, now=1001.0)
+        assert HttpCache(":memory:", default_ttl=10).is_fresh(entry, now=1001.0)
+
+    def test_conditional_headers(self):
+        """Test validators are turned into conditional request headers"""
+        cache = HttpCache(":memory:")
+        entry = {"headers": {"etag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}}
+
+        assert cache.conditional_headers(entry) == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        }
+        assert cache.conditional_headers({"headers": {}}) == {}
+
+    def test_refresh(self):
+        """Test a 304 revalidation merges the headers and resets the stored time"""
+        cache = HttpCache(":memory:")
+        cache.store("https://example.com", make_response(headers={"ETag": '"v1"'}, text="body"))
+        entry = cache.get("https://example.com")
+
+        refreshed = cache.refresh("https://example.com", entry, make_response(304, headers={"Cache-Control": "max-age=60"}))
+
+        assert refreshed["body"] == "body"
+        assert refreshed["stored"] >= entry["stored"]
+        assert cache.get("https://example.com")["headers"] == {"ETag": '"v1"', "Cache-Control": "max-age=60"}
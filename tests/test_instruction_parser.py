@@ -89,4 +89,84 @@ class TestInstructionParser:
         """
         
         actions = parser.parse_text(text)
-        assert len(actions) == 2
\ No newline at end of file
+        assert len(actions) == 2
+
+    def test_parse_text_action_priority(self):
+        """Test a line matching several action patterns keeps the later action type"""
+        parser = InstructionParser()
+        text = """
+        - summarise abstracts and extract nothing
+        - Return the data in a structured format: ```{"papers": []}``` then extract title
+        """
+
+        actions = parser.parse_text(text)
+        assert actions[0]["type"] == "summarise"
+        assert actions[-1] == {"type": "Return", "structured_output": '{"papers": []}'}
+
+    def test_parse_text_unmatched_line(self):
+        """Test lines matching no action are skipped instead of repeating the previous action"""
+        parser = InstructionParser()
+        text = """
+        - this line is not an action
+        - goto: https://example.com
+        - wait for the page to load
+        - extract title
+        """
+
+        actions = parser.parse_text(text)
+        assert [action["type"] for action in actions] == ["goto", "extract"]
+
+    def test_parse_file_plan_cache(self, sample_instructions_file, tmp_path):
+        """Test unchanged instruction files skip parsing and changed ones are parsed again"""
+        from unittest.mock import patch
+
+        parser = InstructionParser()
+        first = parser.parse_file(sample_instructions_file)
+
+        with patch.object(parser, "_parse_actions") as mock_parse_actions:
+            second = parser.parse_file(sample_instructions_file)
+            mock_parse_actions.assert_not_called()
+
+        assert second == first
+        assert parser.cache_hits == 1
+        assert parser.cache_misses == 1
+
+        # Returned plans are copies, changes made by the controller do not reach the cache
+        second[1]["items"].append("abstracts")
+        assert "abstracts" not in parser.parse_file(sample_instructions_file)[1]["items"]
+
+        # The same content in another file shares the plan, new content is parsed
+        copy_path = tmp_path / "copy.txt"
+        copy_path.write_bytes(open(sample_instructions_file, "rb").read())
+        parser.parse_file(str(copy_path))
+        assert parser.cache_misses == 1
+
+        copy_path.write_text("- goto: https://example.com\n", encoding="utf-8")
+        assert parser.parse_file(str(copy_path)) == [{"type": "goto", "url": "https://example.com"}]
+        assert parser.cache_misses == 2
+
+    def test_parse_text_plan_cache(self, sample_instructions_text):
+        """Test instruction text sent again (e.g. to the service) reuses its parsed plan"""
+        from unittest.mock import patch
+
+        parser = InstructionParser()
+        first = parser.parse_text(sample_instructions_text)
+
+        with patch.object(parser, "_parse_actions") as mock_parse_actions:
+            assert parser.parse_text(sample_instructions_text) == first
+            mock_parse_actions.assert_not_called()
+
+        assert parser.cache_hits == 1
+        assert parser.cache_misses == 1
+
+    def test_plan_cache_size(self, tmp_path):
+        """Test the plan cache keeps only the most recently used plans"""
+        parser = InstructionParser(plan_cache_size=2)
+
+        for n in range(3):
+            path = tmp_path / f"instructions_{n}.txt"
+            path.write_text(f"- goto: https://example.com/{n}\n", encoding="utf-8")
+            parser.parse_file(str(path))
+
+        assert len(parser.plan_cache) == 2
+        assert InstructionParser(plan_cache_size=0).plan_cache_size == 0
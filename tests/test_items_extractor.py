@@ -93,4 +93,48 @@ class TestItemsExtractor:
         items_to_extract = ["nonexistent"]
         extracted = extractor.extract(sample_soup, items_to_extract)
         
-        assert len(extracted) == 0
\ No newline at end of file
+        assert len(extracted) == 0
+
+    def test_extract_records(self, arxiv_page):
+        """Test one record is extracted per result container"""
+        extractor = ItemsExtractor()
+        soup = BeautifulSoup(arxiv_page(count=3, total=3), "html.parser")
+
+        records = extractor.extract_records(soup)
+
+        assert len(records) == 3
+        assert records[0] == {
+            "title": "Paper 0: Group Relative Policy Optimisation",
+            "authors": ["Author 0", "Shared Author"],
+            "link": "https://arxiv.org/abs/2501.00000",
+            "abstract": "Abstract of paper 0. It studies reinforcement learning. The results are strong.",
+        }
+        assert records[2]["link"] == "https://arxiv.org/abs/2501.00002"
+
+    def test_extract_records_without_containers(self, sample_soup):
+        """Test pages without result containers have no records"""
+        assert ItemsExtractor().extract_records(sample_soup) == []
+
+    def test_extract_records_keeps_alignment(self, arxiv_page):
+        """Test a missing field leaves the other papers' fields aligned"""
+        html = arxiv_page(count=3, total=3)
+        # Drop the authors of the second paper only
+        start = html.index('<p class="authors">', html.index("Paper 1:"))
+        end = html.index("</p>", start) + len("</p>")
+        soup = BeautifulSoup(html[:start] + html[end:], "html.parser")
+
+        extracted = ItemsExtractor().extract(soup, ["title", "authors", "links"])
+
+        assert extracted["authors"] == [["Author 0", "Shared Author"], [], ["Author 2", "Shared Author"]]
+        assert extracted["title"][2] == "Paper 2: Group Relative Policy Optimisation"
+        assert extracted["link"][2] == "https://arxiv.org/abs/2501.00002"
+
+    def test_extract_uses_records(self, arxiv_page):
+        """Test extract returns the requested items built from the records"""
+        soup = BeautifulSoup(arxiv_page(count=2, total=2), "html.parser")
+
+        extracted = ItemsExtractor().extract(soup, ["Title", "abstracts", "nonexistent"])
+
+        assert set(extracted) == {"title", "abstract"}
+        assert extracted["title"] == ["Paper 0: Group Relative Policy Optimisation", "Paper 1: Group Relative Policy Optimisation"]
+        assert extracted["abstract"][1].startswith("Abstract of paper 1.")
@@ -1,5 +1,6 @@
 import pytest
 import json
+import io
 from Output_Structurer import OutputStructurer
 
 class TestOutputStructurer:
@@ -92,4 +93,68 @@ class TestOutputStructurer:
         json_output = structurer.structure_output(info)
         output = json.loads(json_output)
         
-        assert output["papers"] == []
\ No newline at end of file
+        assert output["papers"] == []
+
+    def test_structure_output_compact(self, sample_state_data):
+        """Test compact output has no indentation or spaces between tokens"""
+        json_output = OutputStructurer(compact=True).structure_output(sample_state_data)
+
+        assert "\n" not in json_output
+        assert json_output.startswith('{"papers":[{"title":')
+        assert json.loads(json_output) == json.loads(OutputStructurer().structure_output(sample_state_data))
+
+    def test_stream_output_ndjson(self):
+        """Test papers are written one compact JSON object per line"""
+
+        stream = io.StringIO()
+        papers = ({"title": f"Paper {n}", "authors": ["Author"], "link": f"https://arxiv.org/abs/{n}", "summary": None} for n in range(3))
+        count = OutputStructurer().stream_output(papers, stream)
+
+        lines = stream.getvalue().splitlines()
+        assert count == 3
+        assert len(lines) == 3
+        assert lines[0] == '{"title":"Paper 0","authors":["Author"],"link":"https://arxiv.org/abs/0","summary":""}'
+
+    def test_stream_output_json(self, sample_state_data):
+        """Test the streamed document matches the structured output"""
+
+        structurer = OutputStructurer()
+        expected = json.loads(structurer.structure_output(sample_state_data))
+
+        stream = io.StringIO()
+        structurer.stream_output(iter(expected["papers"]), stream, "json")
+        assert json.loads(stream.getvalue()) == expected
+
+        # No papers still gives a valid document
+        stream = io.StringIO()
+        assert structurer.stream_output([], stream, "json") == 0
+        assert json.loads(stream.getvalue()) == {"papers": []}
+
+    def test_stream_output_writes_as_papers_arrive(self):
+        """Test each paper is flushed before the next one is requested"""
+
+        stream = io.StringIO()
+
+        def papers():
+            yield {"title": "Paper 1"}
+            # The first paper is already out when the second one is produced
+            assert stream.getvalue().count("\n") == 1
+            yield {"title": "Paper 2"}
+
+        assert OutputStructurer().stream_output(papers(), stream) == 2
+
+    def test_stream_output_unknown_format(self):
+        """Test unknown streaming formats are rejected"""
+
+        with pytest.raises(ValueError):
+            OutputStructurer().stream_output([], io.StringIO(), "xml")
+
+    def test_structure_output_paper_batch(self, sample_state_data, sample_structured_output):
+        """Test a PaperBatch gives the same output as the parallel lists"""
+        from paper_batch import PaperBatch
+
+        structurer = OutputStructurer()
+        batch = PaperBatch.from_columns(sample_state_data)
+
+        assert json.loads(structurer.structure_output(batch)) == sample_structured_output
+        assert structurer.structure_output(batch) == structurer.structure_output(sample_state_data)
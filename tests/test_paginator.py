@@ -0,0 +1,81 @@
+from urllib.parse import urlparse, parse_qs
+from bs4 import BeautifulSoup
+from paginator import Paginator
+
+FIRST_PAGE_URL = "https://arxiv.org/search/?query=grpo&searchtype=all"
+
+class TestPaginator:
+
+    def test_init(self):
+        """Test Paginator initialisation"""
+        paginator = Paginator(max_results=300)
+        assert paginator.max_results == 300
+
+    def test_total_results(self, arxiv_page):
+        """Test reading the total from the results header"""
+        paginator = Paginator()
+        soup = BeautifulSoup(arxiv_page(count=2, total=1234), "html.parser")
+        assert paginator.total_results(soup) == 1234
+
+    def test_total_results_missing(self, sample_soup):
+        """Test pages without the results header have no total"""
+        assert Paginator().total_results(sample_soup) is None
+
+    def test_count_results(self, arxiv_page, sample_soup):
+        """Test counting the results of a page"""
+        paginator = Paginator()
+        assert paginator.count_results(BeautifulSoup(arxiv_page(count=3, total=3), "html.parser")) == 3
+        # Pages without result containers fall back to the titles
+        assert paginator.count_results(sample_soup) == 2
+
+    def test_page_urls_from_offsets(self, arxiv_page):
+        """Test the remaining page urls follow the start offsets up to the total"""
+        paginator = Paginator(max_results=1000)
+        soup = BeautifulSoup(arxiv_page(count=50, total=120), "html.parser")
+
+        urls = paginator.page_urls(FIRST_PAGE_URL, soup)
+
+        offsets = [parse_qs(urlparse(url).query)["start"][0] for url in urls]
+        assert offsets == ["50", "100"]
+        assert all(parse_qs(urlparse(url).query)["size"] == ["50"] for url in urls)
+        assert all(parse_qs(urlparse(url).query)["query"] == ["grpo"] for url in urls)
+
+    def test_page_urls_respects_cap_and_size(self, arxiv_page):
+        """Test the result cap limits the pages and the size parameter is kept"""
+        paginator = Paginator(max_results=60)
+        soup = BeautifulSoup(arxiv_page(count=25, total=5000, size=25), "html.parser")
+
+        urls = paginator.page_urls(FIRST_PAGE_URL + "&size=25", soup)
+
+        offsets = [parse_qs(urlparse(url).query)["start"][0] for url in urls]
+        assert offsets == ["25", "50"]
+
+    def test_page_urls_single_page(self, arxiv_page):
+        """Test there are no more pages when everything fits on the first"""
+        soup = BeautifulSoup(arxiv_page(count=2, total=2), "html.parser")
+        assert Paginator().page_urls(FIRST_PAGE_URL, soup) == []
+
+    def test_page_urls_unknown_total(self, sample_soup):
+        """Test offsets cannot be worked out without a total"""
+        assert Paginator().page_urls(FIRST_PAGE_URL, sample_soup) is None
+
+    def test_next_url(self, arxiv_page):
+        """Test following the next link"""
+        paginator = Paginator()
+        soup = BeautifulSoup(arxiv_page(count=50, total=120), "html.parser")
+
+        next_url = paginator.next_url(FIRST_PAGE_URL, soup)
+        assert next_url.startswith("https://arxiv.org/search/")
+        assert parse_qs(urlparse(next_url).query)["start"] == ["50"]
+
+        last = BeautifulSoup(arxiv_page(start=100, count=20, total=120), "html.parser")
+        assert paginator.next_url(next_url, last) is None
+
+    def test_sorted_newest_first(self):
+        """Test only a descending date order counts as newest first"""
+        paginator = Paginator()
+        assert paginator.sorted_newest_first(FIRST_PAGE_URL + "&order=-announced_date_first")
+        assert paginator.sorted_newest_first(FIRST_PAGE_URL + "&order=-submitted_date")
+        assert not paginator.sorted_newest_first(FIRST_PAGE_URL + "&order=announced_date_first")
+        assert not paginator.sorted_newest_first(FIRST_PAGE_URL + "&order=")
+        assert not paginator.sorted_newest_first(FIRST_PAGE_URL)
@@ -0,0 +1,92 @@
+import pytest
+from paper_batch import PaperBatch, PaperRecord
+
+COLUMNS = {
+    "title": ["Paper 1", "Paper 2", "Paper 3"],
+    "authors": [["Jane Doe", "John Smith"], ["John Smith"], []],
+    "link": ["https://arxiv.org/abs/1", "https://arxiv.org/abs/2", "https://arxiv.org/abs/3"],
+    "abstract": ["Abstract 1", "Abstract 2", "Abstract 3"],
+}
+
+class TestPaperBatch:
+
+    def test_from_columns(self):
+        """Test columns are stored and read back unchanged"""
+        batch = PaperBatch.from_columns({**COLUMNS, "current_url": "https://arxiv.org/search"})
+
+        assert len(batch) == 3
+        assert batch.fields == ["title", "authors", "link", "abstract"]
+        assert batch["title"] == COLUMNS["title"]
+        assert batch["authors"] == COLUMNS["authors"]
+        assert "summary" not in batch
+        assert batch.get("summary") is None
+        with pytest.raises(KeyError):
+            batch["summary"]
+
+    def test_authors_interned(self):
+        """Test every author name is stored once, however many papers list it"""
+        batch = PaperBatch.from_columns({"authors": [["John Smith"] for _ in range(100)]})
+
+        assert batch.author_names == ["John Smith"]
+        assert len(batch.author_ids) == 100
+        assert batch.authors_of(99) == ["John Smith"]
+
+    def test_records(self):
+        """Test the record iterator reads every paper, with missing values as None"""
+        batch = PaperBatch.from_columns({**COLUMNS, "summary": ["Summary 1"]})
+        records = list(batch)
+
+        assert len(records) == 3
+        assert isinstance(records[0], PaperRecord)
+        assert records[0].title == "Paper 1"
+        assert records[0].authors == ["Jane Doe", "John Smith"]
+        assert records[0].get("summary") == "Summary 1"
+        assert records[2].summary is None
+        assert records[2].get("summary", "") == ""
+        assert records[1].to_dict(["title", "link"]) == {"title": "Paper 2", "link": "https://arxiv.org/abs/2"}
+        assert [record.title for record in batch.records(2)] == ["Paper 1", "Paper 2"]
+
+    def test_records_have_no_dict(self):
+        """Test records use slots rather than a dict per paper"""
+        with pytest.raises(AttributeError):
+            PaperRecord().__dict__
+
+    def test_append(self):
+        """Test papers are appended to the columns of the batch"""
+        batch = PaperBatch(["title", "authors", "summary"])
+        batch.append({"title": "Paper 1", "authors": ["Jane Doe"], "link": "ignored"})
+        batch.append({"title": "Paper 2", "summary": "Summary 2"})
+
+        assert batch["title"] == ["Paper 1", "Paper 2"]
+        assert batch["authors"] == [["Jane Doe"], []]
+        assert batch["summary"] == [None, "Summary 2"]
+        assert "link" not in batch
+
+    def test_set_column(self):
+        """Test a column is replaced as a whole and unknown columns are rejected"""
+        batch = PaperBatch.from_columns(COLUMNS)
+        batch.set_column("summary", ["Summary 1", "Summary 2", "Summary 3"])
+        batch.set_column("authors", [["A"], ["B"], ["A", "B"]])
+
+        assert batch["summary"][2] == "Summary 3"
+        assert batch["authors"] == [["A"], ["B"], ["A", "B"]]
+        with pytest.raises(KeyError):
+            batch.set_column("year", [2025])
+
+    def test_keep_rows(self):
+        """Test filtering keeps the columns aligned"""
+        batch = PaperBatch.from_columns(COLUMNS)
+        batch.keep_rows([0, 2])
+
+        assert batch["title"] == ["Paper 1", "Paper 3"]
+        assert batch["authors"] == [["Jane Doe", "John Smith"], []]
+        assert batch["link"] == ["https://arxiv.org/abs/1", "https://arxiv.org/abs/3"]
+
+    def test_ragged_columns(self):
+        """Test columns of different lengths, as the extractor may return them"""
+        batch = PaperBatch.from_columns({"title": ["Paper 1", "Paper 2"], "link": ["https://arxiv.org/abs/1"]})
+
+        assert len(batch) == 2
+        assert batch.column_length("link") == 1
+        assert batch.column_length("authors") == 0
+        assert batch.record(1).link is None
@@ -0,0 +1,79 @@
+import pytest
+from paper_index import PaperIndex, normalise_arxiv_id
+
+class TestNormaliseArxivId:
+
+    @pytest.mark.parametrize("link, expected", [
+        ("https://arxiv.org/abs/2401.12345", "2401.12345"),
+        ("https://arxiv.org/abs/2401.12345v3", "2401.12345"),
+        ("https://arxiv.org/pdf/2401.12345v1", "2401.12345"),
+        ("http://export.arxiv.org/abs/1501.0001", "1501.0001"),
+        ("arXiv:2401.12345v2", "2401.12345"),
+        ("2401.12345", "2401.12345"),
+        ("https://arxiv.org/abs/hep-th/9901001v2", "hep-th/9901001"),
+        ("https://arxiv.org/abs/Math.gt/0309136", "math.GT/0309136"),
+    ])
+    def test_normalise(self, link, expected):
+        """Test versions, prefixes and old style identifiers are normalised"""
+        assert normalise_arxiv_id(link) == expected
+
+    def test_no_identifier(self):
+        """Test links without an arXiv identifier"""
+        assert normalise_arxiv_id(None) is None
+        assert normalise_arxiv_id("") is None
+        assert normalise_arxiv_id("https://example.org/paper") is None
+
+
+class TestPaperIndex:
+
+    def test_record_and_lookup(self):
+        """Test recorded papers are found by identifier, whatever the version of their link"""
+        index = PaperIndex(":memory:")
+        assert index.record([
+            {"title": "Paper 1", "link": "https://arxiv.org/abs/2401.00001v1", "summary": "Summary 1"},
+            {"title": "Paper 2", "link": "https://arxiv.org/abs/2401.00002"},
+            {"title": "No link"},
+        ]) == 2
+
+        entries = index.lookup(["2401.00001", "2401.00002", "2401.00003", None])
+        assert entries["2401.00001"]["summary"] == "Summary 1"
+        assert entries["2401.00002"]["summary"] is None
+        assert "2401.00003" not in entries
+        assert "2401.00001" in index
+        assert len(index) == 2
+        assert index.stats()["hits"] == 2
+        assert index.stats()["misses"] == 1
+
+    def test_record_keeps_summary(self):
+        """Test recording a paper again without a summary keeps the stored one, and a new summary replaces it"""
+        index = PaperIndex(":memory:")
+        index.record([{"link": "https://arxiv.org/abs/2401.00001", "summary": "First"}])
+        first_seen = index.lookup(["2401.00001"])["2401.00001"]["first_seen"]
+
+        index.record([{"link": "https://arxiv.org/abs/2401.00001v2", "title": "Paper 1"}])
+        entry = index.lookup(["2401.00001"])["2401.00001"]
+        assert entry["summary"] == "First"
+        assert entry["title"] == "Paper 1"
+        assert entry["first_seen"] == first_seen
+
+        index.record([{"link": "https://arxiv.org/abs/2401.00001", "summary": "Second"}])
+        assert index.lookup(["2401.00001"])["2401.00001"]["summary"] == "Second"
+
+    def test_persistent(self, tmp_path):
+        """Test the index survives between runs"""
+        path = str(tmp_path / "index" / "papers.sqlite")
+        index = PaperIndex(path)
+        index.record([{"link": "https://arxiv.org/abs/2401.00001", "summary": "Summary"}])
+        index.close()
+
+        assert PaperIndex(path).lookup(["2401.00001"])["2401.00001"]["summary"] == "Summary"
+
+    def test_large_lookup(self):
+        """Test lookups of more identifiers than fit in one query"""
+        index = PaperIndex(":memory:")
+        index.record([{"link": f"https://arxiv.org/abs/2401.{n:05d}"} for n in range(0, 3000, 2)])
+
+        entries = index.lookup([f"2401.{n:05d}" for n in range(3000)])
+        assert len(entries) == 1500
+        assert "2401.00002" in entries
+        assert "2401.00003" not in entries
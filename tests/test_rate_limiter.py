@@ -0,0 +1,91 @@
+import pytest
+import threading
+import time
+from rate_limiter import DomainRateLimiter, TokenBucket
+
+class TestTokenBucket:
+
+    def test_init(self):
+        """Test TokenBucket initialisation"""
+        bucket = TokenBucket(rate=5, capacity=3)
+        assert bucket.rate == 5.0
+        assert bucket.capacity == 3
+        assert bucket.tokens == 3
+
+    def test_init_invalid_rate(self):
+        """Test a non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_per_minute(self):
+        """Test building a bucket from a requests-per-minute budget"""
+        bucket = TokenBucket.per_minute(30)
+        assert bucket.rate == 0.5
+
+    def test_burst_does_not_wait(self):
+        """Test tokens up to the capacity are handed out immediately"""
+        bucket = TokenBucket(rate=1, capacity=3)
+        waits = [bucket.acquire() for _ in range(3)]
+        assert waits == [0.0, 0.0, 0.0]
+
+    def test_acquire_waits_for_refill(self):
+        """Test the rate is enforced once the burst is spent"""
+        bucket = TokenBucket(rate=20, capacity=1)
+
+        start = time.perf_counter()
+        for _ in range(5):
+            bucket.acquire()
+        elapsed = time.perf_counter() - start
+
+        # 1 token up front, then 4 more at 20 per second
+        assert elapsed >= 0.18
+
+    def test_acquire_shared_between_threads(self):
+        """Test concurrent callers share one budget"""
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        def worker():
+            for _ in range(5):
+                bucket.acquire()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # 20 tokens at 50 per second with a burst of 1
+        assert elapsed >= 0.36
+
+    def test_pause(self):
+        """Test a pause holds back the next token"""
+        bucket = TokenBucket(rate=100, capacity=5)
+        bucket.pause(0.2)
+        assert bucket.acquire() >= 0.19
+
+
+class TestDomainRateLimiter:
+
+    def test_init_invalid_rate(self):
+        """Test a non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            DomainRateLimiter(rate=0)
+
+    def test_one_bucket_per_host(self):
+        """Test hosts have separate budgets and urls of the same host share one"""
+        limiter = DomainRateLimiter(rate=1, capacity=1)
+        assert limiter.bucket("https://arxiv.org/search/?query=a") is limiter.bucket("https://ARXIV.org/abs/1")
+        assert limiter.bucket("https://arxiv.org/") is not limiter.bucket("https://export.arxiv.org/")
+
+        # The first request to each host does not wait
+        assert limiter.acquire("https://arxiv.org/") == 0.0
+        assert limiter.acquire("https://export.arxiv.org/") == 0.0
+
+    def test_pause_host(self):
+        """Test pausing a host only holds back that host"""
+        limiter = DomainRateLimiter(rate=100, capacity=1)
+        limiter.pause("https://arxiv.org/", 0.2)
+        assert limiter.acquire("https://example.org/") == 0.0
+        assert limiter.acquire("https://arxiv.org/abs/1") >= 0.19
@@ -0,0 +1,131 @@
+import pytest
+import sqlite3
+import threading
+from unittest.mock import Mock
+from abstract_summariser import SUMMARY_UNAVAILABLE
+from agent import Agent
+from sqlite_sink import SqliteSink
+
+class TestSqliteSink:
+
+    def test_write_batches(self, tmp_path, papers):
+        """Test papers are upserted in batches with their authors, in a WAL database"""
+        path = str(tmp_path / "papers.sqlite")
+        with SqliteSink(path, batch_size=4, source="search.txt") as sink:
+            assert sink.write_papers(papers(10)) == 10
+            assert sink.batches == 2 # the last two papers are still buffered
+            sink.flush()
+            assert sink.stats() == {"written": 10, "skipped": 0, "batches": 3, "papers": 10, "authors": 11}
+
+        connection = sqlite3.connect(path)
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute(
+            "SELECT title, summary, source FROM papers WHERE arxiv_id = '2501.00003'"
+        ).fetchone() == ("Paper 3", "Summary 3", "search.txt")
+        assert connection.execute(
+            "SELECT author FROM paper_authors WHERE arxiv_id = '2501.00003' ORDER BY position"
+        ).fetchall() == [("Author 3",), ("Shared Author",)]
+
+        # Title and author searches use the indexes
+        plans = [
+            " ".join(str(row) for row in connection.execute(f"EXPLAIN QUERY PLAN {query}").fetchall())
+            for query in ("SELECT * FROM papers WHERE title = 'Paper 1'", "SELECT arxiv_id FROM paper_authors WHERE author = 'Shared Author'")
+        ]
+        assert "papers_title" in plans[0]
+        assert "paper_authors_author" in plans[1]
+        connection.close()
+
+    def test_update_in_place(self, tmp_path, papers):
+        """Test a later run updates the summaries and authors in place and never replaces them with missing values"""
+        path = str(tmp_path / "papers.sqlite")
+        with SqliteSink(path) as sink:
+            sink.write_papers(papers(3))
+
+        first_seen = sqlite3.connect(path).execute("SELECT first_seen FROM papers WHERE arxiv_id = '2501.00000'").fetchone()[0]
+
+        with SqliteSink(path) as sink:
+            sink.write_papers(papers(2, summary="Better"))
+            sink.write({"title": "Paper 2", "link": "https://arxiv.org/abs/2501.00002v2", "summary": SUMMARY_UNAVAILABLE})
+            sink.flush()
+            assert sink.stats()["papers"] == 3
+
+        connection = sqlite3.connect(path)
+        rows = connection.execute("SELECT arxiv_id, summary, abstract, first_seen FROM papers ORDER BY arxiv_id").fetchall()
+        assert [row[1] for row in rows] == ["Better 0", "Better 1", "Summary 2"]
+        assert rows[2][2] == "Abstract 2"
+        assert rows[0][3] == first_seen
+        # Papers written without authors keep the stored ones
+        assert connection.execute("SELECT COUNT(*) FROM paper_authors WHERE arxiv_id = '2501.00002'").fetchone()[0] == 2
+        connection.close()
+
+    def test_skip_without_link(self):
+        """Test papers without an arXiv link are counted but not written"""
+        with SqliteSink(":memory:") as sink:
+            sink.write({"title": "No link"})
+            sink.write({"title": "Elsewhere", "link": "https://example.org/paper"})
+            sink.flush()
+            assert sink.stats()["skipped"] == 2
+            assert sink.stats()["papers"] == 0
+
+    def test_concurrent_writers(self, tmp_path, papers):
+        """Test several connections (as separate batch jobs would open) write to the same database"""
+        path = str(tmp_path / "papers.sqlite")
+        sinks = [SqliteSink(path, batch_size=5) for _ in range(4)]
+
+        def write(number, sink):
+            for start in range(0, 50, 5):
+                sink.write_papers(papers(5, start=number * 50 + start))
+
+        threads = [threading.Thread(target=write, args=(number, sink)) for number, sink in enumerate(sinks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sinks[0].stats()["papers"] == 200
+        for sink in sinks:
+            sink.close()
+
+    def test_failed_batch_is_kept(self, tmp_path, papers):
+        """Test a batch blocked by another writer past the busy timeout stays buffered and is written by the next flush"""
+        path = str(tmp_path / "papers.sqlite")
+        sink = SqliteSink(path, busy_timeout=0.05)
+        sink.write_papers(papers(3))
+
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.OperationalError):
+            sink.flush()
+        other.execute("ROLLBACK")
+        other.close()
+
+        sink.flush()
+        assert sink.stats()["papers"] == 3
+        assert sink.stats()["batches"] == 1
+        sink.close()
+
+    def test_agent_export(self, tmp_path, sample_instructions_file, arxiv_page):
+        """Test the real pipeline writes its papers, abstracts included, to the database and closes it"""
+        from bs4 import BeautifulSoup
+        from Controller import Controller
+        from items_extractor import ItemsExtractor
+        from Output_Structurer import OutputStructurer
+
+        page = arxiv_page(start=0, count=3, total=3)
+        scraper = Mock(spec=["fetch_n_parse"])
+        scraper.fetch_n_parse.return_value = page, BeautifulSoup(page, "html.parser")
+        summariser = Mock()
+        summariser.Summarise_abstracts.side_effect = lambda abstracts: ["Summary"] * len(abstracts)
+
+        controller = Controller(scraper=scraper, extractor=ItemsExtractor(), summariser=summariser, structurer=OutputStructurer())
+        path = str(tmp_path / "papers.sqlite")
+
+        assert Agent(controller=controller).export(sample_instructions_file, SqliteSink(path)) == 3
+
+        connection = sqlite3.connect(path)
+        rows = connection.execute("SELECT arxiv_id, abstract, summary FROM papers ORDER BY arxiv_id").fetchall()
+        assert [row[0] for row in rows] == ["2501.00000", "2501.00001", "2501.00002"]
+        assert all(row[1].startswith(f"Abstract of paper {n}.") for n, row in enumerate(rows))
+        assert all(row[2] == "Summary" for row in rows)
+        assert connection.execute("SELECT COUNT(*) FROM paper_authors WHERE author = 'Shared Author'").fetchone()[0] == 3
+        connection.close()
@@ -0,0 +1,32 @@
+import threading
+from sqlite_store import connect_shared
+
+class TestConnectShared:
+
+    def test_creates_directory(self, tmp_path):
+        """Test the database directory is created and connection options are passed on"""
+        path = tmp_path / "nested" / "store.sqlite"
+        connection, lock = connect_shared(str(path), isolation_level=None)
+
+        connection.execute("CREATE TABLE entries (value TEXT)")
+        assert path.exists()
+        assert connection.isolation_level is None
+        connection.close()
+
+    def test_shared_by_threads(self):
+        """Test the connection can be used from other threads while holding the lock"""
+        connection, lock = connect_shared(":memory:")
+        connection.execute("CREATE TABLE entries (value INTEGER)")
+
+        def insert(value):
+            with lock:
+                connection.execute("INSERT INTO entries VALUES (?)", (value,))
+
+        threads = [threading.Thread(target=insert, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 8
+        connection.close()
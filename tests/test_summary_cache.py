@@ -0,0 +1,77 @@
+import time
+from summary_cache import SummaryCache
+
+class TestSummaryCache:
+
+    def test_init_creates_database(self, tmp_path):
+        """Test the cache database is created on disk"""
+        path = tmp_path / "cache" / "summaries.sqlite"
+        cache = SummaryCache(str(path))
+
+        assert path.exists()
+        assert cache.stats()["entries"] == 0
+        cache.close()
+
+    def test_make_key(self):
+        """Test keys depend on the abstract, the model and the prompt template"""
+        key = SummaryCache.make_key("abstract", "model", "prompt")
+
+        assert key == SummaryCache.make_key("abstract", "model", "prompt")
+        assert key != SummaryCache.make_key("abstract 2", "model", "prompt")
+        assert key != SummaryCache.make_key("abstract", "model 2", "prompt")
+        assert key != SummaryCache.make_key("abstract", "model", "prompt 2")
+        assert len(key) == 64
+
+    def test_put_and_get(self):
+        """Test stored summaries are returned and counted as hits"""
+        cache = SummaryCache(":memory:")
+        cache.put("key", "A summary.")
+
+        assert cache.get("key") == "A summary."
+        assert cache.get("other") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_persists_between_instances(self, tmp_path):
+        """Test summaries survive reopening the cache"""
+        path = str(tmp_path / "summaries.sqlite")
+        cache = SummaryCache(path)
+        cache.put("key", "A summary.")
+        cache.close()
+
+        cache = SummaryCache(path)
+        assert cache.get("key") == "A summary."
+        assert cache.stats()["bytes"] == len("A summary.")
+
+    def test_lru_eviction(self):
+        """Test the least recently used entries are evicted when over the size limit"""
+        cache = SummaryCache(":memory:", max_bytes=30)
+        cache.put("a", "x" * 10)
+        time.sleep(0.01)
+        cache.put("b", "y" * 10)
+        time.sleep(0.01)
+
+        # Reading "a" makes "b" the least recently used entry
+        assert cache.get("a") is not None
+        time.sleep(0.01)
+        cache.put("c", "z" * 15)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 10
+        assert cache.get("c") == "z" * 15
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 30
+
+    def test_ttl_expiry(self):
+        """Test entries older than the ttl are treated as misses"""
+        cache = SummaryCache(":memory:", ttl=0.05)
+        cache.put("key", "A summary.")
+        assert cache.get("key") == "A summary."
+
+        time.sleep(0.1)
+        assert cache.get("key") is None
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,273 @@
+import pytest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from summary_router import CircuitBreaker, SummaryRouter, TierMetrics, TierUnavailableError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_recovers(self):
+        """Test the circuit opens after consecutive failures and closes after a successful trial"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=10, clock=clock)
+
+        assert breaker.allow()
+        assert not breaker.record_failure()
+        assert breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        # After the cool-down a single trial call goes through
+        clock.now = 10
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_failed_trial_opens_again(self):
+        """Test a failed trial call starts a new cool-down"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock.now = 15
+        assert not breaker.allow()
+
+    def test_success_resets_failures(self):
+        """Test only consecutive failures count"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+
+class TestSummaryRouter:
+
+    def _router(self, clock=None, **options):
+        calls = {"fast": 0, "slow": 0}
+
+        def slow(text):
+            calls["slow"] += 1
+            raise ConnectionError("Service unavailable")
+
+        def fast(text):
+            calls["fast"] += 1
+            return f"Summary of {text}"
+
+        router = SummaryRouter(failure_threshold=2, cooldown=30, clock=clock or time.monotonic, **options)
+        router.add_tier("slow", slow)
+        router.add_tier("fast", fast)
+        return router, calls
+
+    def test_route_falls_through_and_circuit_skips_failing_tier(self):
+        """Test a failing tier is only tried until its circuit opens"""
+        router, calls = self._router()
+
+        for i in range(5):
+            assert router.route(f"Abstract {i}") == (f"Summary of Abstract {i}", "fast")
+
+        assert calls["slow"] == 2
+        metrics = router.metrics()
+        assert metrics["slow"]["failures"] == 2
+        assert metrics["slow"]["skipped"] == 3
+        assert metrics["slow"]["circuit"] == "open"
+        assert metrics["fast"]["successes"] == 5
+        assert metrics["fast"]["failure_rate"] == 0.0
+
+    def test_deadline(self):
+        """Test a call slower than its deadline counts as a timeout and the next tier answers"""
+        router = SummaryRouter()
+        router.add_tier("hanging", lambda text: time.sleep(0.5) or "Late summary", deadline=0.05)
+        router.add_tier("fast", lambda text: "Fast summary")
+
+        started = time.monotonic()
+        assert router.route("Abstract") == ("Fast summary", "fast")
+        assert time.monotonic() - started < 0.4
+        assert router.metrics()["hanging"]["timeouts"] == 1
+        router.close()
+
+    def test_unavailable_tiers_are_not_tried(self):
+        """Test tiers whose backend is not loaded are passed over without counting"""
+        router = SummaryRouter()
+        router.add_tier("model", lambda text: "Model summary", available=lambda: False)
+        router.add_tier("fast", lambda text: "Fast summary")
+
+        assert router.route("Abstract") == ("Fast summary", "fast")
+        assert router.metrics()["model"]["calls"] == 0
+
+    def test_last_tier_error_is_raised(self):
+        """Test an error of the last tier reaches the caller"""
+        router = SummaryRouter()
+        router.add_tier("only", lambda text: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            router.route("Abstract")
+
+    def test_run_budget_routes_to_faster_tier(self):
+        """Test slow tiers are skipped once the time left per item is shorter than their latency"""
+        clock = FakeClock()
+        router = SummaryRouter(clock=clock)
+        router.add_tier("model", lambda text: "Model summary", expected_latency=2.0)
+        router.add_tier("fast", lambda text: "Fast summary", expected_latency=0.01)
+
+        # 10 items in 100s: 10s per item, the model fits
+        run = router.start_run(100, 10)
+        assert router.route("Abstract", run)[1] == "model"
+
+        # Most of the budget gone: under 2s per remaining item
+        clock.now = 90
+        assert router.route("Abstract", run)[1] == "fast"
+        assert router.metrics()["model"]["skipped"] == 1
+
+        # No budget: the model is used again
+        assert router.start_run(None, 0) is None
+        assert router.route("Abstract")[1] == "model"
+
+    def test_run_budgets_are_per_run(self):
+        """Test a new run does not reset the budget of a run still in progress"""
+        clock = FakeClock()
+        router = SummaryRouter(clock=clock)
+        router.add_tier("model", lambda text: "Model summary", expected_latency=2.0)
+        router.add_tier("fast", lambda text: "Fast summary", expected_latency=0.01)
+
+        first = router.start_run(100, 10)
+        clock.now = 90
+        second = router.start_run(100, 10)
+
+        assert router.route("Abstract", first)[1] == "fast"
+        assert router.route("Abstract", second)[1] == "model"
+
+    def test_hanging_tier_does_not_hold_up_next_tier(self):
+        """Test calls abandoned by a hanging tier neither delay nor time out the calls of the next tier"""
+        release = threading.Event()
+        router = SummaryRouter(failure_threshold=100, max_workers=2)
+        router.add_tier("hanging", lambda text: release.wait() and "Late summary", deadline=0.1)
+        router.add_tier("model", lambda text: time.sleep(0.02) or f"Summary of {text}", deadline=0.2)
+        router.add_tier("fast", lambda text: "Fast summary")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(router.route, [f"Abstract {i}" for i in range(8)]))
+
+        assert results == [(f"Summary of Abstract {i}", "model") for i in range(8)]
+        metrics = router.metrics()
+        assert metrics["model"]["failures"] == 0
+        assert metrics["model"]["circuit"] == "closed"
+        # The hanging calls hold the workers of their own tier only, later calls waiting for one are given up
+        assert metrics["hanging"]["timeouts"] >= 2
+        assert metrics["hanging"]["timeouts"] + metrics["hanging"]["skipped"] == 8
+
+        release.set()
+        router.close()
+
+    def test_deadline_starts_with_the_call(self):
+        """Test time spent waiting for a free worker does not count against the deadline of a call"""
+        router = SummaryRouter(max_workers=1)
+        router.add_tier("model", lambda text: time.sleep(0.15) or f"Summary of {text}", deadline=0.2)
+        router.add_tier("fast", lambda text: "Fast summary")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(router.route, ["Abstract 0", "Abstract 1"]))
+
+        # The second call waited 0.15s for the worker and then ran within its own 0.2s
+        assert results == [("Summary of Abstract 0", "model"), ("Summary of Abstract 1", "model")]
+        router.close()
+
+    def test_close_cancels_queued_calls(self):
+        """Test a call still waiting for a worker when the router closes never runs"""
+        release = threading.Event()
+        started = []
+        router = SummaryRouter(max_workers=1)
+        router.add_tier("model", lambda text: started.append(text) or release.wait() and f"Summary of {text}", deadline=0.5)
+        router.add_tier("fast", lambda text: "Fast summary")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(router.route, "Abstract 0")
+            time.sleep(0.05)
+            second = executor.submit(router.route, "Abstract 1")
+            time.sleep(0.05)
+            router.close()
+            release.set()
+
+            assert first.result() == ("Summary of Abstract 0", "model")
+            assert second.result() == ("Fast summary", "fast")
+
+        assert started == ["Abstract 0"]
+        assert not router.tiers[0]["pending"]
+
+    def test_call_directly(self):
+        """Test batched requests go through the tier breaker and are refused when it is open"""
+        router, calls = self._router()
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                router.call("slow", lambda: router.tiers[0]["summarise"]("Abstracts"), items=5)
+
+        with pytest.raises(TierUnavailableError):
+            router.call("slow", lambda: "never called")
+
+        with pytest.raises(KeyError):
+            router.call("unknown", lambda: None)
+
+    def test_trial_without_free_worker(self):
+        """Test a half-open tier whose workers are all busy is tried again once one is free"""
+        clock = FakeClock()
+        release = threading.Event()
+        router = SummaryRouter(failure_threshold=1, cooldown=10, max_workers=1, clock=clock)
+        router.add_tier("model", lambda text: f"Summary of {text}", deadline=0.05)
+        router.add_tier("fast", lambda text: "Fast summary")
+        breaker = router.tiers[0]["breaker"]
+
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.state == "half-open"
+
+        # The only worker is held by an abandoned call, so the trial cannot start
+        router.tiers[0]["executor"].submit(release.wait)
+        assert router.route("Abstract") == ("Fast summary", "fast")
+        assert router.metrics()["model"]["skipped"] == 1
+        assert breaker.state == "half-open"
+
+        release.set()
+        time.sleep(0.05)
+        assert router.route("Abstract") == ("Summary of Abstract", "model")
+        assert breaker.state == "closed"
+        router.close()
+
+
+class TestTierMetrics:
+
+    def test_snapshot(self):
+        """Test latency and failure metrics"""
+        metrics = TierMetrics()
+        for latency in [0.1, 0.2, 0.3]:
+            metrics.record(latency, "success")
+        metrics.record(1.0, "timeout")
+        metrics.record(0.0, "skipped")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["calls"] == 4
+        assert snapshot["failures"] == 1
+        assert snapshot["timeouts"] == 1
+        assert snapshot["skipped"] == 1
+        assert snapshot["failure_rate"] == 0.25
+        assert snapshot["mean_latency"] == pytest.approx(0.4)
+        assert snapshot["p95_latency"] == 1.0
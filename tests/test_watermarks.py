@@ -0,0 +1,46 @@
+import json
+from watermarks import WatermarkStore
+
+class TestWatermarkStore:
+
+    def test_first_run(self, tmp_path):
+        """Test an instruction file without a watermark"""
+        store = WatermarkStore(str(tmp_path / "watermarks.json"))
+        assert store.seen(WatermarkStore.key("instructions.txt")) is None
+
+    def test_update(self, tmp_path):
+        """Test runs move the watermark forward and it is kept between processes"""
+        path = str(tmp_path / "state" / "watermarks.json")
+        store = WatermarkStore(path)
+
+        assert store.update("search", ["2501.00002", "2501.00001", None]) == 2
+        assert store.update("search", ["2501.00003", "2501.00002"]) == 1
+        assert store.seen("search") == {"2501.00001", "2501.00002", "2501.00003"}
+
+        reloaded = WatermarkStore(path)
+        assert reloaded.seen("search") == {"2501.00001", "2501.00002", "2501.00003"}
+        assert reloaded.seen("other") is None
+
+    def test_max_ids(self, tmp_path):
+        """Test the oldest ids are forgotten first"""
+        store = WatermarkStore(str(tmp_path / "watermarks.json"), max_ids=3)
+        store.update("search", ["2501.00002", "2501.00001"])
+        store.update("search", ["2501.00004", "2501.00003"])
+
+        assert store.seen("search") == {"2501.00004", "2501.00003", "2501.00002"}
+
+    def test_key(self, tmp_path):
+        """Test relative and absolute paths of the same file share a watermark"""
+        path = tmp_path / "instructions.txt"
+        assert WatermarkStore.key(str(path)) == WatermarkStore.key(str(tmp_path / "." / "instructions.txt"))
+
+    def test_unreadable_file(self, tmp_path):
+        """Test a corrupted watermarks file starts from scratch"""
+        path = tmp_path / "watermarks.json"
+        path.write_text("{not json", encoding="utf-8")
+
+        store = WatermarkStore(str(path))
+        assert store.seen("search") is None
+
+        store.update("search", ["2501.00001"])
+        assert json.loads(path.read_text(encoding="utf-8"))["search"]["ids"] == ["2501.00001"]
@@ -0,0 +1,354 @@
+import pytest
+import time
+import requests
+from bs4 import BeautifulSoup
+from web_scraper import WebScraper, retry_after_seconds
+
+class TestWebScraper:
+
+    def test_init(self):
+        """Test WebScraper initialisation"""
+        scraper = WebScraper()
+        assert isinstance(scraper.session, requests.Session)
+        assert scraper.max_concurrency >= 1
+        assert scraper.per_host_limit >= 1
+
+        # Test with custom session and limits
+        session = requests.Session()
+        scraper = WebScraper(session=session, max_concurrency=3, per_host_limit=2)
+        assert scraper.session is session
+        assert scraper.max_concurrency == 3
+        assert scraper.per_host_limit == 2
+
+    def test_fetch_n_parse(self, local_server):
+        """Test the synchronous wrapper returns the raw text and the soup"""
+        scraper = WebScraper()
+        text, soup = scraper.fetch_n_parse(f"{local_server.url}/search")
+
+        assert "Page /search" in text
+        assert isinstance(soup, BeautifulSoup)
+        assert soup.select_one("p.title").text == "Page /search"
+
+    def test_fetch_n_parse_http_error(self, local_server):
+        """Test HTTP errors are raised to the caller"""
+        local_server.routes["/missing"] = lambda handler: (404, {}, "Not Found")
+        scraper = WebScraper()
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            scraper.fetch_n_parse(f"{local_server.url}/missing")
+
+    def test_fetch_many_runs_concurrently(self, local_server):
+        """Test several slow pages are fetched at the same time"""
+        local_server.delay = 0.3
+        scraper = WebScraper(max_concurrency=5, per_host_limit=5)
+        urls = [f"{local_server.url}/page/{i}" for i in range(5)]
+
+        start = time.perf_counter()
+        results = list(scraper.fetch_many(urls))
+        elapsed = time.perf_counter() - start
+
+        # Sequential fetching would take at least 1.5s
+        assert elapsed < 1.2
+        assert sorted(url for url, _, _ in results) == sorted(urls)
+        assert local_server.max_in_flight > 1
+
+    def test_fetch_many_per_host_limit(self, local_server):
+        """Test the per-host limit caps in-flight requests to the same host"""
+        local_server.delay = 0.1
+        scraper = WebScraper(max_concurrency=8, per_host_limit=2)
+        urls = [f"{local_server.url}/page/{i}" for i in range(6)]
+
+        results = list(scraper.fetch_many(urls))
+
+        assert len(results) == 6
+        assert local_server.max_in_flight <= 2
+
+    def test_fetch_many_busy_host_does_not_block_others(self, local_server):
+        """Test urls queued for a busy host leave the global slots to the other hosts"""
+        def slow_page(handler):
+            time.sleep(0.3)
+            return 200, {"Content-Type": "text/html"}, "<p>slow</p>"
+
+        local_server.routes["/slow"] = slow_page
+        scraper = WebScraper(max_concurrency=2, per_host_limit=1)
+        other_host = local_server.url.replace("127.0.0.1", "localhost")
+        urls = [f"{local_server.url}/slow" for _ in range(3)] + [f"{other_host}/fast"]
+
+        completed = [url for url, _, _ in scraper.fetch_many(urls)]
+
+        assert completed[0] == f"{other_host}/fast"
+
+    def test_fetch_many_yields_as_completed(self, local_server):
+        """Test pages are yielded in the order they complete, not the order requested"""
+        def slow_page(handler):
+            time.sleep(0.5)
+            return 200, {"Content-Type": "text/html"}, "<p>slow</p>"
+
+        local_server.routes["/slow"] = slow_page
+        scraper = WebScraper()
+        urls = [f"{local_server.url}/slow", f"{local_server.url}/fast"]
+
+        completed = [url for url, _, _ in scraper.fetch_many(urls)]
+
+        assert completed == [f"{local_server.url}/fast", f"{local_server.url}/slow"]
+
+    def test_fetch_many_empty(self):
+        """Test fetching no urls yields nothing"""
+        scraper = WebScraper()
+        assert list(scraper.fetch_many([])) == []
+
+    def test_fetch_many_error(self, local_server):
+        """Test a failing page raises while iterating"""
+        local_server.routes["/broken"] = lambda handler: (500, {}, "Server Error")
+        scraper = WebScraper(max_retries=0)
+        urls = [f"{local_server.url}/broken"]
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            list(scraper.fetch_many(urls))
+
+    def test_init_offline_needs_cache(self):
+        """Test offline replay mode cannot be used without a cache"""
+        with pytest.raises(ValueError):
+            WebScraper(offline=True)
+
+    def test_cache_serves_fresh_response(self, local_server):
+        """Test a fresh cached page is served without a request"""
+        from http_cache import HttpCache
+
+        local_server.routes["/fresh"] = lambda handler: (200, {"Cache-Control": "max-age=300"}, "<p>fresh</p>")
+        scraper = WebScraper(cache=HttpCache(":memory:"))
+        url = f"{local_server.url}/fresh"
+
+        assert scraper.fetch_n_parse(url)[0] == "<p>fresh</p>"
+        assert scraper.fetch_n_parse(url)[0] == "<p>fresh</p>"
+        assert len(local_server.requests) == 1
+
+    def test_cache_revalidates_with_etag(self, local_server):
+        """Test a stale cached page is revalidated and a 304 serves the cached body"""
+        from http_cache import HttpCache
+
+        def etag_page(handler):
+            if handler.headers.get("If-None-Match") == '"v1"':
+                return 304, {"ETag": '"v1"'}, ""
+            return 200, {"ETag": '"v1"', "Cache-Control": "no-cache"}, "<p>cached body</p>"
+
+        local_server.routes["/etag"] = etag_page
+        scraper = WebScraper(cache=HttpCache(":memory:"))
+        url = f"{local_server.url}/etag"
+
+        assert scraper.fetch_n_parse(url)[0] == "<p>cached body</p>"
+        text, soup = scraper.fetch_n_parse(url)
+
+        assert text == "<p>cached body</p>"
+        assert soup.p.text == "cached body"
+        assert len(local_server.requests) == 2
+        assert local_server.request_headers[1].get("If-None-Match") == '"v1"'
+
+    def test_cache_revalidates_with_last_modified(self, local_server):
+        """Test If-Modified-Since is sent when the page has a Last-Modified date"""
+        from http_cache import HttpCache
+
+        last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+        def dated_page(handler):
+            if handler.headers.get("If-Modified-Since") == last_modified:
+                return 304, {}, ""
+            return 200, {"Last-Modified": last_modified}, "<p>dated</p>"
+
+        local_server.routes["/dated"] = dated_page
+        scraper = WebScraper(cache=HttpCache(":memory:"))
+        url = f"{local_server.url}/dated"
+
+        scraper.fetch_n_parse(url)
+        assert scraper.fetch_n_parse(url)[0] == "<p>dated</p>"
+        assert local_server.request_headers[1].get("If-Modified-Since") == last_modified
+
+    def test_offline_replay(self, local_server, tmp_path):
+        """Test offline mode replays recorded pages and never touches the network"""
+        from http_cache import HttpCache, CacheMissError
+
+        path = str(tmp_path / "http.sqlite")
+        url = f"{local_server.url}/recorded"
+
+        # Record the page once
+        WebScraper(cache=HttpCache(path)).fetch_n_parse(url)
+        assert len(local_server.requests) == 1
+
+        scraper = WebScraper(cache=HttpCache(path), offline=True)
+        text, _ = scraper.fetch_n_parse(url)
+
+        assert "Page /recorded" in text
+        assert len(local_server.requests) == 1
+
+        # Pages that were never recorded are a request error
+        with pytest.raises(CacheMissError):
+            scraper.fetch_n_parse(f"{local_server.url}/never-recorded")
+
+    def test_stream_records(self, local_server, arxiv_page):
+        """Test records are yielded while the page is still downloading"""
+        from items_extractor import ItemsExtractor
+
+        html = arxiv_page(count=6, total=6)
+        # The first chunk ends in the middle of the fourth paper
+        middle = html.index("Paper 3:")
+        arrival = {}
+
+        def slow_stream(handler):
+            def chunks():
+                yield html[:middle]
+                time.sleep(0.5)
+                arrival["second_chunk"] = time.perf_counter()
+                yield html[middle:]
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, chunks()
+
+        local_server.routes["/stream"] = slow_stream
+        scraper = WebScraper()
+
+        records = []
+        first_record_at = None
+        for record in scraper.stream_records(f"{local_server.url}/stream", ItemsExtractor(), chunk_size=256):
+            if first_record_at is None:
+                first_record_at = time.perf_counter()
+            records.append(record)
+
+        assert first_record_at < arrival["second_chunk"]
+        assert [record["link"] for record in records] == [f"https://arxiv.org/abs/2501.{n:05d}" for n in range(6)]
+        assert records == ItemsExtractor().extract_records(BeautifulSoup(html, "html.parser"))
+
+    def test_stream_records_from_cache(self, local_server, arxiv_page):
+        """Test streaming goes through the HTTP cache when one is configured"""
+        from http_cache import HttpCache
+        from items_extractor import ItemsExtractor
+
+        local_server.routes["/cached"] = lambda handler: (200, {"Cache-Control": "max-age=300"}, arxiv_page(count=3, total=3))
+        scraper = WebScraper(cache=HttpCache(":memory:"))
+        url = f"{local_server.url}/cached"
+
+        first = list(scraper.stream_records(url, ItemsExtractor(), chunk_size=100))
+        second = list(scraper.stream_records(url, ItemsExtractor(), chunk_size=100))
+
+        assert len(first) == 3
+        assert first == second
+        assert len(local_server.requests) == 1
+
+    def test_stream_records_http_error(self, local_server):
+        """Test HTTP errors are raised when streaming"""
+        from items_extractor import ItemsExtractor
+
+        local_server.routes["/missing"] = lambda handler: (404, {}, "Not Found")
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            list(WebScraper().stream_records(f"{local_server.url}/missing", ItemsExtractor()))
+
+    def _flaky(self, local_server, path, failures, status=503, headers=None):
+        """Route failing with the given status for the first requests, then serving the page"""
+        state = {"calls": 0}
+
+        def route(handler):
+            state["calls"] += 1
+            if state["calls"] <= failures:
+                return status, headers or {}, "Try again later"
+            return 200, {"Content-Type": "text/html"}, "<html><body><p class='title is-5'>Recovered</p></body></html>"
+
+        local_server.routes[path] = route
+        return state
+
+    def test_init_retry_options(self):
+        """Test the timeout, retry and rate limit options"""
+        scraper = WebScraper(connect_timeout=2, read_timeout=10, max_retries=5, rate_limit=4)
+        assert scraper.timeout == (2, 10)
+        assert scraper.max_retries == 5
+        assert scraper.rate_limiter.rate == 4.0
+        assert WebScraper().rate_limiter is None
+
+    def test_retries_flaky_server(self, local_server):
+        """Test temporary server errors are retried with backoff until the page is served"""
+        state = self._flaky(local_server, "/flaky", failures=2)
+        scraper = WebScraper(backoff_base=0.01)
+
+        _, soup = scraper.fetch_n_parse(f"{local_server.url}/flaky")
+        assert soup.find("p", class_="title").text == "Recovered"
+        assert state["calls"] == 3
+
+    def test_retries_exhausted(self, local_server):
+        """Test the last error response is raised once the retries are used up"""
+        state = self._flaky(local_server, "/down", failures=10, status=502)
+        scraper = WebScraper(max_retries=2, backoff_base=0.01)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            scraper.fetch_n_parse(f"{local_server.url}/down")
+        assert state["calls"] == 3
+
+    def test_client_errors_not_retried(self, local_server):
+        """Test errors that will not go away are not retried"""
+        local_server.routes["/missing"] = lambda handler: (404, {}, "Not Found")
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            WebScraper().fetch_n_parse(f"{local_server.url}/missing")
+        assert len(local_server.requests) == 1
+
+    def test_honours_retry_after(self, local_server):
+        """Test a 429 response is retried after the delay given in Retry-After"""
+        state = self._flaky(local_server, "/throttled", failures=1, status=429, headers={"Retry-After": "1"})
+        scraper = WebScraper(backoff_base=0.01)
+
+        start = time.perf_counter()
+        scraper.fetch_n_parse(f"{local_server.url}/throttled")
+        assert time.perf_counter() - start >= 0.9
+        assert state["calls"] == 2
+
+    def test_retry_after_too_long(self, local_server):
+        """Test a Retry-After longer than the longest backoff gives up straight away"""
+        state = self._flaky(local_server, "/closed", failures=1, status=503, headers={"Retry-After": "3600"})
+        scraper = WebScraper(backoff_max=10)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            scraper.fetch_n_parse(f"{local_server.url}/closed")
+        assert state["calls"] == 1
+
+    def test_read_timeout(self, local_server):
+        """Test a slow response times out and is retried"""
+        local_server.delay = 0.5
+        scraper = WebScraper(read_timeout=0.1, max_retries=1, backoff_base=0.01)
+
+        with pytest.raises(requests.exceptions.Timeout):
+            scraper.fetch_n_parse(f"{local_server.url}/slow")
+        assert len(local_server.requests) == 2
+
+    def test_rate_limit_shared_by_concurrent_fetches(self, local_server):
+        """Test concurrent fetches to one host share its token bucket"""
+        scraper = WebScraper(max_concurrency=8, per_host_limit=8, rate_limit=20)
+        urls = [f"{local_server.url}/page{i}" for i in range(6)]
+
+        start = time.perf_counter()
+        assert len(list(scraper.fetch_many(urls))) == 6
+        elapsed = time.perf_counter() - start
+
+        # 1 request up front, then 5 more at 20 per second
+        assert elapsed >= 0.23
+
+    def test_retry_after_pauses_host(self, local_server):
+        """Test a Retry-After holds back the other fetches to the same host"""
+        self._flaky(local_server, "/throttled", failures=1, status=429, headers={"Retry-After": "1"})
+        scraper = WebScraper(max_concurrency=2, per_host_limit=2, rate_limit=100, rate_burst=2)
+
+        start = time.perf_counter()
+        list(scraper.fetch_many([f"{local_server.url}/throttled"]))
+        scraper.fetch_n_parse(f"{local_server.url}/other")
+        assert time.perf_counter() - start >= 0.9
+
+
+class TestRetryAfter:
+
+    def test_seconds(self):
+        """Test a delay in seconds"""
+        assert retry_after_seconds("120") == 120.0
+
+    def test_http_date(self):
+        """Test an HTTP date in the future"""
+        from email.utils import formatdate
+        assert 50 < retry_after_seconds(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+    def test_missing_or_invalid(self):
+        """Test missing and invalid headers"""
+        assert retry_after_seconds(None) is None
+        assert retry_after_seconds("soon") is None
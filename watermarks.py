@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import threading
+import time
+
+
+class WatermarkStore:
+    """Watermarks of the incremental mode: for every instruction file, the arXiv ids output by its earlier runs,
+    newest first, kept in a JSON file"""
+
+    def __init__(self, path="watermarks.json", max_ids=10000):
+        """
+        Load the watermarks file (or start empty)
+
+        Args:
+            path: (str) JSON file
+            max_ids: (int) ids kept per instruction file, the oldest are forgotten first
+        """
+        self.path = path
+        self.max_ids = max(1, max_ids)
+        self.lock = threading.Lock()
+        self.watermarks = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    self.watermarks = json.load(file)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read the watermarks file {path}, starting from scratch: {str(e)}")
+
+
+    @staticmethod
+    def key(instructions_file_path):
+        """
+        Watermark key of an instruction file
+
+        Args:
+            instructions_file_path: (str)
+
+        Returns:
+            key: (str) absolute path
+        """
+        return os.path.abspath(instructions_file_path)
+
+
+    def seen(self, key):
+        """
+        Ids output by the earlier runs of an instruction file
+
+        Args:
+            key: (str)
+
+        Returns:
+            ids: (set) None when the file has never run in incremental mode
+        """
+        with self.lock:
+            watermark = self.watermarks.get(key)
+            return set(watermark["ids"]) if watermark is not None else None
+
+
+    def update(self, key, arxiv_ids):
+        """
+        Add the ids output by a run to the watermark of its instruction file and save the file
+
+        Args:
+            key: (str)
+            arxiv_ids: (list) ids of the run, newest first
+
+        Returns:
+            new: (int) ids not in the watermark before
+        """
+        with self.lock:
+            previous = self.watermarks.get(key, {}).get("ids", [])
+            known = set(previous)
+            new_ids = [arxiv_id for arxiv_id in dict.fromkeys(arxiv_ids) if arxiv_id and arxiv_id not in known]
+
+            self.watermarks[key] = {
+                "ids": (new_ids + previous)[:self.max_ids],
+                "updated": time.time(),
+                "last_new": len(new_ids),
+            }
+            self._save()
+
+        return len(new_ids)
+
+
+    def _save(self):
+        """Write the watermarks atomically, so an interrupted run never leaves a truncated file (lock must be held)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.watermarks, file)
+        os.replace(temporary, self.path)
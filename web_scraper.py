@@ -1,36 +1,403 @@
+import asyncio
 import logging
-from bs4 import BeautifulSoup
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 import requests
+from http_cache import CacheMissError
+from html_backends import parse_html, resolve_backend
+from http_backends import DEFAULT_POOL_CONNECTIONS, build_session
+from rate_limiter import DomainRateLimiter
 
+# Responses worth retrying: throttling and temporary server failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-class WebScraper: 
 
-    def __init__(self, session=None): 
-        # Initialise the optional session for connection reuse
-        self.session = session or requests.Session()
+def retry_after_seconds(value):
+    """
+    Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date
 
+    Args:
+        value: (str)
 
-    def fetch_n_parse(self, url): 
+    Returns:
+        seconds: (float) None when the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class WebScraper:
+
+    def __init__(self, session=None, max_concurrency=8, per_host_limit=4, cache=None, offline=False, parser="auto",
+                 connect_timeout=5.0, read_timeout=30.0, max_retries=3, backoff_base=0.5, backoff_max=30.0,
+                 rate_limit=None, rate_burst=1, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=None, http2=False):
+        """
+        Initialise the scraper and its concurrent fetch engine
+
+        Args:
+            session: (requests.Session)
+            max_concurrency: (int) maximum number of pages fetched at once
+            per_host_limit: (int) maximum number of pages fetched at once from the same host
+            cache: (HttpCache) optional persistent HTTP response cache
+            offline: (bool) replay only mode, every page is served from the cache and the network is never used
+            parser: (str) HTML parser backend: "auto", "html.parser", "lxml" or "selectolax"
+            connect_timeout: (float) seconds allowed to open a connection
+            read_timeout: (float) seconds allowed between bytes of the response
+            max_retries: (int) retries of a request after a connection error, timeout, 429 or 5xx response
+            backoff_base: (float) first retry delay in seconds, doubled on every retry (with full jitter)
+            backoff_max: (float) longest delay between retries, a longer Retry-After gives up instead
+            rate_limit: (float) requests per second allowed per host, shared by every concurrent fetch, None for no limit
+            rate_burst: (int) requests per host that can be sent in a burst
+            pool_connections: (int) hosts whose keep-alive connection pools are kept
+            pool_maxsize: (int) connections kept alive per host, defaults to max_concurrency (at least 10)
+            http2: (bool) fetch with the optional httpx HTTP/2 client, multiplexing requests to a host on one connection
+        """
+        self.max_concurrency = max(1, max_concurrency)
+
+        # Initialise the optional session for connection reuse, with a pool large enough for the concurrent fetches
+        self.session = session or build_session(pool_connections, pool_maxsize or max(10, self.max_concurrency), http2)
+        self.per_host_limit = max(1, per_host_limit)
+        self.cache = cache
+        self.offline = offline
+        self.parser = resolve_backend(parser)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = DomainRateLimiter(rate_limit, rate_burst) if rate_limit else None
+
+        if offline and cache is None:
+            raise ValueError("Offline replay mode needs an HTTP cache to replay from")
+
+
+    def fetch_n_parse(self, url):
         """
         Fetch and parse the content on the web page
 
-        Args: 
+        Args:
             url: (str)
 
-        Returns: 
+        Returns:
             tuple: (Raw Text HTML, BeautifulSoup Object)
 
         """
-        try: 
-            logging.info("Fetching and Parsing content from the url: {url}")
-            
-            response = self.session.get(url)
-            response.raise_for_status() # Raises HTTP Error if request fails
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            return response.text, soup
-        
+        # Thin wrapper over the concurrent engine with a single url
+        pages = self.fetch_many([url])
+        try:
+            _, text, soup = next(pages)
+            return text, soup
+        finally:
+            pages.close()
+
+
+    def stream_records(self, url, extractor, chunk_size=16 * 1024):
+        """
+        Fetch a results page in chunks and yield each paper record as soon as its result block closes
+
+        The page is parsed incrementally and every finished block is dropped from the tree,
+        so neither the raw text nor the full document is kept in memory.
+
+        Args:
+            url: (str)
+            extractor: (ItemsExtractor) used to read each result block
+            chunk_size: (int) bytes read from the network at a time
+
+        Returns:
+            generator: paper records (dict)
+        """
+        try:
+            from lxml import etree
+        except ImportError:
+            # No incremental parser available, extract from the whole page instead
+            logging.warning("lxml is not installed, streaming falls back to parsing the whole page")
+            _, soup = self.fetch_n_parse(url)
+            yield from extractor.extract_records(soup)
+            return
+
+        try:
+            logging.info(f"Streaming and Parsing content from the url: {url}")
+            chunks, encoding, response = self._stream_chunks(url, chunk_size)
+            parser = etree.HTMLPullParser(events=("end",), tag="li", encoding=encoding)
+            count = 0
+
+            try:
+                for chunk in chunks:
+                    parser.feed(chunk)
+                    for record in self._read_closed_blocks(parser, extractor, etree):
+                        count += 1
+                        yield record
+
+                parser.close()
+                for record in self._read_closed_blocks(parser, extractor, etree):
+                    count += 1
+                    yield record
+            finally:
+                if response is not None:
+                    response.close()
+
+            logging.info(f"Streamed {count} paper records from the url: {url}")
+
         except requests.exceptions.RequestException as e:
             logging.error(f"Request Failed to fetch the url: {url} Error Message: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+    def _stream_chunks(self, url, chunk_size):
+        """
+        Raw chunks of a page, straight from the network or from the HTTP cache when one is configured
+
+        Args:
+            url: (str)
+            chunk_size: (int)
+
+        Returns:
+            tuple: (iterator of bytes, encoding, response to close or None)
+        """
+        if self.cache is not None:
+            # Cached pages are already in memory, they are only fed in chunks
+            data = self._get_text(url).encode("utf-8")
+            chunks = (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+            return chunks, "utf-8", None
+
+        response = self._request(url, stream=True)
+        response.raise_for_status() # Raises HTTP Error if request fails
+        return response.iter_content(chunk_size=chunk_size), response.encoding or "utf-8", response
+
+
+    def _read_closed_blocks(self, parser, extractor, etree):
+        """
+        Extract the records of the result blocks closed since the last read, then free them
+
+        Args:
+            parser: (lxml HTMLPullParser)
+            extractor: (ItemsExtractor)
+            etree: (module) lxml.etree
+
+        Returns:
+            generator: paper records (dict)
+        """
+        for _, element in parser.read_events():
+            if "arxiv-result" not in (element.get("class") or "").split():
+                continue
+
+            block = parse_html(etree.tostring(element, encoding="unicode", with_tail=False), self.parser)
+            records = [extractor.extract_record(container) for container in block.find_all("li", class_="arxiv-result")]
+
+            # Drop the finished block and everything before it to keep memory flat
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            yield from records
+
+
+    def fetch_many(self, urls):
+        """
+        Fetch and parse several web pages concurrently, yielding each page as soon as it completes
+
+        Args:
+            urls: (list)
+
+        Returns:
+            generator: (url, Raw Text HTML, BeautifulSoup Object) in order of completion
+        """
+        loop = asyncio.new_event_loop()
+        pages = self.fetch_many_async(urls)
+
+        try:
+            # Step a private event loop forward one completed page at a time
+            while True:
+                try:
+                    yield loop.run_until_complete(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.close()
+
+
+    async def fetch_many_async(self, urls):
+        """
+        Asynchronous version of fetch_many bounded by a global and a per-host concurrency limit
+
+        Args:
+            urls: (list)
+
+        Returns:
+            async generator: (url, Raw Text HTML, BeautifulSoup Object) in order of completion
+        """
+        urls = list(urls)
+        if not urls:
+            return
+
+        logging.info(f"Fetching {len(urls)} urls (max concurrency: {self.max_concurrency}, per host: {self.per_host_limit})")
+
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = {}
+
+        # The blocking session calls run on a worker pool owned by this batch of urls
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(urls)))
+
+        async def fetch_one(url):
+            host = urlparse(url).netloc
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+
+            # The host slot first: a url waiting for its busy host never holds a global slot another host could use
+            async with host_limits[host], global_limit:
+                text, soup = await loop.run_in_executor(executor, self._fetch_one, url)
+            return url, text, soup
+
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                yield await next_page
+        finally:
+            # Cancel whatever is still queued when the caller stops early or a page fails
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            executor.shutdown(wait=False)
+
+
+    def _fetch_one(self, url):
+        """
+        Blocking fetch and parse of a single web page (runs on the worker pool)
+
+        Args:
+            url: (str)
+
+        Returns:
+            tuple: (Raw Text HTML, BeautifulSoup Object)
+        """
+        try:
+            logging.info(f"Fetching and Parsing content from the url: {url}")
+
+            text = self._get_text(url)
+            soup = parse_html(text, self.parser)
+
+            return text, soup
+
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Request Failed to fetch the url: {url} Error Message: {str(e)}")
+            raise
+
+
+    def _get_text(self, url):
+        """
+        Get the page text through the HTTP cache when one is configured
+
+        Args:
+            url: (str)
+
+        Returns:
+            Raw Text HTML: (str)
+        """
+        if self.cache is None:
+            response = self._request(url)
+            response.raise_for_status() # Raises HTTP Error if request fails
+            return response.text
+
+        entry = self.cache.get(url)
+
+        # Replay only: whatever was recorded is served, and nothing else
+        if self.offline:
+            if entry is None:
+                raise CacheMissError(f"No cached response for {url} in offline replay mode")
+            logging.info(f"Replaying cached response for {url}")
+            return entry["body"]
+
+        if entry is not None and self.cache.is_fresh(entry):
+            logging.info(f"Serving fresh cached response for {url}")
+            return entry["body"]
+
+        # Revalidate a stale entry with its validators
+        headers = self.cache.conditional_headers(entry) if entry is not None else {}
+        response = self._request(url, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            logging.info(f"Cached response for {url} is still valid (304 Not Modified)")
+            self.cache.refresh(url, entry, response)
+            return entry["body"]
+
+        response.raise_for_status() # Raises HTTP Error if request fails
+        self.cache.store(url, response)
+        return response.text
+
+
+    def _request(self, url, **kwargs):
+        """
+        GET a url with timeouts, the per-host rate limit and retries with exponential backoff
+
+        Connection errors, timeouts, 429 and 5xx responses are retried up to max_retries times.
+        A Retry-After header sets the delay (and holds back the other fetches to the same host);
+        when it asks for longer than backoff_max the response is returned as it is.
+
+        Args:
+            url: (str)
+            kwargs: extra arguments of session.get (headers, stream)
+
+        Returns:
+            response: (requests.Response) the last response, not checked for its status
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                reason = type(e).__name__
+
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.backoff_max:
+                    logging.warning(f"{url} asked to retry after {retry_after:.0f}s, longer than the {self.backoff_max:.0f}s allowed")
+                    return response
+
+                delay = self._backoff(attempt) if retry_after is None else retry_after
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+                # The whole host is throttled, not just this request: the limiter makes every fetch wait
+                if retry_after is not None and self.rate_limiter is not None:
+                    self.rate_limiter.pause(url, retry_after)
+                    logging.warning(f"Request to {url} failed ({reason}), holding back the host for {delay:.2f}s")
+                    continue
+
+            logging.warning(f"Request to {url} failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+    def _backoff(self, attempt):
+        """
+        Exponential backoff with full jitter: a random delay up to base * 2^attempt, capped at backoff_max
+
+        Args:
+            attempt: (int) 0 for the first retry
+
+        Returns:
+            delay: (float) seconds
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))